@@ -55,16 +55,23 @@ def discover_document_files() -> Dict[str, List[Path]]:
         files_by_category = {}
         
         # Supported file extensions
-        supported_extensions = ["*.pdf", "*.doc", "*.docx", "*.txt", "*.rtf"]
+        supported_extensions = (".pdf", ".doc", ".docx", ".txt", ".rtf")
         
-        for category_dir in DOCUMENTS_DIR.iterdir():
-            if category_dir.is_dir() and category_dir.name in VALID_CATEGORIES:
-                category = category_dir.name
-                document_files = []
+        # One scandir listing per folder; DirEntry caches the file type, so
+        # filtering needs no extra stat call per entry
+        with os.scandir(DOCUMENTS_DIR) as category_entries:
+            for category_entry in category_entries:
+                if category_entry.name not in VALID_CATEGORIES or not category_entry.is_dir():
+                    continue
                 
-                # Collect all supported file types
-                for pattern in supported_extensions:
-                    document_files.extend(category_dir.glob(pattern))
+                category = category_entry.name
+                with os.scandir(category_entry.path) as entries:
+                    document_files = [
+                        Path(entry.path) for entry in entries
+                        if entry.name.endswith(supported_extensions)
+                        and not entry.name.startswith(".")
+                        and entry.is_file()
+                    ]
                 
                 if document_files:
                     files_by_category[category] = sorted(document_files)  # Sort for consistent order
@@ -147,7 +154,7 @@ def process_single_document(filepath: Path, category: str, log_file: Path) -> bo
             mime_type = get_mime_type(filepath)
             
             # Prepare API request
-            url = f"{API_BASE_URL}/v1/upload-and-preprocess"
+            url = f"{API_BASE_URL}/v1/upload-and-preprocess?wait=true"
             
             with open(filepath, 'rb') as file:
                 files = {'file': (filepath.name, file, mime_type)}
@@ -20,6 +20,12 @@ from pathlib import Path
 from collections import defaultdict
 from dotenv import load_dotenv
 
+# Optional fast JSON parser (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 from langchain_core.documents import Document
@@ -77,7 +83,8 @@ def load_docs_per_category():
         
         for jf in folder.glob("*.json"):
             try:
-                data = json.loads(jf.read_text(encoding="utf-8"))
+                # orjson parses straight from bytes, without an intermediate str
+                data = orjson.loads(jf.read_bytes()) if orjson else json.loads(jf.read_text(encoding="utf-8"))
                 meta_doc = data.get("document", {})
                 
                 for ch in data.get("chunks", []):
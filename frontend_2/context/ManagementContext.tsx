@@ -179,7 +179,7 @@ export function ManagementProvider({ children }: { children: ReactNode }) {
 
       // Get backend URL from config
       const backendUrl = config.backendUrl;
-      const response = await fetch(`${backendUrl}/v1/upload-and-preprocess`, {
+      const response = await fetch(`${backendUrl}/v1/upload-and-preprocess?wait=true`, {
         method: 'POST',
         body: formData,
       });
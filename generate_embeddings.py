@@ -35,6 +35,12 @@ import numpy as np
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+# Optional fast JSON parser (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
@@ -123,8 +129,12 @@ def load_all_chunks() -> Dict[str, List[Dict]]:
             # Load all JSON files in this category folder
             for json_file in folder_path.glob("*.json"):
                 try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        document_data = json.load(f)
+                    # orjson parses straight from bytes, without an intermediate str
+                    if orjson:
+                        document_data = orjson.loads(json_file.read_bytes())
+                    else:
+                        with open(json_file, 'r', encoding='utf-8') as f:
+                            document_data = json.load(f)
                         
                     chunks = document_data.get('chunks', [])
                     for chunk in chunks:
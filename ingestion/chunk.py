@@ -5,6 +5,7 @@ Phase 3: Token-true chunking with tiktoken, sliding windows with overlap inside
 """
 
 import re
+from functools import lru_cache
 from typing import List, Dict, Optional, Any
 
 # Import tiktoken for accurate token counting
@@ -15,6 +16,30 @@ except ImportError:
 
 from .schemas import Chunk
 
+# Lines that start a bullet/list item (avoid ending a chunk on one)
+BULLET_LINE_PATTERNS = [re.compile(pattern) for pattern in [
+    r'^\s*[•·‣▪▫‣]\s*',     # Bullet points
+    r'^\s*[-*+]\s*',        # Dash/asterisk bullets  
+    r'^\s*\d+\.\s*',        # Numbered lists
+    r'^\s*[a-zA-Z]\.\s*',   # Lettered lists
+    r'^\s*\([a-zA-Z0-9]+\)\s*',  # Parenthetical lists
+]]
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer():
+    """
+    Shared tiktoken cl100k_base encoding (loading the BPE ranks is not free).
+    
+    Returns:
+        tiktoken Encoding
+    """
+    if not tiktoken:
+        raise ImportError("tiktoken is required for token counting. Install with: pip install tiktoken")
+    return tiktoken.get_encoding("cl100k_base")
+
 
 def chunk_blocks(blocks: List[Dict], max_tokens: int = 1000, overlap_tokens: int = 200, 
                 tokenizer: Optional[Any] = None) -> List[Dict]:
@@ -36,27 +61,35 @@ def chunk_blocks(blocks: List[Dict], max_tokens: int = 1000, overlap_tokens: int
         - page_start: int (starting page number)
         - page_end: int (ending page number)
         - heading_path: list[str] (hierarchical heading path)
+        - _token_ids: list[int] (only when they encode exactly text.strip(), so
+          enhance_chunk_quality can reuse them instead of re-encoding)
     """
     if not tiktoken:
         raise ImportError("tiktoken is required for token-based chunking. Install with: pip install tiktoken")
     
     # Initialize tokenizer
     if tokenizer is None:
-        tokenizer = tiktoken.get_encoding("cl100k_base")
+        tokenizer = get_tokenizer()
     
     chunks = []
     
-    for block in blocks:
-        block_text = block.get('text', '')
-        if not block_text.strip():
-            continue
-            
+    text_blocks = [block for block in blocks if block.get('text', '').strip()]
+    block_texts = [block['text'] for block in text_blocks]
+    
+    # Encode every block in one call; tiktoken spreads encode_batch over threads
+    if hasattr(tokenizer, 'encode_batch'):
+        block_tokens = tokenizer.encode_batch(block_texts)
+    else:
+        block_tokens = [tokenizer.encode(text) for text in block_texts]
+    
+    for block, block_text, tokens in zip(text_blocks, block_texts, block_tokens):
         block_chunks = _chunk_single_block(
             block_text=block_text,
             block=block,
             max_tokens=max_tokens,
             overlap_tokens=overlap_tokens,
-            tokenizer=tokenizer
+            tokenizer=tokenizer,
+            tokens=tokens
         )
         chunks.extend(block_chunks)
     
@@ -64,7 +97,8 @@ def chunk_blocks(blocks: List[Dict], max_tokens: int = 1000, overlap_tokens: int
 
 
 def _chunk_single_block(block_text: str, block: Dict, max_tokens: int, 
-                       overlap_tokens: int, tokenizer) -> List[Dict]:
+                       overlap_tokens: int, tokenizer,
+                       tokens: Optional[List[int]] = None) -> List[Dict]:
     """
     Chunk a single block using sliding windows with token overlap.
     
@@ -74,22 +108,27 @@ def _chunk_single_block(block_text: str, block: Dict, max_tokens: int,
         max_tokens: Maximum tokens per chunk
         overlap_tokens: Overlap tokens between chunks
         tokenizer: tiktoken tokenizer
+        tokens: Token ids of block_text, if already encoded
         
     Returns:
         List of chunk dictionaries
     """
     # Tokenize the entire block
-    tokens = tokenizer.encode(block_text)
+    if tokens is None:
+        tokens = tokenizer.encode(block_text)
     
     if len(tokens) <= max_tokens:
         # Block fits in one chunk
-        return [{
+        chunk = {
             'text': block_text,
             'token_count': len(tokens),
             'page_start': block.get('page_start', 1),
             'page_end': block.get('page_end', 1),
             'heading_path': block.get('heading_path', [])
-        }]
+        }
+        if block_text == block_text.strip():
+            chunk['_token_ids'] = tokens
+        return [chunk]
     
     chunks = []
     chunk_index = 0
@@ -106,19 +145,26 @@ def _chunk_single_block(block_text: str, block: Dict, max_tokens: int,
         chunk_text = tokenizer.decode(chunk_tokens)
         
         # Try to avoid splitting in the middle of bullets/lists
+        reencoded = False
         if end_token < len(tokens):  # Not the last chunk
             chunk_text = _adjust_chunk_boundary(chunk_text, block_text, start_token, tokenizer)
             # Re-tokenize after boundary adjustment
             chunk_tokens = tokenizer.encode(chunk_text)
+            reencoded = True
         
         # Create chunk dictionary
+        stripped_text = chunk_text.strip()
         chunk = {
-            'text': chunk_text.strip(),
+            'text': stripped_text,
             'token_count': len(chunk_tokens),
             'page_start': block.get('page_start', 1),
             'page_end': block.get('page_end', 1),
             'heading_path': block.get('heading_path', [])
         }
+        # Decoded token slices don't always re-encode to the same ids, so only
+        # keep ids that came from encoding this exact text
+        if reencoded and stripped_text == chunk_text:
+            chunk['_token_ids'] = chunk_tokens
         
         chunks.append(chunk)
         chunk_index += 1
@@ -149,15 +195,6 @@ def _adjust_chunk_boundary(chunk_text: str, full_block_text: str, start_token: i
     # If chunk ends with incomplete bullet point or list item, try to find better boundary
     lines = chunk_text.split('\n')
     
-    # Check if last few lines look like incomplete bullets/lists
-    bullet_patterns = [
-        r'^\s*[•·‣▪▫‣]\s*',     # Bullet points
-        r'^\s*[-*+]\s*',        # Dash/asterisk bullets  
-        r'^\s*\d+\.\s*',        # Numbered lists
-        r'^\s*[a-zA-Z]\.\s*',   # Lettered lists
-        r'^\s*\([a-zA-Z0-9]+\)\s*',  # Parenthetical lists
-    ]
-    
     # Look for better break point by scanning backwards
     for i in range(len(lines) - 1, max(0, len(lines) - 5), -1):
         line = lines[i].strip()
@@ -169,7 +206,7 @@ def _adjust_chunk_boundary(chunk_text: str, full_block_text: str, start_token: i
                 return better_chunk
         
         # Avoid breaking in middle of bullet point
-        if any(re.match(pattern, line) for pattern in bullet_patterns):
+        if any(pattern.match(line) for pattern in BULLET_LINE_PATTERNS):
             # Check if previous line would be a better break
             if i > 0:
                 prev_line = lines[i-1].strip()
@@ -243,8 +280,7 @@ def count_tokens(text: str) -> int:
         words = text.split()
         return int(len(words) / 0.75) + 1
     
-    tokenizer = tiktoken.get_encoding("cl100k_base")
-    return len(tokenizer.encode(text))
+    return len(get_tokenizer().encode(text))
 
 
 def split_by_paragraphs(text: str) -> List[str]:
@@ -260,7 +296,7 @@ def split_by_paragraphs(text: str) -> List[str]:
         List of paragraph strings
     """
     # Split by double newlines (paragraph breaks)
-    paragraphs = re.split(r'\n\s*\n', text)
+    paragraphs = PARAGRAPH_BREAK_RE.split(text)
     
     # Clean up and filter empty paragraphs
     cleaned_paragraphs = []
@@ -286,7 +322,7 @@ def split_by_sentences(text: str) -> List[str]:
     """
     # Basic sentence splitting on periods, exclamation marks, question marks
     # This is a simple implementation - could be enhanced with more sophisticated NLP
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = SENTENCE_BREAK_RE.split(text)
     
     # Clean up and filter empty sentences
     cleaned_sentences = []
@@ -8,6 +8,60 @@ and page numbers, and normalizes whitespace.
 import re
 from typing import List
 from collections import Counter
+from itertools import chain
+
+
+# Page number lines: "1", "Page 1", "Page 1 of 10", "1 of 10", "- 1 -", "| 1 |", "[ 1 ]"
+PAGE_NUMBER_PATTERN = r'^\s*(?:\d+|Page\s+\d+(?:\s+of\s+\d+)?|\d+\s+of\s+\d+|-\s*\d+\s*-|\|\s*\d+\s*\||\[\s*\d+\s*\])\s*$'
+PAGE_NUMBER_RE = re.compile(PAGE_NUMBER_PATTERN, re.IGNORECASE)
+# Any page-number or blank line anywhere in a page, i.e. whether the line
+# filter in clean_page_text has anything to drop
+DROPPABLE_LINE_RE = re.compile(PAGE_NUMBER_PATTERN + r'|^\s*$', re.IGNORECASE | re.MULTILINE)
+DEHYPHENATE_RE = re.compile(r'(\w)-\s*\n\s*(\w)')
+EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+INLINE_SPACES_RE = re.compile(r'[ \t]+')
+LINE_EDGE_SPACES_RE = re.compile(r' +\n *|\n +')
+
+# Table of contents entries
+TOC_LINE_RE = re.compile(
+    r'^[A-Za-z0-9\s\.\-:]+\.{3,}\s*\d+\s*$'          # "Title ........ 5"
+    r'|^[A-Za-z0-9\s]+\s+\.{3,}\s*\d+\s*$'            # "Title  ....... 5"
+    r'|^\s*[A-Za-z0-9\.\s\-:]+\s+\d+\s*$'             # "Section 1.1 Title  5"
+    r'|^\s*[IVX]+\.\s+[A-Za-z0-9\s\-:]+\.{2,}\s*\d+'  # "I. Title .... 5"
+    r'|^\s*\d+\.\s+[A-Za-z0-9\s\-:]+\.{2,}\s*\d+'     # "1. Title .... 5"
+)
+
+# Pages are joined with a record separator so page-level passes can run as one
+# regex over the whole document. Pages are checked for it (and for the other
+# str.splitlines breaks) first, since not every caller normalizes them
+PAGE_SEP = '\x1e'
+# Line boundaries str.splitlines honours besides '\n'
+OTHER_LINE_BREAKS_RE = re.compile(r'[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# A whole line ending in dot leaders and a page number ("Scope ....... 4"),
+# plus its newline; a line is delimited by '\n' or PAGE_SEP
+TOC_LEADER_LINE_RE = re.compile(
+    r'(?:^|(?<=[\n\x1e]))[^\n\x1e]*\.{3,}[^\S\n\x1e]*\d+[^\S\n\x1e]*(?:\n|(?=\x1e)|\Z)'
+)
+TRAILING_NEWLINE_RE = re.compile(r'\n(?=\x1e|\Z)')
+# The same TOC line test for the per-line fallback
+TOC_DOT_LEADER_RE = re.compile(r'\.{3,}\s*\d+\s*$')
+
+# Number of lines to check at top/bottom of each page (kept small to avoid
+# overlap in short pages)
+HEADER_FOOTER_SAMPLE_LINES = 2
+
+
+def _edge_lines(lines: List[str]) -> List[str]:
+    """Header/footer candidates from one page's stripped, non-empty lines."""
+    # For short pages, be more conservative: only the first and last line
+    if len(lines) <= 4:
+        return [lines[0], lines[-1]] if len(lines) > 1 else lines
+    
+    # Top lines (headers) and bottom lines (footers); pages are long enough
+    # here that the two never overlap. Keep lines short enough to be a header/footer.
+    return [line for line in lines[:HEADER_FOOTER_SAMPLE_LINES] + lines[-HEADER_FOOTER_SAMPLE_LINES:]
+            if len(line) < 200]
 
 
 def remove_repeated_headers_footers(page_texts: List[str]) -> List[str]:
@@ -25,48 +79,21 @@ def remove_repeated_headers_footers(page_texts: List[str]) -> List[str]:
     if not page_texts or len(page_texts) < 2:
         return page_texts
     
-    # Number of lines to check at top/bottom of each page
-    SAMPLE_LINES = 2  # Reduced to avoid overlap in short pages
-    
-    # Collect candidates for header/footer lines
-    candidates = Counter()
-    page_lines = []
+    # Strip every line once; blank lines are dropped
+    page_lines = [
+        [line for line in map(str.strip, page_text.splitlines()) if line]
+        for page_text in page_texts
+    ]
     
-    for page_text in page_texts:
-        lines = [line.strip() for line in page_text.splitlines() if line.strip()]
-        page_lines.append(lines)
-        
-        if lines:
-            # For short pages, be more conservative
-            if len(lines) <= 4:
-                # Only check first and last line for very short pages
-                if lines:
-                    candidates[lines[0]] += 1
-                if len(lines) > 1:
-                    candidates[lines[-1]] += 1
-            else:
-                # Check top lines (headers)
-                top_lines = lines[:SAMPLE_LINES]
-                # Check bottom lines (footers), but avoid overlap with top
-                bottom_start = max(SAMPLE_LINES, len(lines) - SAMPLE_LINES)
-                bottom_lines = lines[bottom_start:]
-                
-                # Add to candidates if line is short enough to be header/footer
-                for line in top_lines + bottom_lines:
-                    if len(line) < 200:  # Reasonable header/footer length
-                        candidates[line] += 1
+    # Count candidate header/footer lines in one C-level Counter pass
+    candidates = Counter(chain.from_iterable(map(_edge_lines, page_lines)))
     
     # Determine threshold - line must appear in at least 1/3 of pages
     threshold = max(2, len(page_texts) // 3)
     repeated_lines = {line for line, count in candidates.items() if count >= threshold}
     
     # Remove repeated lines from each page
-    cleaned_pages = []
-    for lines in page_lines:
-        cleaned_lines = [line for line in lines if line not in repeated_lines]
-        cleaned_pages.append('\n'.join(cleaned_lines))
-    
-    return cleaned_pages
+    return ['\n'.join(line for line in lines if line not in repeated_lines) for lines in page_lines]
 
 
 def clean_page_text(text: str) -> str:
@@ -85,46 +112,27 @@ def clean_page_text(text: str) -> str:
     if not text:
         return ""
     
-    # Page number patterns to remove
-    page_patterns = [
-        r'^\s*\d+\s*$',                    # standalone numbers
-        r'^\s*Page\s+\d+\s*$',             # "Page 1"
-        r'^\s*Page\s+\d+\s+of\s+\d+\s*$',  # "Page 1 of 10"
-        r'^\s*\d+\s+of\s+\d+\s*$',         # "1 of 10"
-        r'^\s*-\s*\d+\s*-\s*$',            # "- 1 -"
-        r'^\s*\|\s*\d+\s*\|\s*$',          # "| 1 |"
-        r'^\s*\[\s*\d+\s*\]\s*$',          # "[ 1 ]"
-    ]
-    
-    # Split into lines for processing
-    lines = text.split('\n')
-    cleaned_lines = []
-    
-    for line in lines:
-        # Check if line matches page number pattern
-        is_page_number = any(re.match(pattern, line, re.IGNORECASE) for pattern in page_patterns)
-        
-        if not is_page_number and line.strip():
-            cleaned_lines.append(line)
-    
-    # Rejoin lines
-    text = '\n'.join(cleaned_lines)
+    # Drop page number lines and blank lines (pages without any skip the split/join)
+    if DROPPABLE_LINE_RE.search(text):
+        text = '\n'.join(
+            line for line in text.split('\n')
+            if line.strip() and not PAGE_NUMBER_RE.match(line)
+        )
     
     # De-hyphenate line breaks: "word-\nword" -> "wordword"  
-    text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)
+    text = DEHYPHENATE_RE.sub(r'\1\2', text)
     
     # Normalize line endings
-    text = re.sub(r'\r\n', '\n', text)
+    text = text.replace('\r\n', '\n')
     
     # Reduce multiple newlines to double newlines (preserve paragraph breaks)
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = EXTRA_NEWLINES_RE.sub('\n\n', text)
     
     # Normalize spaces (multiple spaces to single space)
-    text = re.sub(r'[ \t]+', ' ', text)
+    text = INLINE_SPACES_RE.sub(' ', text)
     
     # Clean up space at line endings/beginnings but preserve structure
-    text = re.sub(r' +\n', '\n', text)
-    text = re.sub(r'\n +', '\n', text)
+    text = LINE_EDGE_SPACES_RE.sub('\n', text)
     
     return text.strip()
 
@@ -183,23 +191,34 @@ def filter_table_of_contents(text: str) -> str:
     if not text:
         return ""
     
-    lines = text.split('\n')
-    filtered_lines = []
+    return '\n'.join(line for line in text.split('\n') if not TOC_LINE_RE.match(line.strip()))
+
+
+def strip_toc_lines(pages: List[str]) -> List[str]:
+    """
+    Remove dot-leader table of contents lines from every page.
     
-    # TOC patterns to filter out
-    toc_patterns = [
-        r'^[A-Za-z0-9\s\.\-:]+\.{3,}\s*\d+\s*$',  # "Title ........ 5"
-        r'^[A-Za-z0-9\s]+\s+\.{3,}\s*\d+\s*$',    # "Title  ....... 5"
-        r'^\s*[A-Za-z0-9\.\s\-:]+\s+\d+\s*$',     # "Section 1.1 Title  5"
-        r'^\s*[IVX]+\.\s+[A-Za-z0-9\s\-:]+\.{2,}\s*\d+',  # "I. Title .... 5"
-        r'^\s*\d+\.\s+[A-Za-z0-9\s\-:]+\.{2,}\s*\d+',     # "1. Title .... 5"
-    ]
+    Runs two regex passes over the PAGE_SEP-joined pages instead of
+    splitting and re-joining each page's lines. Pages containing PAGE_SEP or
+    another str.splitlines break are filtered line by line instead.
     
-    for line in lines:
-        # Skip if line matches TOC patterns
-        is_toc = any(re.match(pattern, line.strip()) for pattern in toc_patterns)
+    Args:
+        pages: List of '\n'-separated page texts
         
-        if not is_toc:
-            filtered_lines.append(line)
-    
-    return '\n'.join(filtered_lines)
\ No newline at end of file
+    Returns:
+        List of page texts (same length) without TOC lines
+    """
+    if not pages:
+        return pages
+    
+    if any(OTHER_LINE_BREAKS_RE.search(page) for page in pages):
+        return [
+            '\n'.join(line for line in page.splitlines() if not TOC_DOT_LEADER_RE.search(line))
+            for page in pages
+        ]
+    
+    joined = PAGE_SEP.join(pages)
+    joined = TOC_LEADER_LINE_RE.sub('', joined)
+    # A page keeps no trailing newline, as with splitlines() + '\n'.join()
+    joined = TRAILING_NEWLINE_RE.sub('', joined)
+    return joined.split(PAGE_SEP)
@@ -5,8 +5,12 @@ Phase 1: Robust extraction for PDF (with selective OCR), DOCX, TXT/MD.
 Handles mixed PDFs with both text and scanned pages intelligently.
 """
 
+import os
 import re
+import sys
 import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
 from typing import Tuple, List, Dict, Optional
 from pathlib import Path
 
@@ -44,6 +48,12 @@ logger = logging.getLogger(__name__)
 MIN_MEANINGFUL_CHARS = 10  # Threshold for determining if page needs OCR
 DEFAULT_DPI = 300
 DEFAULT_OCR_LANGUAGE = "eng"
+PARALLEL_MIN_PAGES = 4  # Below this, process start-up costs more than it saves
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Section splitters for Markdown (before "#" header lines) and plain text (blank lines)
+MARKDOWN_SECTION_RE = re.compile(r'\n(?=#)')
+BLANK_LINE_RE = re.compile(r'\n\s*\n')
 
 
 def extract_text_from_file(file_path: Path) -> Tuple[str, List[str]]:
@@ -103,11 +113,11 @@ def extract_pdf(file_path: Path, ocr_language: str = DEFAULT_OCR_LANGUAGE,
     page_texts = []
     
     try:
-        # Primary extraction using pdfplumber
-        if pdfplumber:
-            page_texts = _extract_pdf_pdfplumber(file_path, ocr_language, dpi)
-        elif fitz:
+        # Primary extraction using PyMuPDF (C-backed, no layout reconstruction)
+        if fitz:
             page_texts = _extract_pdf_pymupdf(file_path, ocr_language, dpi)
+        elif pdfplumber:
+            page_texts = _extract_pdf_pdfplumber(file_path, ocr_language, dpi)
         
         # Join pages with double newlines
         full_text = "\n\n".join(page_texts).strip()
@@ -120,69 +130,172 @@ def extract_pdf(file_path: Path, ocr_language: str = DEFAULT_OCR_LANGUAGE,
         raise
 
 
-def _extract_pdf_pdfplumber(file_path: Path, ocr_language: str, dpi: int) -> List[str]:
-    """Extract PDF using pdfplumber with selective OCR."""
-    page_texts = []
-    
-    with pdfplumber.open(str(file_path)) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            try:
-                # Try to extract text first
-                text = page.extract_text() or ""
-                text = text.replace("\r\n", "\n").strip()
-                
-                # Check if page needs OCR
-                meaningful_chars = len(re.sub(r'\s+', '', text))
-                
-                if meaningful_chars < MIN_MEANINGFUL_CHARS:
-                    logger.debug(f"Page {page_num} has {meaningful_chars} chars, applying OCR")
-                    ocr_text = _ocr_pdf_page_pdfplumber(page, ocr_language, dpi)
-                    if ocr_text and len(ocr_text.strip()) > meaningful_chars:
-                        text = ocr_text
-                        logger.debug(f"OCR improved page {page_num}: {len(ocr_text)} chars")
-                else:
-                    logger.debug(f"Page {page_num} has sufficient text ({meaningful_chars} chars), skipping OCR")
-                
-                page_texts.append(text)
-                
-            except Exception as e:
-                logger.warning(f"Error processing page {page_num}: {e}")
-                page_texts.append("")  # Add empty page to maintain page numbering
+def create_extraction_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Create a process pool suitable for extract_pdf_parallel.
     
-    return page_texts
+    Args:
+        workers: Number of worker processes (default: CPU count)
+        
+    Returns:
+        ProcessPoolExecutor (the caller owns it and must shut it down)
+    """
+    # Forking after tesseract/Objective-C initialization crashes on macOS
+    mp_context = multiprocessing.get_context("spawn") if sys.platform == "darwin" else None
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=mp_context)
 
 
-def _extract_pdf_pymupdf(file_path: Path, ocr_language: str, dpi: int) -> List[str]:
-    """Extract PDF using PyMuPDF with selective OCR."""
-    page_texts = []
+def extract_pdf_parallel(file_path: Path, ocr_language: str = DEFAULT_OCR_LANGUAGE,
+                         dpi: int = DEFAULT_DPI, workers: Optional[int] = None,
+                         executor: Optional[Executor] = None) -> Tuple[str, List[str]]:
+    """
+    Extract text from PDF files across a pool of worker processes.
     
-    with fitz.open(str(file_path)) as pdf:
-        for page_num in range(pdf.page_count):
-            try:
-                page = pdf[page_num]
-                
-                # Extract text
-                text = page.get_text().replace("\r\n", "\n").strip()
-                
-                # Check if page needs OCR
-                meaningful_chars = len(re.sub(r'\s+', '', text))
-                
-                if meaningful_chars < MIN_MEANINGFUL_CHARS:
-                    logger.debug(f"Page {page_num + 1} has {meaningful_chars} chars, applying OCR")
-                    ocr_text = _ocr_pdf_page_pymupdf(page, ocr_language, dpi)
-                    if ocr_text and len(ocr_text.strip()) > meaningful_chars:
-                        text = ocr_text
-                        logger.debug(f"OCR improved page {page_num + 1}: {len(ocr_text)} chars")
-                else:
-                    logger.debug(f"Page {page_num + 1} has sufficient text ({meaningful_chars} chars), skipping OCR")
-                
-                page_texts.append(text)
-                
-            except Exception as e:
-                logger.warning(f"Error processing page {page_num + 1}: {e}")
-                page_texts.append("")  # Add empty page to maintain page numbering
+    Phase 1: Same output as extract_pdf, but page ranges are extracted (and
+    OCR'd) in parallel. Small PDFs fall back to serial extraction.
+    
+    Args:
+        file_path: Path to PDF file
+        ocr_language: Language for OCR (default: "eng")
+        dpi: DPI for OCR rendering (default: 300)
+        workers: Number of page ranges / worker processes (default: CPU count)
+        executor: Shared pool from create_extraction_pool, so concurrent
+            extractions queue on the same workers instead of each starting
+            its own (default: a pool private to this call)
+        
+    Returns:
+        Tuple of (full_text, page_texts) where page_texts is list of page strings
+    """
+    if not pdfplumber and not fitz:
+        raise ImportError("PDF extraction requires pdfplumber or pymupdf. Install with: pip install pdfplumber pymupdf")
     
-    return page_texts
+    page_count = _count_pdf_pages(file_path)
+    workers = min(workers or os.cpu_count() or 1, page_count)
+    if page_count < PARALLEL_MIN_PAGES or workers < 2:
+        return extract_pdf(file_path, ocr_language, dpi)
+    
+    logger.info(f"Extracting PDF with {workers} processes: {file_path} ({page_count} pages)")
+    
+    # One contiguous page range per worker so each process opens the file once
+    step = -(-page_count // workers)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    
+    def extract_ranges(pool: Executor) -> List[str]:
+        results = pool.map(
+            _extract_pdf_page_range,
+            [str(file_path)] * len(ranges),
+            [start for start, _ in ranges],
+            [stop for _, stop in ranges],
+            [ocr_language] * len(ranges),
+            [dpi] * len(ranges)
+        )
+        return [text for range_texts in results for text in range_texts]
+    
+    try:
+        if executor is not None:
+            page_texts = extract_ranges(executor)
+        else:
+            with create_extraction_pool(len(ranges)) as pool:
+                page_texts = extract_ranges(pool)
+        
+        full_text = "\n\n".join(page_texts).strip()
+        
+        logger.info(f"Extracted {len(page_texts)} pages from PDF, total length: {len(full_text)} chars")
+        return full_text, page_texts
+        
+    except Exception as e:
+        logger.error(f"Error extracting PDF {file_path}: {e}")
+        raise
+
+
+def _extract_pdf_pdfplumber(file_path: Path, ocr_language: str, dpi: int,
+                            start: int = 0, stop: Optional[int] = None) -> List[str]:
+    """Extract PDF pages [start, stop) using pdfplumber with selective OCR."""
+    with pdfplumber.open(str(file_path)) as pdf:
+        return [
+            _extract_page_pdfplumber(page, page_num, ocr_language, dpi)
+            for page_num, page in enumerate(pdf.pages[start:stop], start + 1)
+        ]
+
+
+def _extract_page_pdfplumber(page, page_num: int, ocr_language: str, dpi: int) -> str:
+    """Extract one pdfplumber page, falling back to OCR for near-empty pages."""
+    try:
+        # Try to extract text first
+        text = page.extract_text() or ""
+        text = text.replace("\r\n", "\n").strip()
+        
+        # Check if page needs OCR
+        meaningful_chars = len(WHITESPACE_RE.sub('', text))
+        
+        if meaningful_chars < MIN_MEANINGFUL_CHARS:
+            logger.debug(f"Page {page_num} has {meaningful_chars} chars, applying OCR")
+            ocr_text = _ocr_pdf_page_pdfplumber(page, ocr_language, dpi)
+            if ocr_text and len(ocr_text.strip()) > meaningful_chars:
+                text = ocr_text
+                logger.debug(f"OCR improved page {page_num}: {len(ocr_text)} chars")
+        else:
+            logger.debug(f"Page {page_num} has sufficient text ({meaningful_chars} chars), skipping OCR")
+        
+        return text
+        
+    except Exception as e:
+        logger.warning(f"Error processing page {page_num}: {e}")
+        return ""  # Empty page maintains page numbering
+
+
+def _extract_pdf_pymupdf(file_path: Path, ocr_language: str, dpi: int,
+                         start: int = 0, stop: Optional[int] = None) -> List[str]:
+    """Extract PDF pages [start, stop) using PyMuPDF with selective OCR."""
+    with fitz.open(str(file_path)) as pdf:
+        stop = pdf.page_count if stop is None else min(stop, pdf.page_count)
+        return [
+            _extract_page_pymupdf(pdf, page_num, ocr_language, dpi)
+            for page_num in range(start, stop)
+        ]
+
+
+def _extract_page_pymupdf(pdf, page_num: int, ocr_language: str, dpi: int) -> str:
+    """Extract one PyMuPDF page (0-based index), falling back to OCR for near-empty pages."""
+    try:
+        page = pdf[page_num]
+        
+        # Extract text
+        text = page.get_text().replace("\r\n", "\n").strip()
+        
+        # Check if page needs OCR
+        meaningful_chars = len(WHITESPACE_RE.sub('', text))
+        
+        if meaningful_chars < MIN_MEANINGFUL_CHARS:
+            logger.debug(f"Page {page_num + 1} has {meaningful_chars} chars, applying OCR")
+            ocr_text = _ocr_pdf_page_pymupdf(page, ocr_language, dpi)
+            if ocr_text and len(ocr_text.strip()) > meaningful_chars:
+                text = ocr_text
+                logger.debug(f"OCR improved page {page_num + 1}: {len(ocr_text)} chars")
+        else:
+            logger.debug(f"Page {page_num + 1} has sufficient text ({meaningful_chars} chars), skipping OCR")
+        
+        return text
+        
+    except Exception as e:
+        logger.warning(f"Error processing page {page_num + 1}: {e}")
+        return ""  # Empty page maintains page numbering
+
+
+def _extract_pdf_page_range(file_path: str, start: int, stop: int, ocr_language: str, dpi: int) -> List[str]:
+    """Process-pool worker: reopen the PDF read-only and extract pages [start, stop)."""
+    if fitz:
+        return _extract_pdf_pymupdf(Path(file_path), ocr_language, dpi, start, stop)
+    return _extract_pdf_pdfplumber(Path(file_path), ocr_language, dpi, start, stop)
+
+
+def _count_pdf_pages(file_path: Path) -> int:
+    """Count PDF pages, preferring PyMuPDF which does not parse page content."""
+    if fitz:
+        with fitz.open(str(file_path)) as pdf:
+            return pdf.page_count
+    with pdfplumber.open(str(file_path)) as pdf:
+        return len(pdf.pages)
 
 
 def _ocr_pdf_page_pdfplumber(page, ocr_language: str, dpi: int) -> str:
@@ -317,7 +430,7 @@ def extract_txt_md(file_path: Path) -> Tuple[str, List[str]]:
 def _split_markdown_sections(text: str) -> List[str]:
     """Split Markdown text by headers."""
     # Split by lines starting with #
-    sections = re.split(r'\n(?=#)', text)
+    sections = MARKDOWN_SECTION_RE.split(text)
     
     # Clean up sections
     cleaned_sections = []
@@ -332,7 +445,7 @@ def _split_markdown_sections(text: str) -> List[str]:
 def _split_text_sections(text: str) -> List[str]:
     """Split plain text by blank lines into logical sections."""
     # Split by multiple newlines (paragraph breaks)
-    sections = re.split(r'\n\s*\n', text)
+    sections = BLANK_LINE_RE.split(text)
     
     # Clean up sections and group small ones
     cleaned_sections = []
@@ -6,11 +6,133 @@ Phase 3: Intelligent metadata extraction from document content.
 
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 
 from .schemas import CATEGORIES
 
 
+# Inference only looks at the top of the document; this many lines cover every pass
+METADATA_HEAD_LINES = 30
+
+# Patterns for ACEP document titles (checked in order)
+TITLE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Policy statements and position papers
+    r'^ACEP\s+Policy\s+Statement:?\s*(.+)',
+    r'^ACEP\s+Position\s+Statement:?\s*(.+)', 
+    r'^Policy\s+Statement:?\s*(.+)',
+    r'^Position\s+Statement:?\s*(.+)',
+    
+    # Board meeting materials
+    r'^Board\s+of\s+Directors?\s+Meeting\s+(.+)',
+    r'^BOD\s+Meeting\s+(.+)',
+    r'^Executive\s+Committee\s+(.+)',
+    r'^Special\s+BOD\s+(.+)',
+    
+    # Resolutions
+    r'^Resolution\s+(\d+[A-Z]?[-\d]*):?\s*(.+)',
+    r'^ACEP\s+Resolution\s+(.+)',
+    
+    # Bylaws and governance
+    r'^ACEP\s+Bylaws\s*(.+)',
+    r'^Bylaws\s+(.+)',
+    r'^Governance\s+Policy:?\s*(.+)',
+    
+    # External communications
+    r'^ACEP\s+(?:Announces|Statement|Response|Endorses|Reaffirms)\s+(.+)',
+    r'^Emergency\s+Physicians?\s+(.+)',
+    r'^Leading\s+Physician\s+Organizations\s+(.+)',
+]]
+
+# Patterns for document numbers/identifiers (checked in order)
+DOCUMENT_NUMBER_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Resolution numbers
+    r'Resolution\s+(\d+[A-Z]?[-\d]*)',
+    r'Res\.\s+(\d+[A-Z]?[-\d]*)',
+    r'Resolution\s+No\.\s+(\d+[A-Z]?[-\d]*)',
+    
+    # Policy numbers
+    r'Policy\s+(?:Number|No\.?|#)\s*:?\s*([A-Z0-9.-]+)',
+    r'Policy\s+([A-Z0-9.-]{3,})',
+    
+    # Document codes
+    r'Document\s+(?:Number|No\.?|Code|ID)\s*:?\s*([A-Z0-9.-]+)',
+    r'Doc\s+(?:No\.?|#)\s*:?\s*([A-Z0-9.-]+)',
+    
+    # Meeting numbers/dates as identifiers
+    r'Meeting\s+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
+    r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})\s+Meeting',
+    
+    # General alphanumeric codes
+    r'([A-Z]{2,}\d{2,})',  # Letters followed by numbers
+    r'(\d{2,}[A-Z]{2,})',  # Numbers followed by letters
+]]
+
+# Common date patterns (checked in order)
+DATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Full dates with various separators
+    r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})',           # MM/DD/YYYY or DD/MM/YYYY
+    r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})',           # YYYY/MM/DD
+    r'(\d{1,2})[-/](\d{1,2})[-/](\d{2})',           # MM/DD/YY
+    
+    # Month names
+    r'(\w+)\s+(\d{1,2}),?\s+(\d{4})',               # January 15, 2024
+    r'(\d{1,2})\s+(\w+)\s+(\d{4})',                 # 15 January 2024
+    r'(\w+)\s+(\d{4})',                             # January 2024
+    
+    # Specific contexts
+    r'(?:Issued|Adopted|Approved|Effective)\s*:?\s*(\w+\s+\d{1,2},?\s+\d{4})',
+    r'(?:Date|Meeting)\s*:?\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
+]]
+
+YEAR_PATTERNS = [
+    re.compile(r'\b(20[0-4]\d)\b'),  # Years 2000-2049
+    re.compile(r'\b(19[7-9]\d)\b'),  # Years 1970-1999
+]
+
+# Month name mapping
+MONTH_NAMES = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6, 'july': 7, 'jul': 7,
+    'august': 8, 'aug': 8, 'september': 9, 'sep': 9, 'sept': 9, 'october': 10,
+    'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
+}
+
+MONTH_DAY_YEAR_RE = re.compile(r'(\w+)\s+(\d{1,2}),?\s+(\d{4})', re.IGNORECASE)
+LEADING_NON_WORD_RE = re.compile(r'^[^\w]*')
+TRAILING_NON_WORD_RE = re.compile(r'[^\w]*$')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def infer_metadata(text: str) -> Dict[str, Any]:
+    """
+    Infer title, document number, issued date and year in one call.
+    
+    Phase 3: All inference passes only read the first METADATA_HEAD_LINES
+    lines, so the head is sliced once and results are memoized on it
+    (re-uploads of the same document skip inference entirely).
+    
+    Args:
+        text: Document text content
+        
+    Returns:
+        Dict with title, document_number, issued_date and year
+    """
+    head = '\n'.join(_head_lines(text or "", METADATA_HEAD_LINES))
+    return dict(_infer_metadata_from_head(head))
+
+
+@lru_cache(maxsize=128)
+def _infer_metadata_from_head(head: str) -> Dict[str, Any]:
+    issued_date = infer_issued_date(head)
+    return {
+        "title": infer_title(head),
+        "document_number": infer_document_number(head),
+        "issued_date": issued_date,
+        "year": derive_year(head, issued_date),
+    }
+
+
 def infer_title(text: str, max_length: int = 200) -> str:
     """
     Infer document title from text content.
@@ -27,36 +149,7 @@ def infer_title(text: str, max_length: int = 200) -> str:
     if not text:  # Safety check for None or empty text
         return ""
     
-    lines = text.split('\n')
-    
-    # Patterns for ACEP document titles
-    title_patterns = [
-        # Policy statements and position papers
-        r'^ACEP\s+Policy\s+Statement:?\s*(.+)',
-        r'^ACEP\s+Position\s+Statement:?\s*(.+)', 
-        r'^Policy\s+Statement:?\s*(.+)',
-        r'^Position\s+Statement:?\s*(.+)',
-        
-        # Board meeting materials
-        r'^Board\s+of\s+Directors?\s+Meeting\s+(.+)',
-        r'^BOD\s+Meeting\s+(.+)',
-        r'^Executive\s+Committee\s+(.+)',
-        r'^Special\s+BOD\s+(.+)',
-        
-        # Resolutions
-        r'^Resolution\s+(\d+[A-Z]?[-\d]*):?\s*(.+)',
-        r'^ACEP\s+Resolution\s+(.+)',
-        
-        # Bylaws and governance
-        r'^ACEP\s+Bylaws\s*(.+)',
-        r'^Bylaws\s+(.+)',
-        r'^Governance\s+Policy:?\s*(.+)',
-        
-        # External communications
-        r'^ACEP\s+(?:Announces|Statement|Response|Endorses|Reaffirms)\s+(.+)',
-        r'^Emergency\s+Physicians?\s+(.+)',
-        r'^Leading\s+Physician\s+Organizations\s+(.+)',
-    ]
+    lines = _head_lines(text, 10)
     
     # Search for title patterns in first 10 lines
     for i, line in enumerate(lines[:10]):
@@ -64,8 +157,8 @@ def infer_title(text: str, max_length: int = 200) -> str:
         if not line:
             continue
             
-        for pattern in title_patterns:
-            match = re.search(pattern, line, re.IGNORECASE)
+        for pattern in TITLE_PATTERNS:
+            match = pattern.search(line)
             if match:
                 if len(match.groups()) == 2:
                     # Pattern with resolution number and title
@@ -120,31 +213,7 @@ def infer_document_number(text: str) -> Optional[str]:
     if not text:  # Safety check for None or empty text
         return None
         
-    lines = text.split('\n')
-    
-    # Patterns for document numbers/identifiers
-    number_patterns = [
-        # Resolution numbers
-        r'Resolution\s+(\d+[A-Z]?[-\d]*)',
-        r'Res\.\s+(\d+[A-Z]?[-\d]*)',
-        r'Resolution\s+No\.\s+(\d+[A-Z]?[-\d]*)',
-        
-        # Policy numbers
-        r'Policy\s+(?:Number|No\.?|#)\s*:?\s*([A-Z0-9.-]+)',
-        r'Policy\s+([A-Z0-9.-]{3,})',
-        
-        # Document codes
-        r'Document\s+(?:Number|No\.?|Code|ID)\s*:?\s*([A-Z0-9.-]+)',
-        r'Doc\s+(?:No\.?|#)\s*:?\s*([A-Z0-9.-]+)',
-        
-        # Meeting numbers/dates as identifiers
-        r'Meeting\s+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-        r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})\s+Meeting',
-        
-        # General alphanumeric codes
-        r'([A-Z]{2,}\d{2,})',  # Letters followed by numbers
-        r'(\d{2,}[A-Z]{2,})',  # Numbers followed by letters
-    ]
+    lines = _head_lines(text, 20)
     
     # Search in first 20 lines for document numbers
     for line in lines[:20]:
@@ -152,8 +221,8 @@ def infer_document_number(text: str) -> Optional[str]:
         if not line:
             continue
             
-        for pattern in number_patterns:
-            match = re.search(pattern, line, re.IGNORECASE)
+        for pattern in DOCUMENT_NUMBER_PATTERNS:
+            match = pattern.search(line)
             if match:
                 doc_number = match.group(1).strip()
                 if len(doc_number) >= 2:  # Minimum meaningful length
@@ -177,32 +246,7 @@ def infer_issued_date(text: str) -> Optional[str]:
     if not text:  # Safety check for None or empty text
         return None
         
-    lines = text.split('\n')
-    
-    # Common date patterns
-    date_patterns = [
-        # Full dates with various separators
-        r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})',           # MM/DD/YYYY or DD/MM/YYYY
-        r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})',           # YYYY/MM/DD
-        r'(\d{1,2})[-/](\d{1,2})[-/](\d{2})',           # MM/DD/YY
-        
-        # Month names
-        r'(\w+)\s+(\d{1,2}),?\s+(\d{4})',               # January 15, 2024
-        r'(\d{1,2})\s+(\w+)\s+(\d{4})',                 # 15 January 2024
-        r'(\w+)\s+(\d{4})',                             # January 2024
-        
-        # Specific contexts
-        r'(?:Issued|Adopted|Approved|Effective)\s*:?\s*(\w+\s+\d{1,2},?\s+\d{4})',
-        r'(?:Date|Meeting)\s*:?\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-    ]
-    
-    # Month name mapping
-    month_names = {
-        'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
-        'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6, 'july': 7, 'jul': 7,
-        'august': 8, 'aug': 8, 'september': 9, 'sep': 9, 'sept': 9, 'october': 10,
-        'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
-    }
+    lines = _head_lines(text, 30)
     
     # Search for dates in first 30 lines
     for line in lines[:30]:
@@ -210,8 +254,8 @@ def infer_issued_date(text: str) -> Optional[str]:
         if not line:
             continue
             
-        for pattern in date_patterns:
-            matches = re.finditer(pattern, line, re.IGNORECASE)
+        for pattern in DATE_PATTERNS:
+            matches = pattern.finditer(line)
             for match in matches:
                 try:
                     groups = match.groups()
@@ -219,14 +263,14 @@ def infer_issued_date(text: str) -> Optional[str]:
                     if len(groups) == 1:
                         # Single group - try to parse as full date string
                         date_str = groups[0]
-                        parsed_date = _parse_date_string(date_str, month_names)
+                        parsed_date = _parse_date_string(date_str, MONTH_NAMES)
                         if parsed_date:
                             return parsed_date
                     
                     elif len(groups) == 2:
                         # Month and year
                         month_str, year_str = groups
-                        month = month_names.get(month_str.lower())
+                        month = MONTH_NAMES.get(month_str.lower())
                         if month and year_str.isdigit():
                             year = int(year_str)
                             if 1900 <= year <= 2100:
@@ -234,7 +278,7 @@ def infer_issued_date(text: str) -> Optional[str]:
                     
                     elif len(groups) == 3:
                         # Three components - figure out the format
-                        parsed_date = _parse_three_component_date(groups, month_names)
+                        parsed_date = _parse_three_component_date(groups, MONTH_NAMES)
                         if parsed_date:
                             return parsed_date
                             
@@ -268,18 +312,12 @@ def derive_year(text: str, issued_date: Optional[str] = None) -> Optional[int]:
     if not text:  # Safety check for None or empty text
         return None
         
-    year_patterns = [
-        r'\b(20[0-4]\d)\b',  # Years 2000-2049
-        r'\b(19[7-9]\d)\b',  # Years 1970-1999
-    ]
-    
     current_year = datetime.now().year
     found_years = []
     
-    lines = text.split('\n')
-    for line in lines[:20]:  # Check first 20 lines
-        for pattern in year_patterns:
-            matches = re.finditer(pattern, line)
+    for line in _head_lines(text, 20):  # Check first 20 lines
+        for pattern in YEAR_PATTERNS:
+            matches = pattern.finditer(line)
             for match in matches:
                 year = int(match.group(1))
                 if 1970 <= year <= current_year + 5:  # Reasonable year range
@@ -292,6 +330,7 @@ def derive_year(text: str, issued_date: Optional[str] = None) -> Optional[int]:
     return None
 
 
+@lru_cache(maxsize=64)
 def validate_category(category: str) -> str:
     """
     Validate and normalize document category.
@@ -343,15 +382,20 @@ def validate_category(category: str) -> str:
 
 # Helper functions
 
+def _head_lines(text: str, count: int) -> List[str]:
+    """First `count` lines of text without splitting the whole document."""
+    return text.split('\n', count)[:count]
+
+
 def _clean_title(title: str, max_length: int) -> str:
     """Clean and normalize title string."""
     if not title:
         return ""
     
     # Remove common artifacts
-    title = re.sub(r'^[^\w]*', '', title)  # Remove leading non-word chars
-    title = re.sub(r'[^\w]*$', '', title)  # Remove trailing non-word chars
-    title = re.sub(r'\s+', ' ', title)     # Normalize whitespace
+    title = LEADING_NON_WORD_RE.sub('', title)   # Remove leading non-word chars
+    title = TRAILING_NON_WORD_RE.sub('', title)  # Remove trailing non-word chars
+    title = WHITESPACE_RE.sub(' ', title)        # Normalize whitespace
     title = title.strip()
     
     # Truncate if too long
@@ -403,7 +447,7 @@ def _parse_date_string(date_str: str, month_names: Dict[str, int]) -> Optional[s
     date_str = date_str.strip()
     
     # Month Day, Year format
-    match = re.match(r'(\w+)\s+(\d{1,2}),?\s+(\d{4})', date_str, re.IGNORECASE)
+    match = MONTH_DAY_YEAR_RE.match(date_str)
     if match:
         month_str, day_str, year_str = match.groups()
         month = month_names.get(month_str.lower())
@@ -4,6 +4,7 @@ Pydantic schemas for ACEP document processing with strict category validation.
 Phase 0: Core data models with strict category enum validation.
 """
 
+import re
 from typing import List, Optional, Union
 from pydantic import BaseModel, Field, validator
 
@@ -16,6 +17,9 @@ CATEGORIES = {
     "External Advocacy &  Communications"
 }
 
+# ISO date format (YYYY-MM-DD)
+ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
 
 def validate_category(category: str) -> str:
     """
@@ -70,8 +74,7 @@ class DocumentMeta(BaseModel):
         """Basic ISO date format validation."""
         if v is not None and v:
             # Basic check for ISO date format (YYYY-MM-DD)
-            import re
-            if not re.match(r'^\d{4}-\d{2}-\d{2}$', v):
+            if not ISO_DATE_RE.match(v):
                 raise ValueError("issued_date must be in ISO format (YYYY-MM-DD)")
         return v
 
@@ -7,6 +7,12 @@ Phase 2: Detect basic headings to form blocks using Article/Section/Resolution p
 import re
 from typing import List, Dict, Tuple, Optional
 
+# Heading patterns for ACEP documents
+ARTICLE_HEADING_RE = re.compile(r'^Article\s+[IVXLC]+', re.IGNORECASE)          # Article I, Article II, etc.
+SECTION_HEADING_RE = re.compile(r'^Section\s+\d+(\.\d+)*', re.IGNORECASE)       # Section 1, Section 1.1, etc.
+RESOLUTION_HEADING_RE = re.compile(r'^Resolution\s*(No\.?)?\s*\d+', re.IGNORECASE)  # Resolution 1, Resolution No. 1, etc.
+HEADING_PATTERNS = (ARTICLE_HEADING_RE, SECTION_HEADING_RE, RESOLUTION_HEADING_RE)
+
 
 def split_into_blocks(cleaned_pages: List[str]) -> List[Dict]:
     """
@@ -28,16 +34,6 @@ def split_into_blocks(cleaned_pages: List[str]) -> List[Dict]:
     if not cleaned_pages:
         return []
     
-    # Heading patterns for ACEP documents
-    heading_patterns = [
-        r'^Article\s+[IVXLC]+',                    # Article I, Article II, etc.
-        r'^Section\s+\d+(\.\d+)*',                 # Section 1, Section 1.1, etc.
-        r'^Resolution\s*(No\.?)?\s*\d+',           # Resolution 1, Resolution No. 1, etc.
-    ]
-    
-    # Compile patterns for efficiency
-    compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in heading_patterns]
-    
     blocks = []
     current_block = None
     
@@ -54,7 +50,7 @@ def split_into_blocks(cleaned_pages: List[str]) -> List[Dict]:
                 
             # Check if line matches any heading pattern
             heading_match = None
-            for pattern in compiled_patterns:
+            for pattern in HEADING_PATTERNS:
                 if pattern.match(line_stripped):
                     heading_match = line_stripped
                     break
@@ -152,13 +148,13 @@ def extract_headings(text: str) -> List[Dict]:
 
 def _determine_heading_level(heading: str) -> int:
     """Determine heading level based on pattern."""
-    if re.match(r'^Article\s+[IVXLC]+', heading, re.IGNORECASE):
+    if ARTICLE_HEADING_RE.match(heading):
         return 1  # Top level
-    elif re.match(r'^Section\s+\d+(\.\d+)*', heading, re.IGNORECASE):
+    elif SECTION_HEADING_RE.match(heading):
         # Count dots to determine nesting level
         dots = heading.count('.')
         return 2 + dots
-    elif re.match(r'^Resolution\s*(No\.?)?\s*\d+', heading, re.IGNORECASE):
+    elif RESOLUTION_HEADING_RE.match(heading):
         return 1  # Top level
     else:
         return 3  # Default level
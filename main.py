@@ -2,17 +2,40 @@
 import os
 import sys
 import platform
+import asyncio
 import tempfile
 import json
 import time
+import uuid
+import random
+import threading
+import logging
 import re
 import hashlib
 import tiktoken
+import numpy as np
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime, date
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any, Union
 from dotenv import load_dotenv
 
+# Optional fast JSON serializer (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional streaming JSON parser for large uploaded outputs (falls back to json.load)
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -36,8 +59,8 @@ FRONTEND_PORT = CONFIG.get("frontend_port", "3000")
 
 print(f"🌐 Loaded configuration: IP={CURRENT_IP}, Backend Port={BACKEND_PORT}, Frontend Port={FRONTEND_PORT}")
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, Query, HTTPException, Request, BackgroundTasks
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -45,20 +68,22 @@ import uvicorn
 
 # Import ingestion modules
 from ingestion.schemas import CATEGORIES, DocumentMeta, Chunk, PreprocessResponse
-from ingestion.extract import extract_pdf, extract_docx, extract_txt_md
-from ingestion.clean import normalize_pages, join_pages, filter_table_of_contents, clean_page_text
+from ingestion.extract import extract_pdf, extract_pdf_parallel, create_extraction_pool, extract_docx, extract_txt_md
+from ingestion.clean import normalize_pages, join_pages, filter_table_of_contents, clean_page_text, strip_toc_lines
 from ingestion.structure import split_into_blocks
 from folder_router import FolderRouter, map_folder_to_category
-from ingestion.chunk import chunk_blocks, count_tokens as get_chunk_token_count
-from ingestion.metadata import (
-    infer_title, infer_document_number, infer_issued_date, derive_year, 
-    validate_category
-)
+from ingestion.chunk import chunk_blocks, get_tokenizer, count_tokens as get_chunk_token_count
+from ingestion.metadata import infer_metadata, validate_category, METADATA_HEAD_LINES
+
+# Per-chunk/per-citation debug output goes through logging (off unless DEBUG is enabled)
+logger = logging.getLogger(__name__)
 
 # Q&A imports
 from qa_config import (
     RETRIEVAL_BACKEND, TOP_K, FETCH_K, MMR_LAMBDA, ANSWER_MODEL,
-    SUPABASE_TABLE_BY_CATEGORY, CATEGORIES as QA_CATEGORIES
+    SUPABASE_TABLE_BY_CATEGORY, CATEGORIES as QA_CATEGORIES,
+    CATEGORIES_SET as QA_CATEGORIES_SET, CATEGORY_BY_COMPACT_NAME as QA_CATEGORY_BY_COMPACT_NAME,
+    USE_LOCAL_EMBEDDER, LOCAL_EMBED_MODEL, USE_UNIFIED_CHUNKS_TABLE, UNIFIED_CHUNKS_TABLE
 )
 try:
     from langchain_openai import OpenAIEmbeddings, ChatOpenAI
@@ -70,16 +95,42 @@ except ImportError:
 
 # Configuration constants
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024  # Stream uploads to disk 1MB at a time
+MAX_BATCH_FILES = 10             # Files per batch upload request
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "5"))  # Batch files processed at once
 MAX_TOKENS_PER_CHUNK = 1000      # Maximum chunk size
 MAX_OVERLAP_TOKENS = 200         # Maximum overlap
 SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.txt', '.md'}
 OCR_LANGUAGES = {'eng', 'fra', 'deu', 'spa', 'ita', 'por', 'rus', 'chi_sim', 'chi_tra', 'jpn', 'kor'}
+# Sorted once for error messages and the info endpoints
+SUPPORTED_EXTENSIONS_SORTED = tuple(sorted(SUPPORTED_EXTENSIONS))
+OCR_LANGUAGES_SORTED = tuple(sorted(OCR_LANGUAGES))
+CATEGORIES_SORTED = tuple(sorted(CATEGORIES))
+
+# Every ingestion/Q&A category needs a vector table; fail at startup instead of
+# sending queries for a category name that matches no table
+_UNMAPPED_CATEGORIES = (set(CATEGORIES) | set(QA_CATEGORIES)) - set(SUPABASE_TABLE_BY_CATEGORY)
+if _UNMAPPED_CATEGORIES:
+    raise RuntimeError(f"Categories without a Supabase table mapping: {sorted(_UNMAPPED_CATEGORIES)}")
 
 # JSON save setup
 # Directory for saving processed outputs
 SAVE_DIR = Path("./processed_output/")
 SAVE_DIR.mkdir(exist_ok=True)
 
+# Bucket edges for chunk size distribution: small (<200), normal (200-1000), large (>1000)
+TOKEN_BUCKET_EDGES = np.array([200, 1001], dtype=np.int32)
+
+
+def count_token_buckets(chunks: List[Dict]) -> tuple:
+    """Count (small, normal, large) chunks in a single vectorized pass over token counts."""
+    token_counts = np.fromiter((chunk.get("token_count", 0) for chunk in chunks),
+                               dtype=np.int32, count=len(chunks))
+    buckets = np.searchsorted(TOKEN_BUCKET_EDGES, token_counts, side="right")
+    small, normal, large = np.bincount(buckets, minlength=3).tolist()
+    return small, normal, large
+
+
 def validate_embedding_safety(chunks: List[Dict], target_range: tuple = (400, 800)) -> Dict:
     """
     Embedding safety validation pass with deduplication and quality checks.
@@ -89,7 +140,8 @@ def validate_embedding_safety(chunks: List[Dict], target_range: tuple = (400, 80
         target_range: Tuple of (min_tokens, max_tokens) for target range
     
     Returns:
-        Dict with validation results and warnings
+        Dict with validation results and warnings; "keep_indices" holds the
+        indices of unique chunks so callers can filter the original list
     """
     
     if not chunks:
@@ -109,23 +161,26 @@ def validate_embedding_safety(chunks: List[Dict], target_range: tuple = (400, 80
     
     # Deduplication tracking with smarter logic
     text_hashes = set()
-    similarity_hashes = set()  # For detecting near-duplicates
-    unique_chunks = []
+    similarity_index = {}  # Similarity hash -> index of first chunk (near-duplicates)
+    keep_indices = set()  # Indices of unique chunks (avoids copying large chunk dicts)
     
     for i, chunk in enumerate(chunks):
-        text = chunk.get("text") or ""  # Handle None values safely
-        text = text.strip() if text else ""  # Safe strip operation
+        text = (chunk.get("text") or "").strip()  # Handle None values safely
         token_count = chunk.get("token_count", 0)
         
         if not text or token_count < 50:  # Skip very small chunks
             continue
         
-        # Calculate exact hash for identical content
-        text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
+        # Calculate exact hash for identical content (raw 64-bit digest, no hex string)
+        text_bytes = text.encode('utf-8')
+        text_hash = hashlib.blake2b(text_bytes, digest_size=8).digest()
         
         # Calculate similarity hash for near-duplicates (normalized text)
         normalized_text = ' '.join(text.split()).lower()  # Normalize whitespace and case
-        similarity_hash = hashlib.md5(normalized_text.encode('utf-8')).hexdigest()
+        if normalized_text == text:
+            similarity_hash = text_hash  # Already normalized - reuse the encoded hash
+        else:
+            similarity_hash = hashlib.blake2b(normalized_text.encode('utf-8'), digest_size=8).digest()
         
         # Check for exact duplicates
         if text_hash in text_hashes:
@@ -134,25 +189,21 @@ def validate_embedding_safety(chunks: List[Dict], target_range: tuple = (400, 80
             continue
         
         # Check for near-duplicates only if chunks are substantial (>100 tokens)
-        if token_count > 100 and similarity_hash in similarity_hashes:
+        if token_count > 100 and similarity_hash in similarity_index:
             # Additional check: ensure it's not just similar structure but different content
-            existing_similar = False
-            for existing_chunk in unique_chunks:
-                existing_normalized = ' '.join(existing_chunk.get("text", "").split()).lower()
-                if existing_normalized == normalized_text:
-                    existing_similar = True
-                    break
+            existing_chunk = chunks[similarity_index[similarity_hash]]
+            existing_normalized = ' '.join((existing_chunk.get("text") or "").split()).lower()
             
-            if existing_similar:
+            if existing_normalized == normalized_text:
                 stats["duplicates_found"] += 1
                 stats["warnings"].append(f"Near-duplicate chunk found at index {i}")
                 continue
         
-        # Add to tracking sets and unique chunks
+        # Add to tracking sets and unique indices
         text_hashes.add(text_hash)
         if token_count > 100:  # Only track similarity for substantial chunks
-            similarity_hashes.add(similarity_hash)
-        unique_chunks.append(chunk)
+            similarity_index.setdefault(similarity_hash, i)
+        keep_indices.add(i)
         
         # Token range validation
         if min_target <= token_count <= max_target:
@@ -165,7 +216,8 @@ def validate_embedding_safety(chunks: List[Dict], target_range: tuple = (400, 80
             stats["above_range"] += 1
     
     # Update total after deduplication
-    stats["unique_chunks"] = len(unique_chunks)
+    stats["unique_chunks"] = len(keep_indices)
+    stats["keep_indices"] = keep_indices
     
     # Calculate percentages
     if stats["unique_chunks"] > 0:
@@ -209,7 +261,7 @@ def enhance_chunk_quality(chunks: List[Dict], target_range: tuple = (400, 800))
     
     # Import tokenizer for accurate token counting
     try:
-        tokenizer = tiktoken.get_encoding("cl100k_base")
+        tokenizer = get_tokenizer()
     except ImportError:
         tokenizer = None
         print("WARNING: tiktoken not available, using approximate token counts")
@@ -224,14 +276,26 @@ def enhance_chunk_quality(chunks: List[Dict], target_range: tuple = (400, 800))
             # Fallback to word count approximation
             return int(len(text.split()) * 1.3)
     
+    # Normalize texts once into a parallel list (merge lookahead reuses it)
+    texts = [(chunk.get("text") or "").strip() for chunk in chunks]  # Handle None values safely
+    
+    # Reuse the token ids chunk_blocks already computed; the rest are counted
+    # in one native, multi-threaded tiktoken call
+    cached_ids = [chunk.pop("_token_ids", None) for chunk in chunks]
+    if tokenizer:
+        missing = [i for i, ids in enumerate(cached_ids) if ids is None]
+        token_counts = [len(ids) if ids is not None else 0 for ids in cached_ids]
+        for i, tokens in zip(missing, tokenizer.encode_batch([texts[i] for i in missing])):
+            token_counts[i] = len(tokens)
+    else:
+        token_counts = [count_tokens(text) for text in texts]
+    
     enhanced_chunks = []
     i = 0
     
     while i < len(chunks):
         chunk = chunks[i]
-        text = chunk.get("text") or ""  # Handle None values safely
-        text = text.strip() if text else ""  # Safe strip operation
-        token_count = chunk.get("token_count", 0)
+        text = texts[i]
         
         # Skip empty chunks
         if not text:
@@ -239,14 +303,13 @@ def enhance_chunk_quality(chunks: List[Dict], target_range: tuple = (400, 800))
             continue
         
         # Recalculate accurate token count
-        accurate_count = count_tokens(text)
+        accurate_count = token_counts[i]
         chunk["token_count"] = accurate_count
         
         # RULE 1: Merge very small chunks (< 200 tokens) with next chunk
         if accurate_count < 200 and i < len(chunks) - 1:
             next_chunk = chunks[i + 1]
-            next_text = next_chunk.get("text") or ""  # Handle None safely
-            next_text = next_text.strip() if next_text else ""  # Safe strip
+            next_text = texts[i + 1]
             
             if next_text:  # Only merge if next chunk has content
                 combined_text = text + "\n\n" + next_text
@@ -268,18 +331,17 @@ def enhance_chunk_quality(chunks: List[Dict], target_range: tuple = (400, 800))
         
         # RULE 2: Split very large chunks (> 1000 tokens) at paragraph boundaries
         elif accurate_count > 1000:
-            paragraphs = text.split('\n\n')
+            paragraphs = [para.strip() for para in text.split('\n\n')]
+            paragraphs = [para for para in paragraphs if para]
+            if tokenizer:
+                para_counts = [len(tokens) for tokens in tokenizer.encode_batch(paragraphs)]
+            else:
+                para_counts = [count_tokens(para) for para in paragraphs]
             current_text = ""
             current_tokens = 0
             split_index = 0
             
-            for para in paragraphs:
-                para = para.strip()
-                if not para:
-                    continue
-                    
-                para_tokens = count_tokens(para)
-                
+            for para, para_tokens in zip(paragraphs, para_counts):
                 # If adding this paragraph would exceed 1000 tokens, save current chunk
                 if current_tokens > 0 and current_tokens + para_tokens > 1000:
                     if current_text:
@@ -327,9 +389,7 @@ def enhance_chunk_quality(chunks: List[Dict], target_range: tuple = (400, 800))
     # Simple statistics (no complex targeting)
     if enhanced_chunks:
         total_chunks = len(enhanced_chunks)
-        small_chunks = sum(1 for chunk in enhanced_chunks if chunk.get("token_count", 0) < 200)
-        large_chunks = sum(1 for chunk in enhanced_chunks if chunk.get("token_count", 0) > 1000)
-        normal_chunks = total_chunks - small_chunks - large_chunks
+        small_chunks, normal_chunks, large_chunks = count_token_buckets(enhanced_chunks)
         
         print(f"SIMPLIFIED CHUNKING: {total_chunks} chunks created")
         print(f"Distribution: {small_chunks} small (<200), {normal_chunks} normal (200-1000), {large_chunks} large (>1000)")
@@ -349,10 +409,8 @@ def validate_chunks_quality(chunks: List[Dict], target_range: tuple = (400, 800)
     
     total_chunks = len(chunks)
     
-    # Count distribution by simple size categories
-    small_chunks = sum(1 for chunk in chunks if chunk.get("token_count", 0) < 200)
-    normal_chunks = sum(1 for chunk in chunks if 200 <= chunk.get("token_count", 0) <= 1000)
-    large_chunks = sum(1 for chunk in chunks if chunk.get("token_count", 0) > 1000)
+    # Count distribution by simple size categories (one vectorized pass)
+    small_chunks, normal_chunks, large_chunks = count_token_buckets(chunks)
     
     quality_report = {
         "total_chunks": total_chunks,
@@ -365,22 +423,21 @@ def validate_chunks_quality(chunks: List[Dict], target_range: tuple = (400, 800)
     }
     
     return quality_report
-    
-    return final_chunks
+
+
+# Look for 4-digit years in filename
+FILENAME_YEAR_PATTERNS = [re.compile(pattern) for pattern in [
+    r'(\d{4})',  # Any 4-digit number
+    r'[_\-\s](\d{4})[_\-\s\.]',  # Year surrounded by separators
+]]
+SLUG_INVALID_CHARS_RE = re.compile(r"[^\w\s-]+", re.UNICODE)
+SLUG_WHITESPACE_RE = re.compile(r"\s+")
 
 
 def extract_year_from_filename(filename: str) -> Optional[int]:
     """Extract year from filename using regex patterns."""
-    import re
-    
-    # Look for 4-digit years in filename
-    year_patterns = [
-        r'(\d{4})',  # Any 4-digit number
-        r'[_\-\s](\d{4})[_\-\s\.]',  # Year surrounded by separators
-    ]
-    
-    for pattern in year_patterns:
-        match = re.search(pattern, filename)
+    for pattern in FILENAME_YEAR_PATTERNS:
+        match = pattern.search(filename)
         if match:
             year = int(match.group(1))
             # Validate year range (1970-2030)
@@ -394,12 +451,22 @@ def _safe_slug(text: str) -> str:
     """Convert text to a safe filename slug."""
     if not text:
         return "document"
-    import re
-    text = re.sub(r"[^\w\s-]+", "", text, flags=re.UNICODE)
-    text = re.sub(r"\s+", "_", text.strip())
+    text = SLUG_INVALID_CHARS_RE.sub("", text)
+    text = SLUG_WHITESPACE_RE.sub("_", text.strip())
     return text[:80] or "document"
 
 
+def _chunk_id(text: str) -> str:
+    """
+    Stable identity key for a chunk: SHA-256 of its text.
+    
+    Must match sha256_text in build_embeddings.py and generate_chunk_id in
+    generate_embeddings.py, which write the same vs_* tables; a different
+    scheme would stop upserts from deduplicating existing rows.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 def is_valid_date(date_str: str) -> bool:
     """Validate date format YYYY-MM-DD and not in the future."""
     if not date_str:
@@ -424,8 +491,6 @@ def create_chunks(text: str, max_tokens: int = 1000, overlap: int = 200) -> List
         return []
     
     # Split by double newlines first (paragraphs)
-    if not text:  # Additional safety check
-        return []
     paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
     
     chunks = []
@@ -479,20 +544,204 @@ def save_preprocess_json(data: Dict, filename: str) -> str:
     timestamp = int(time.time())
     out_path = category_dir / f"{title_slug}__{timestamp}.json"
     
-    # Save JSON
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # Save compact JSON (orjson writes UTF-8 bytes directly, much faster on large documents)
+    if orjson:
+        with open(out_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+    else:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            f.write("\n")
     
     return str(out_path)
 
 
-async def generate_and_store_embeddings(processed_data: dict, category: str) -> dict:
+# Process-wide Supabase client, reused so its connection pool stays warm
+_SUPABASE_CLIENT = None
+
+
+def get_supabase_client():
+    """
+    Return the process-wide Supabase client, creating it on first use.
+    
+    Raises:
+        ImportError: If the supabase package is not installed
+        RuntimeError: If Supabase credentials are not configured
+    """
+    global _SUPABASE_CLIENT
+    
+    if _SUPABASE_CLIENT is None:
+        from supabase import create_client
+        
+        supabase_url = os.environ.get("SUPABASE_URL")
+        supabase_key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_KEY")
+        
+        if not supabase_url or not supabase_key:
+            raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY/SUPABASE_KEY")
+        
+        _SUPABASE_CLIENT = create_client(supabase_url, supabase_key)
+    
+    return _SUPABASE_CLIENT
+
+
+def vector_table_name(category: str) -> str:
+    """Supabase table holding a category's chunks (per-category or unified)."""
+    if USE_UNIFIED_CHUNKS_TABLE:
+        return UNIFIED_CHUNKS_TABLE
+    return SUPABASE_TABLE_BY_CATEGORY[category]
+
+
+def scope_to_category(query, category: str):
+    """Restrict a query on the unified chunks table to one category (no-op otherwise)."""
+    return query.eq("category", category) if USE_UNIFIED_CHUNKS_TABLE else query
+
+
+# Persistent HTTP client and document embedder shared across uploads
+_INGEST_HTTP_CLIENT = None
+_INGEST_EMBEDDER = None
+
+
+def get_ingest_embedder():
+    """
+    Return the process-wide document embedder.
+    
+    The embedder is backed by one long-lived httpx connection pool (HTTP/2 when
+    the h2 package is installed) so repeated uploads skip TCP/TLS setup.
+    """
+    global _INGEST_HTTP_CLIENT, _INGEST_EMBEDDER
+    
+    if _INGEST_EMBEDDER is None and USE_LOCAL_EMBEDDER:
+        # Documents must be embedded with the same model as queries
+        _INGEST_EMBEDDER = LocalEmbedder(LOCAL_EMBED_MODEL)
+    
+    if _INGEST_EMBEDDER is None:
+        import httpx
+        from langchain_openai import OpenAIEmbeddings
+        from embeddings_config import OPENAI_EMBED_MODEL
+        
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        try:
+            _INGEST_HTTP_CLIENT = httpx.Client(http2=True, timeout=30, limits=limits)
+        except ImportError:
+            # h2 not installed - keep connection reuse over HTTP/1.1
+            _INGEST_HTTP_CLIENT = httpx.Client(timeout=30, limits=limits)
+        
+        _INGEST_EMBEDDER = OpenAIEmbeddings(model=OPENAI_EMBED_MODEL, http_client=_INGEST_HTTP_CLIENT)
+    
+    return _INGEST_EMBEDDER
+
+
+# Embedding batch settings for document uploads
+EMBED_BATCH_SIZE = 96          # Chunks per embeddings request
+EMBED_CONCURRENCY = 8          # Embedding requests in flight per upload
+EMBED_MAX_RETRIES = 5          # Attempts on rate limit / server errors
+EMBED_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+UPSERT_BATCH_SIZE = 500        # Rows per Supabase upsert request
+ID_LOOKUP_BATCH_SIZE = 100     # Ids per `in` filter (PostgREST URL length limits)
+
+
+def _to_pgvector_literal(embedding) -> str:
+    """
+    Format an embedding as a pgvector text literal ("[0.1,0.2,...]").
+    
+    Values are written as shortest float32 reprs: pgvector stores float32, so
+    this is lossless and roughly half the size of float64 JSON numbers.
+    """
+    return "[" + ",".join(np.asarray(embedding, dtype=np.float32).astype(str).tolist()) + "]"
+
+
+async def _embed_documents_with_backoff(embedder, texts: List[str]) -> List[List[float]]:
+    """
+    Embed a batch of texts off the event loop, retrying with exponential
+    backoff when the API answers 429 or 5xx.
+    """
+    for attempt in range(EMBED_MAX_RETRIES):
+        try:
+            return await asyncio.to_thread(embedder.embed_documents, texts)
+        except Exception as e:
+            status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+            if status not in EMBED_RETRYABLE_STATUS or attempt == EMBED_MAX_RETRIES - 1:
+                raise
+            delay = 2 ** attempt + random.random()
+            print(f"⚠️ Embedding request failed with {status}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+def _embedding_table(category: str) -> tuple:
+    """Resolve (normalized category, Supabase table) for storing a category's chunks."""
+    from embeddings_config import CATEGORY_MAP, SUPABASE_TABLE_BY_CATEGORY
+    
+    normalized_category = CATEGORY_MAP.get(category, category)
+    table_name = SUPABASE_TABLE_BY_CATEGORY.get(normalized_category)
+    
+    if not table_name:
+        raise ValueError(f"No table mapping found for category: {category}")
+    if USE_UNIFIED_CHUNKS_TABLE:
+        table_name = UNIFIED_CHUNKS_TABLE
+    return normalized_category, table_name
+
+
+async def _fetch_existing_embeddings(client, table_name: str, chunk_ids: List[str]) -> Dict[str, str]:
+    """
+    Look up embeddings already stored for the given chunk ids.
+    
+    Chunk ids are content hashes, so a stored row with the same id holds the
+    embedding of the same text. Returns id -> pgvector literal; a failed lookup
+    only means everything is embedded again.
+    """
+    id_batches = [chunk_ids[i:i + ID_LOOKUP_BATCH_SIZE] for i in range(0, len(chunk_ids), ID_LOOKUP_BATCH_SIZE)]
+    try:
+        results = await asyncio.gather(*[
+            asyncio.to_thread(client.table(table_name).select("id, embedding").in_("id", batch_ids).execute)
+            for batch_ids in id_batches
+        ])
+    except Exception as e:
+        print(f"⚠️ Stored embedding lookup failed, embedding all chunks: {e}")
+        return {}
+    
+    known = {}
+    for result in results:
+        for row in result.data or []:
+            embedding = row.get("embedding")
+            if embedding:
+                known[row["id"]] = embedding if isinstance(embedding, str) else _to_pgvector_literal(embedding)
+    return known
+
+
+async def fetch_reusable_embeddings(processed_data: dict, category: str) -> Dict[str, str]:
+    """
+    Look up stored embeddings for a preprocessed document's chunks.
+    
+    Call this before deleting the document's previous version: a re-upload
+    mostly repeats the old chunk texts, and their embeddings go with the delete.
+    
+    Returns:
+        Dict of chunk id -> pgvector literal for generate_and_store_embeddings
+    """
+    chunk_ids = list(dict.fromkeys(_chunk_id(chunk.get("text", "")) for chunk in processed_data.get("chunks", [])))
+    if not chunk_ids:
+        return {}
+    
+    try:
+        _, table_name = _embedding_table(category)
+        client = get_supabase_client()
+    except Exception as e:
+        # generate_and_store_embeddings reports these errors for the upload
+        print(f"⚠️ Stored embedding lookup skipped: {e}")
+        return {}
+    return await _fetch_existing_embeddings(client, table_name, chunk_ids)
+
+
+async def generate_and_store_embeddings(processed_data: dict, category: str,
+                                        known_embeddings: Optional[Dict[str, str]] = None) -> dict:
     """
     Generate embeddings for processed document chunks and store them in Supabase.
     
     Args:
         processed_data: The preprocessed document data with chunks
         category: Document category for table routing
+        known_embeddings: Stored embeddings by chunk id (from
+            fetch_reusable_embeddings); these chunks skip the embeddings API
         
     Returns:
         dict: Status and results of embedding generation
@@ -500,31 +749,19 @@ async def generate_and_store_embeddings(processed_data: dict, category: str) ->
     try:
         # Import required modules
         from langchain_core.documents import Document
-        from langchain_openai import OpenAIEmbeddings
-        from supabase import create_client
-        from embeddings_config import CATEGORY_MAP, SUPABASE_TABLE_BY_CATEGORY, OPENAI_EMBED_MODEL
+        from postgrest.types import ReturnMethod
         
         print(f"🔄 Starting embedding generation for category: {category}")
         
-        # Initialize embeddings
-        embedder = OpenAIEmbeddings(model=OPENAI_EMBED_MODEL)
-        
-        # Get Supabase client
-        supabase_url = os.environ.get("SUPABASE_URL")
-        supabase_key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_KEY")
+        # Reuse the shared embedder (persistent connection pool)
+        embedder = get_ingest_embedder()
         
-        if not supabase_url or not supabase_key:
-            raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY/SUPABASE_KEY")
-            
-        client = create_client(supabase_url, supabase_key)
+        # Reuse the shared Supabase client (persistent connection pool)
+        client = get_supabase_client()
         
         # Map category to table
-        normalized_category = CATEGORY_MAP.get(category, category)
-        table_name = SUPABASE_TABLE_BY_CATEGORY.get(normalized_category)
+        normalized_category, table_name = _embedding_table(category)
         
-        if not table_name:
-            raise ValueError(f"No table mapping found for category: {category}")
-            
         print(f"📊 Using table: {table_name} for category: {normalized_category}")
         
         # Process chunks into Documents
@@ -549,7 +786,7 @@ async def generate_and_store_embeddings(processed_data: dict, category: str) ->
         for chunk in chunks:
             # Generate unique chunk ID
             chunk_text = chunk.get("text", "")
-            chunk_id = hashlib.sha256(chunk_text.encode()).hexdigest()
+            chunk_id = _chunk_id(chunk_text)
             
             # Prepare metadata
             metadata = {
@@ -578,73 +815,104 @@ async def generate_and_store_embeddings(processed_data: dict, category: str) ->
             
         print(f"📝 Processing {len(documents)} chunks")
         
-        # Generate embeddings in batches
-        batch_size = 10  # Smaller batches for safety
-        total_inserted = 0
-        
-        for i in range(0, len(documents), batch_size):
-            batch_docs = documents[i:i+batch_size]
-            batch_texts = [doc.page_content for doc in batch_docs]
-            batch_metas = [doc.metadata for doc in batch_docs]
+        def build_row(doc, embedding_literal: str) -> dict:
+            meta = doc.metadata
             
-            print(f"🔄 Processing batch {i//batch_size + 1}/{(len(documents) + batch_size - 1)//batch_size}")
+            # Clean text (remove any null characters)
+            clean_text = doc.page_content.replace('\x00', '')
             
-            # Generate embeddings
-            embeddings = embedder.embed_documents(batch_texts)
+            # Build document metadata
+            doc_meta = {
+                "title": meta.get("title", ""),
+                "category": meta.get("category", ""),
+                "issued_date": meta.get("issued_date", ""),
+                "year": meta.get("year"),
+                "document_number": meta.get("document_number", ""),
+                "filename": meta.get("source_file", ""),
+                "version": meta.get("version", "1")
+            }
             
-            # Prepare rows for upsert
-            rows = []
-            for j, embedding in enumerate(embeddings):
-                meta = batch_metas[j]
-                
-                # Clean text (remove any null characters)
-                clean_text = batch_texts[j].replace('\x00', '')
-                
-                # Build document metadata
-                doc_meta = {
+            row = {
+                "id": meta["id"],
+                "content": clean_text,
+                "metadata": {
+                    "document": doc_meta,
+                    "chunk": {
+                        "page_start": meta.get("page_start"),
+                        "page_end": meta.get("page_end"),
+                        "heading_path": meta.get("heading_path", ""),
+                        "chunk_index": meta.get("chunk_index"),
+                        "token_count": len(clean_text.split())  # Rough estimate
+                    },
+                    "source_file": meta.get("source_file", ""),
                     "title": meta.get("title", ""),
                     "category": meta.get("category", ""),
                     "issued_date": meta.get("issued_date", ""),
                     "year": meta.get("year"),
                     "document_number": meta.get("document_number", ""),
-                    "filename": meta.get("source_file", ""),
                     "version": meta.get("version", "1")
-                }
+                },
+                "embedding": embedding_literal
+            }
+            if USE_UNIFIED_CHUNKS_TABLE:
+                row["category"] = normalized_category
+            return row
+        
+        # Chunks whose text is already stored (same content-hash id) keep their
+        # embedding; only unseen chunks go to the embeddings API
+        known_embeddings = known_embeddings or {}
+        rows = [build_row(doc, known_embeddings[doc.metadata["id"]])
+                for doc in documents if doc.metadata["id"] in known_embeddings]
+        to_embed = [doc for doc in documents if doc.metadata["id"] not in known_embeddings]
+        if rows:
+            print(f"♻️ Reusing {len(rows)} stored embeddings, embedding {len(to_embed)} new chunks")
+        
+        # Embed in large batches with bounded concurrency so the network
+        # latency of the embedding requests overlaps
+        batches = [to_embed[i:i + EMBED_BATCH_SIZE] for i in range(0, len(to_embed), EMBED_BATCH_SIZE)]
+        total_batches = len(batches)
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+        
+        async def embed_batch(batch_num: int, batch_docs: list) -> list:
+            async with semaphore:
+                print(f"🔄 Processing batch {batch_num}/{total_batches}")
                 
-                row = {
-                    "id": meta["id"],
-                    "content": clean_text,
-                    "metadata": {
-                        "document": doc_meta,
-                        "chunk": {
-                            "page_start": meta.get("page_start"),
-                            "page_end": meta.get("page_end"),
-                            "heading_path": meta.get("heading_path", ""),
-                            "chunk_index": meta.get("chunk_index"),
-                            "token_count": len(clean_text.split())  # Rough estimate
-                        },
-                        "source_file": meta.get("source_file", ""),
-                        "title": meta.get("title", ""),
-                        "category": meta.get("category", ""),
-                        "issued_date": meta.get("issued_date", ""),
-                        "year": meta.get("year"),
-                        "document_number": meta.get("document_number", ""),
-                        "version": meta.get("version", "1")
-                    },
-                    "embedding": embedding
-                }
-                rows.append(row)
+                # Generate embeddings (one request for the whole batch)
+                embeddings = await _embed_documents_with_backoff(
+                    embedder, [doc.page_content for doc in batch_docs]
+                )
             
-            # Upsert to Supabase
-            try:
-                result = client.table(table_name).upsert(rows).execute()
-                total_inserted += len(rows)
-                print(f"✅ Uploaded batch {i//batch_size + 1}: {len(rows)} chunks")
-            except Exception as e:
-                print(f"❌ Error uploading batch {i//batch_size + 1}: {str(e)}")
-                raise
+            # Prepare rows for upsert
+            return [build_row(doc, _to_pgvector_literal(embedding)) for doc, embedding in zip(batch_docs, embeddings)]
+        
+        row_batches = await asyncio.gather(
+            *[embed_batch(n, batch_docs) for n, batch_docs in enumerate(batches, start=1)]
+        )
+        rows.extend(row for batch_rows in row_batches for row in batch_rows)
+        
+        # Write to Supabase in large bulk upserts; returning=minimal skips
+        # sending the inserted rows (and their embeddings) back
+        upsert_batches = [rows[i:i + UPSERT_BATCH_SIZE] for i in range(0, len(rows), UPSERT_BATCH_SIZE)]
+        
+        async def upsert_batch(batch_num: int, batch_rows: list) -> int:
+            async with semaphore:
+                try:
+                    await asyncio.to_thread(
+                        client.table(table_name).upsert(batch_rows, returning=ReturnMethod.minimal).execute
+                    )
+                    print(f"✅ Uploaded batch {batch_num}/{len(upsert_batches)}: {len(batch_rows)} chunks")
+                except Exception as e:
+                    print(f"❌ Error uploading batch {batch_num}: {str(e)}")
+                    raise
+            return len(batch_rows)
+        
+        inserted_counts = await asyncio.gather(
+            *[upsert_batch(n, batch_rows) for n, batch_rows in enumerate(upsert_batches, start=1)]
+        )
+        total_inserted = sum(inserted_counts)
                 
         print(f"🎉 Successfully embedded and stored {total_inserted} chunks in {table_name}")
+        invalidate_search_cache(table_name)
         
         return {
             "status": "success",
@@ -676,19 +944,12 @@ async def delete_document_embeddings(document_title: str, category: str) -> dict
     """
     try:
         # Import required modules
-        from supabase import create_client
         from embeddings_config import CATEGORY_MAP, SUPABASE_TABLE_BY_CATEGORY
         
         print(f"🗑️ Starting deletion of embeddings for document: {document_title} in category: {category}")
         
-        # Get Supabase client
-        supabase_url = os.environ.get("SUPABASE_URL")
-        supabase_key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY/SUPABASE_KEY")
-            
-        client = create_client(supabase_url, supabase_key)
+        # Reuse the shared Supabase client (persistent connection pool)
+        client = get_supabase_client()
         
         # Map category to table
         normalized_category = CATEGORY_MAP.get(category, category)
@@ -696,6 +957,8 @@ async def delete_document_embeddings(document_title: str, category: str) -> dict
         
         if not table_name:
             raise ValueError(f"No table mapping found for category: {category}")
+        if USE_UNIFIED_CHUNKS_TABLE:
+            table_name = UNIFIED_CHUNKS_TABLE
             
         print(f"📊 Using table: {table_name} for category: {normalized_category}")
         
@@ -705,15 +968,18 @@ async def delete_document_embeddings(document_title: str, category: str) -> dict
             existing_chunks = None
             
             # Strategy 1: Exact title match
-            existing_chunks = client.table(table_name).select("id, metadata").eq(
-                "metadata->>title", document_title
+            existing_chunks = scope_to_category(
+                client.table(table_name).select("id").eq("metadata->>title", document_title),
+                normalized_category
             ).execute()
             
             # Strategy 2: If no exact match, try partial title match
             if not existing_chunks.data:
                 print(f"🔍 No exact title match, trying partial match for '{document_title}'")
                 # Get all documents and filter by partial title match
-                all_chunks = client.table(table_name).select("id, metadata").execute()
+                all_chunks = scope_to_category(
+                    client.table(table_name).select("id, metadata"), normalized_category
+                ).execute()
                 if all_chunks.data:
                     # Filter by partial title match
                     matching_chunks = []
@@ -743,28 +1009,29 @@ async def delete_document_embeddings(document_title: str, category: str) -> dict
             chunk_ids = [chunk["id"] for chunk in existing_chunks.data]
             print(f"📝 Found {len(chunk_ids)} chunks to delete for document '{document_title}'")
             
-            # Delete chunks in batches to avoid timeout
-            batch_size = 50
-            total_deleted = 0
+            # Delete all chunks with concurrent requests; ids are still split so the
+            # `in` filter stays within PostgREST's URL length limits
+            batch_size = 100
+            id_batches = [chunk_ids[i:i+batch_size] for i in range(0, len(chunk_ids), batch_size)]
+            print(f"🔄 Deleting {len(chunk_ids)} chunks in {len(id_batches)} concurrent request(s)")
             
-            for i in range(0, len(chunk_ids), batch_size):
-                batch_ids = chunk_ids[i:i+batch_size]
-                
-                print(f"🔄 Deleting batch {i//batch_size + 1}/{(len(chunk_ids) + batch_size - 1)//batch_size}")
-                
-                # Delete this batch
-                result = client.table(table_name).delete().in_("id", batch_ids).execute()
-                
-                # Count successful deletions
+            results = await asyncio.gather(*[
+                asyncio.to_thread(
+                    scope_to_category(client.table(table_name).delete().in_("id", batch_ids), normalized_category).execute
+                )
+                for batch_ids in id_batches
+            ])
+            
+            total_deleted = 0
+            for batch_ids, result in zip(id_batches, results):
+                # Count successful deletions; if no data returned, assume all were deleted
                 if hasattr(result, 'data') and result.data:
                     total_deleted += len(result.data)
                 else:
-                    # If no data returned, assume all were deleted
                     total_deleted += len(batch_ids)
-                    
-                print(f"✅ Deleted batch {i//batch_size + 1}: {len(batch_ids)} chunks")
                 
             print(f"🎉 Successfully deleted {total_deleted} chunks for document '{document_title}' from {table_name}")
+            invalidate_search_cache(table_name)
             
             return {
                 "status": "success",
@@ -807,10 +1074,68 @@ class AskResponse(BaseModel):
     answer: str
     citations: List[dict]  # [{title, category, pages, heading_path, chunk_index}]
 
+class LocalEmbedder:
+    """
+    In-process FastEmbed (ONNX Runtime) embedder with the embed_query /
+    embed_documents interface of OpenAIEmbeddings. The model loads lazily
+    on first use.
+    """
+    
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+    
+    @property
+    def model(self):
+        if self._model is None:
+            try:
+                from fastembed import TextEmbedding
+            except ImportError:
+                raise ImportError("USE_LOCAL_EMBEDDER requires fastembed. Install with: pip install fastembed")
+            self._model = TextEmbedding(model_name=self.model_name, threads=os.cpu_count())
+        return self._model
+    
+    def embed_query(self, text: str) -> List[float]:
+        return next(iter(self.model.query_embed([text]))).tolist()
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return [embedding.tolist() for embedding in self.model.query_embed(texts)]
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [embedding.tolist() for embedding in self.model.embed(texts)]
+
+
+def _build_qa_http_clients():
+    """
+    Build the sync and async httpx clients shared by the Q&A OpenAI calls.
+    
+    Long-lived pools keep connections warm between questions; HTTP/2 (when the
+    h2 package is installed) multiplexes concurrent requests over one connection.
+    """
+    import httpx
+    
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=20)
+    timeout = httpx.Timeout(120, connect=10)  # Non-streamed answers can take a while
+    try:
+        return (
+            httpx.Client(http2=True, timeout=timeout, limits=limits),
+            httpx.AsyncClient(http2=True, timeout=timeout, limits=limits)
+        )
+    except ImportError:
+        # h2 not installed - keep connection reuse over HTTP/1.1
+        return httpx.Client(timeout=timeout, limits=limits), httpx.AsyncClient(timeout=timeout, limits=limits)
+
+
 # Initialize Q&A components if available
 if QA_AVAILABLE and os.getenv("OPENAI_API_KEY"):
-    EMB = OpenAIEmbeddings(model="text-embedding-3-small")
-    LLM = ChatOpenAI(model=ANSWER_MODEL, temperature=0)
+    _QA_HTTP_CLIENT, _QA_ASYNC_HTTP_CLIENT = _build_qa_http_clients()
+    EMB = LocalEmbedder(LOCAL_EMBED_MODEL) if USE_LOCAL_EMBEDDER else OpenAIEmbeddings(
+        model="text-embedding-3-small", http_client=_QA_HTTP_CLIENT, http_async_client=_QA_ASYNC_HTTP_CLIENT
+    )
+    LLM = ChatOpenAI(
+        model=ANSWER_MODEL, temperature=0,
+        http_client=_QA_HTTP_CLIENT, http_async_client=_QA_ASYNC_HTTP_CLIENT
+    )
     
     SYSTEM = """You are Sharon, a helpful document analysis assistant for an emergency medicine organization. Your role is to understand user intent and provide helpful information from organizational documents.
 
@@ -877,6 +1202,7 @@ Citations:
 
 Generate one citation per distinct source document. Do NOT combine sources."""
 
+    # Kept for callers that still compose PROMPT | LLM
     PROMPT = ChatPromptTemplate.from_messages([
         ("system", SYSTEM),
         ("human", HUMAN)
@@ -884,6 +1210,225 @@ Generate one citation per distinct source document. Do NOT combine sources."""
 else:
     EMB = LLM = PROMPT = None
 
+
+def build_answer_messages(inputs: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Render the Q&A prompt as OpenAI chat messages.
+    
+    Plain str.format_map over the module-level templates, skipping the
+    per-call variable and role validation of ChatPromptTemplate.
+    """
+    return [
+        {"role": "system", "content": SYSTEM},
+        {"role": "user", "content": HUMAN.format_map(defaultdict(str, inputs))}
+    ]
+
+# Retrieval caches: query embeddings (LRU) and search RPC results (TTL)
+SEARCH_CACHE_MAX_ENTRIES = 2048
+SEARCH_CACHE_TTL_SECONDS = 600
+_SEARCH_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires_at, rows)
+_SEARCH_CACHE_LOCK = threading.Lock()  # Per-category searches run in worker threads
+_TABLE_VERSIONS: Dict[str, int] = {}  # Bumped whenever a table's rows change
+
+# Per-category document listings (TTL, keyed on the table version above)
+DOCUMENTS_CACHE_TTL_SECONDS = 300
+_DOCUMENTS_CACHE: Dict[str, tuple] = {}  # category -> (expires_at, table_version, (documents, filenames))
+
+
+QUERY_EMBED_CACHE_MAX_ENTRIES = 4096
+_QUERY_EMBED_CACHE: "OrderedDict[str, tuple]" = OrderedDict()  # normalized question -> embedding
+_QUERY_EMBED_CACHE_LOCK = threading.Lock()  # Retrievers read it from worker threads
+
+# Concurrent questions are embedded together in one request
+QUERY_BATCH_MAX_SIZE = 16
+QUERY_BATCH_MAX_WAIT_SECONDS = 0.02
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _get_cached_query_embedding(normalized: str) -> Optional[tuple]:
+    with _QUERY_EMBED_CACHE_LOCK:
+        embedding = _QUERY_EMBED_CACHE.get(normalized)
+        if embedding is not None:
+            _QUERY_EMBED_CACHE.move_to_end(normalized)
+        return embedding
+
+
+def _cache_query_embedding(normalized: str, embedding) -> tuple:
+    embedding = tuple(embedding)
+    with _QUERY_EMBED_CACHE_LOCK:
+        _QUERY_EMBED_CACHE[normalized] = embedding
+        _QUERY_EMBED_CACHE.move_to_end(normalized)
+        while len(_QUERY_EMBED_CACHE) > QUERY_EMBED_CACHE_MAX_ENTRIES:
+            _QUERY_EMBED_CACHE.popitem(last=False)
+    return embedding
+
+
+def _embed_queries(texts: List[str]) -> List[List[float]]:
+    """Embed several questions in one call (OpenAIEmbeddings.embed_query is embed_documents of one text)."""
+    if isinstance(EMB, LocalEmbedder):
+        return EMB.embed_queries(texts)
+    return EMB.embed_documents(texts)
+
+
+def embed_query_cached(query: str) -> List[float]:
+    """
+    Embed a question, reusing the embedding for repeated questions.
+    
+    The cache is keyed on the normalized question; the original text is what
+    gets embedded.
+    """
+    normalized = _normalize_query(query)
+    embedding = _get_cached_query_embedding(normalized)
+    if embedding is None:
+        embedding = _cache_query_embedding(normalized, EMB.embed_query(query))
+    return list(embedding)
+
+
+class QueryEmbeddingBatcher:
+    """
+    Micro-batcher for question embeddings.
+    
+    A question that arrives alone is embedded right away. Questions already
+    queued together (because others were in flight) wait up to
+    QUERY_BATCH_MAX_WAIT_SECONDS for more and are embedded in a single API
+    call. Results go to the query embedding cache, which the retrievers then
+    hit.
+    """
+    
+    def __init__(self, max_batch: int = QUERY_BATCH_MAX_SIZE, max_wait: float = QUERY_BATCH_MAX_WAIT_SECONDS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def embed(self, query: str) -> List[float]:
+        normalized = _normalize_query(query)
+        embedding = _get_cached_query_embedding(normalized)
+        if embedding is not None:
+            return list(embedding)
+        
+        # Created lazily so they bind to the server's running event loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((normalized, query, future))
+        return list(await future)
+    
+    async def _collect_batch(self) -> list:
+        batch = [await self._queue.get()]
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if len(batch) == 1:
+            # Nothing else queued: don't delay a lone question
+            return batch
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            
+            # One original text per cache key (the first one asked)
+            query_by_key = {}
+            for normalized, query, _ in batch:
+                query_by_key.setdefault(normalized, query)
+            
+            results = {}
+            try:
+                embeddings = await asyncio.to_thread(_embed_queries, list(query_by_key.values()))
+                for normalized, embedding in zip(query_by_key, embeddings):
+                    results[normalized] = _cache_query_embedding(normalized, embedding)
+            except Exception as e:
+                if len(query_by_key) == 1:
+                    results[next(iter(query_by_key))] = e
+                else:
+                    # Retry one by one so a single bad question fails only itself
+                    print(f"⚠️ Batched query embedding failed, retrying individually: {e}")
+                    for normalized, query in query_by_key.items():
+                        try:
+                            embedding = (await asyncio.to_thread(_embed_queries, [query]))[0]
+                            results[normalized] = _cache_query_embedding(normalized, embedding)
+                        except Exception as item_error:
+                            results[normalized] = item_error
+            
+            for normalized, _, future in batch:
+                if future.done():
+                    continue
+                result = results[normalized]
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+QUERY_EMBEDDING_BATCHER = QueryEmbeddingBatcher()
+
+
+def invalidate_search_cache(table_name: str) -> None:
+    """Invalidate cached search results for a table after inserts or deletes."""
+    _TABLE_VERSIONS[table_name] = _TABLE_VERSIONS.get(table_name, 0) + 1
+
+
+def rpc_rows(client, fn: str, params: dict) -> list:
+    """Call a Supabase RPC and return its rows (an empty list for no rows)."""
+    return client.rpc(fn, params).execute().data or []
+
+
+def search_rpc_cached(client, category: str, query_embedding: List[float], match_count: int) -> list:
+    """
+    Call the search RPC for a category, caching the returned rows for
+    SEARCH_CACHE_TTL_SECONDS.
+    
+    Uses search_chunks on the unified table when enabled, otherwise the
+    category's search_* function. The cache key includes the table's
+    version, so uploads and deletions make stale entries unreachable.
+    """
+    table_name = vector_table_name(category)
+    embedding = np.asarray(query_embedding, dtype=np.float32)
+    embedding_key = hashlib.blake2b(embedding.tobytes(), digest_size=16).digest()
+    key = (category, embedding_key, match_count, _TABLE_VERSIONS.get(table_name, 0))
+    
+    now = time.time()
+    with _SEARCH_CACHE_LOCK:
+        cached = _SEARCH_CACHE.get(key)
+        if cached and cached[0] > now:
+            _SEARCH_CACHE.move_to_end(key)
+            return cached[1]
+    
+    params = {
+        "query_embedding": _to_pgvector_literal(embedding),  # Cast to vector server-side
+        "match_threshold": 0.15,  # Lower threshold for better recall
+        "match_count": match_count
+    }
+    if USE_UNIFIED_CHUNKS_TABLE:
+        rows = rpc_rows(client, "search_chunks", {**params, "p_category": category})
+    else:
+        rows = rpc_rows(client, SEARCH_FUNCTION_BY_TABLE[table_name], params)
+    
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (now + SEARCH_CACHE_TTL_SECONDS, rows)
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > SEARCH_CACHE_MAX_ENTRIES:
+            _SEARCH_CACHE.popitem(last=False)
+    
+    return rows
+
+@lru_cache(maxsize=64)
 def validate_qa_category(cat: str) -> str:
     """Validate Q&A category with normalization"""
     # Handle "All Categories" special case
@@ -895,104 +1440,102 @@ def validate_qa_category(cat: str) -> str:
     normalized = " ".join(normalized.split())  # Normalize multiple spaces to single space
     
     # Try exact match first
-    if normalized in QA_CATEGORIES:
+    if normalized in QA_CATEGORIES_SET:
         return normalized
     
-    # Try fuzzy matching for common variations
-    for valid_cat in QA_CATEGORIES:
-        # Remove extra spaces and compare
-        if normalized.replace(" ", "") == valid_cat.replace(" ", ""):
-            return valid_cat
-        # Check if it's just a spacing issue with '&'
-        if normalized.replace(" & ", " &  ") == valid_cat or normalized.replace(" &  ", " & ") == valid_cat:
-            return valid_cat
+    # Fall back to comparing with all spaces removed (covers '&' spacing variants)
+    valid_cat = QA_CATEGORY_BY_COMPACT_NAME.get(normalized.replace(" ", ""))
+    if valid_cat:
+        return valid_cat
     
     raise HTTPException(400, f"Invalid category. Must be one of: {['All Categories'] + QA_CATEGORIES}")
 
-def load_supabase_retriever(category: str):
-    """Load Supabase retriever for category using direct RPC calls"""
-    if not QA_AVAILABLE:
-        raise HTTPException(500, "Q&A functionality not available - missing dependencies")
+# Map table names to search function names
+SEARCH_FUNCTION_BY_TABLE = {
+    "vs_board_committees": "search_board_committees",
+    "vs_bylaws": "search_bylaws", 
+    "vs_external_advocacy": "search_external_advocacy",
+    "vs_policy_positions": "search_policy_positions",
+    "vs_resolutions": "search_resolutions"
+}
+
+
+@dataclass(slots=True)
+class RetrievedChunk:
+    """A search hit. Lighter than a LangChain Document, which is validated on every instantiation."""
+    content: str
+    metadata: dict
+    similarity: float = 0.0
     
+    @property
+    def page_content(self) -> str:
+        # Same attribute name as LangChain Documents, so either can be passed around
+        return self.content
+    
+    def to_langchain(self):
+        """Convert to a LangChain Document for consumers that need one."""
+        return LangChainDocument(page_content=self.content, metadata=self.metadata)
+
+
+def get_retrieval_client():
+    """Shared Supabase client for Q&A, with configuration errors mapped to HTTP 500s."""
     try:
-        from supabase import create_client
+        return get_supabase_client()
     except ImportError:
         raise HTTPException(500, "Supabase dependencies not available")
-    
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
-    if not url or not key:
+    except RuntimeError:
         raise HTTPException(500, "Supabase credentials not configured")
+
+
+def load_supabase_retriever(category: str):
+    """Load Supabase retriever for category using direct RPC calls"""
+    if not QA_AVAILABLE:
+        raise HTTPException(500, "Q&A functionality not available - missing dependencies")
     
     if category not in SUPABASE_TABLE_BY_CATEGORY:
         raise HTTPException(400, f"No Supabase table configured for category: {category}")
     
-    client = create_client(url, key)
+    client = get_retrieval_client()
     table = SUPABASE_TABLE_BY_CATEGORY[category]
     
-    # Map table names to search function names
-    search_function_map = {
-        "vs_board_committees": "search_board_committees",
-        "vs_bylaws": "search_bylaws", 
-        "vs_external_advocacy": "search_external_advocacy",
-        "vs_policy_positions": "search_policy_positions",
-        "vs_resolutions": "search_resolutions"
-    }
-    
-    search_function = search_function_map.get(table)
-    if not search_function:
+    if not USE_UNIFIED_CHUNKS_TABLE and table not in SEARCH_FUNCTION_BY_TABLE:
         raise HTTPException(500, f"No search function for table: {table}")
     
     class SupabaseCustomRetriever:
-        def __init__(self, client, embedder, search_function):
+        def __init__(self, client, embedder, category):
             self.client = client
             self.embedder = embedder
-            self.search_function = search_function
+            self.category = category
         
         def get_relevant_documents(self, query: str):
-            # Generate embedding for the query
-            query_embedding = self.embedder.embed_query(query)
+            # Generate embedding for the query (cached for repeated questions)
+            query_embedding = embed_query_cached(query)
             
-            # Call Supabase RPC function directly
-            result = self.client.rpc(self.search_function, {
-                "query_embedding": query_embedding,
-                "match_threshold": 0.15,  # Lower threshold for better recall
-                "match_count": TOP_K*2
-            }).execute()
+            # Call Supabase RPC function (results cached per table version)
+            rows = search_rpc_cached(self.client, self.category, query_embedding, TOP_K*2)
             
-            # Convert to LangChain Document format
+            # Convert to lightweight retrieval results
             docs = []
-            for row in result.data:
-                metadata = row.get('metadata', {})
+            for row in rows:
+                similarity = row.get('similarity', 0.0)
+                metadata = dict(row.get('metadata') or {})
                 # Add similarity score to metadata
-                metadata['similarity'] = row.get('similarity', 0.0)
-                
-                doc = LangChainDocument(
-                    page_content=row.get('content', ''),
-                    metadata=metadata
-                )
-                docs.append(doc)
+                metadata['similarity'] = similarity
+                docs.append(RetrievedChunk(row.get('content', ''), metadata, similarity))
             
             return docs
+        
+        async def aget_relevant_documents(self, query: str):
+            return await asyncio.to_thread(self.get_relevant_documents, query)
     
-    return SupabaseCustomRetriever(client, EMB, search_function)
+    return SupabaseCustomRetriever(client, EMB, category)
 
 def load_supabase_all_categories_retriever():
     """Load Supabase retriever that searches across all categories using RPC functions"""
     if not QA_AVAILABLE:
         raise HTTPException(500, "Q&A functionality not available - missing dependencies")
     
-    try:
-        from supabase import create_client
-    except ImportError:
-        raise HTTPException(500, "Supabase dependencies not available")
-    
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
-    if not url or not key:
-        raise HTTPException(500, "Supabase credentials not configured")
-    
-    client = create_client(url, key)
+    client = get_retrieval_client()
     
     # Create a combined retriever that searches across all category tables using RPC functions
     class AllCategoriesRetriever:
@@ -1000,79 +1543,88 @@ def load_supabase_all_categories_retriever():
             self.client = client
             self.embeddings = embeddings
             self.category_tables = category_tables
-            
-            # Map table names to search function names (same as single category)
-            self.search_function_map = {
-                "vs_board_committees": "search_board_committees",
-                "vs_bylaws": "search_bylaws", 
-                "vs_external_advocacy": "search_external_advocacy",
-                "vs_policy_positions": "search_policy_positions",
-                "vs_resolutions": "search_resolutions"
-            }
+        
+        def _search_category(self, category: str, table_name: str, query: str, docs_per_category: int) -> list:
+            """Search one category table; errors are logged and yield no docs."""
+            try:
+                if not USE_UNIFIED_CHUNKS_TABLE and table_name not in SEARCH_FUNCTION_BY_TABLE:
+                    print(f"❌ No search function for table: {table_name}")
+                    return []
+                
+                # Generate embedding for the query (cached for repeated questions)
+                query_embedding = embed_query_cached(query)
+                
+                # Call Supabase RPC function (same as single category, cached)
+                rows = search_rpc_cached(self.client, category, query_embedding, docs_per_category)
+                
+                # Convert to lightweight retrieval results
+                category_docs = []
+                for i, row in enumerate(rows):
+                    metadata = dict(row.get('metadata') or {})
+                    # Add similarity score to metadata
+                    metadata['similarity'] = row.get('similarity', 0.0)
+                    # Add category info to metadata - override BOTH top-level and nested
+                    metadata['category'] = category
+                    # Also override category in nested document object if it exists
+                    if 'document' in metadata and isinstance(metadata['document'], dict):
+                        metadata['document'] = {**metadata['document'], 'category': category}
+                    
+                    doc = RetrievedChunk(row.get('content', ''), metadata, metadata['similarity'])
+                    category_docs.append(doc)
+                    
+                    # DEBUG: Show details of each chunk retrieved
+                    if logger.isEnabledFor(logging.DEBUG):
+                        content = row.get('content', '')
+                        logger.debug(
+                            "Chunk %d: %s | %s | Similarity: %.3f | Content: %s",
+                            i + 1,
+                            metadata.get('title', 'Unknown Title'),
+                            metadata.get('heading_path', 'Unknown Section'),
+                            metadata['similarity'],
+                            content[:100] + '...' if len(content) > 100 else content
+                        )
+                
+                print(f"✅ Completed search for category: {category} ({len(rows)} docs)")
+                return category_docs
+                
+            except Exception as e:
+                print(f"❌ Error searching category {category}: {e}")
+                return []
+        
+        def _docs_per_category(self, k: int) -> int:
+            # Retrieve more docs per category to improve recall, then select best ones
+            docs_per_category = max(10, (k // len(self.category_tables)) * 2)  # 10 docs per category for better coverage
+            print(f"🚀 Searching all {len(self.category_tables)} categories with {docs_per_category} docs per category")
+            return docs_per_category
         
         def get_relevant_documents(self, query: str, k: int = None):
             """Search across all category tables using RPC functions and combine results"""
             if k is None:
                 k = TOP_K
             
+            docs_per_category = self._docs_per_category(k)
             all_docs = []
-            # Retrieve more docs per category to improve recall, then select best ones
-            docs_per_category = max(10, (k // len(self.category_tables)) * 2)  # 10 docs per category for better coverage
+            for category, table_name in self.category_tables.items():
+                all_docs.extend(self._search_category(category, table_name, query, docs_per_category))
             
-            print(f"🚀 Searching all {len(self.category_tables)} categories with {docs_per_category} docs per category")
+            return self._balance_categories(all_docs, k)
+        
+        async def aget_relevant_documents(self, query: str, k: int = None):
+            """Search all category tables concurrently and combine results"""
+            if k is None:
+                k = TOP_K
             
-            for category, table_name in self.category_tables.items():
-                try:
-                    # Get the RPC function name for this table
-                    search_function = self.search_function_map.get(table_name)
-                    if not search_function:
-                        print(f"❌ No search function for table: {table_name}")
-                        continue
-                    
-                    # Generate embedding for the query
-                    query_embedding = self.embeddings.embed_query(query)
-                    
-                    # Call Supabase RPC function directly (same as single category)
-                    result = self.client.rpc(search_function, {
-                        "query_embedding": query_embedding,
-                        "match_threshold": 0.15,  # Lower threshold for better recall
-                        "match_count": docs_per_category
-                    }).execute()
-                    
-                    # Convert to LangChain Document format
-                    category_docs = []
-                    for i, row in enumerate(result.data):
-                        metadata = row.get('metadata', {})
-                        # Add similarity score to metadata
-                        metadata['similarity'] = row.get('similarity', 0.0)
-                        # Add category info to metadata - override BOTH top-level and nested
-                        metadata['category'] = category
-                        # Also override category in nested document object if it exists
-                        if 'document' in metadata and isinstance(metadata['document'], dict):
-                            metadata['document']['category'] = category
-                        
-                        doc = LangChainDocument(
-                            page_content=row.get('content', ''),
-                            metadata=metadata
-                        )
-                        category_docs.append(doc)
-                        all_docs.append(doc)
-                        
-                        # DEBUG: Show details of each chunk retrieved
-                        doc_title = metadata.get('title', 'Unknown Title')
-                        doc_section = metadata.get('heading_path', 'Unknown Section')
-                        similarity = row.get('similarity', 0.0)
-                        content_preview = row.get('content', '')[:100] + '...' if len(row.get('content', '')) > 100 else row.get('content', '')
-                        
-                        print(f"   📄 Chunk {i+1}: {doc_title} | {doc_section} | Similarity: {similarity:.3f}")
-                        print(f"      Content: {content_preview}")
-                    
-                    print(f"✅ Completed search for category: {category} ({len(result.data)} docs)")
-                    
-                except Exception as e:
-                    print(f"❌ Error searching category {category}: {e}")
-                    continue
+            docs_per_category = self._docs_per_category(k)
+            # Independent RPCs: wall-clock is the slowest category, not the sum
+            per_category = await asyncio.gather(*(
+                asyncio.to_thread(self._search_category, category, table_name, query, docs_per_category)
+                for category, table_name in self.category_tables.items()
+            ))
+            all_docs = [doc for category_docs in per_category for doc in category_docs]
             
+            return self._balance_categories(all_docs, k)
+        
+        def _balance_categories(self, all_docs: list, k: int) -> list:
             # For All Categories, ensure equal representation from each category
             # Distribute documents evenly across categories
             print(f"🎯 All categories search completed: {len(all_docs)} total docs")
@@ -1096,10 +1648,13 @@ def load_supabase_all_categories_retriever():
                 print(f"   📄 Including {min(len(docs), docs_per_cat)} docs from {cat}")
                 
                 # DEBUG: Show which specific documents are selected for final results
-                for i, doc in enumerate(selected_docs):
-                    doc_title = doc.metadata.get('title', 'Unknown Title')
-                    similarity = doc.metadata.get('similarity', 0.0)
-                    print(f"      ✅ Selected: {doc_title} (Similarity: {similarity:.3f})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    for doc in selected_docs:
+                        logger.debug(
+                            "Selected: %s (Similarity: %.3f)",
+                            doc.metadata.get('title', 'Unknown Title'),
+                            doc.metadata.get('similarity', 0.0)
+                        )
             
             print(f"🎯 Returning {len(balanced_docs)} balanced docs from {len(docs_by_category)} categories")
             
@@ -1108,8 +1663,14 @@ def load_supabase_all_categories_retriever():
     
     return AllCategoriesRetriever(client, EMB, SUPABASE_TABLE_BY_CATEGORY)
 
+@lru_cache(maxsize=32)
 def get_retriever(category: str):
-    """Get retriever based on configured backend and category"""
+    """
+    Get retriever based on configured backend and category.
+    
+    Memoized per validated category: retrievers only hold the shared client
+    and embedder, so they can be reused across requests.
+    """
     if RETRIEVAL_BACKEND == "supabase":
         if category == "All Categories":
             return load_supabase_all_categories_retriever()
@@ -1118,8 +1679,8 @@ def get_retriever(category: str):
     else:
         raise HTTPException(500, f"Unsupported RETRIEVAL_BACKEND: {RETRIEVAL_BACKEND}")
 
-def format_context(docs: List[LangChainDocument]) -> str:
-    """Format retrieved documents for LLM context"""
+def format_context(docs: list) -> str:
+    """Format retrieved documents (RetrievedChunk or LangChain Document) for LLM context"""
     pieces = []
     for d in docs:
         m = d.metadata or {}
@@ -1127,15 +1688,54 @@ def format_context(docs: List[LangChainDocument]) -> str:
         pieces.append(f"[{cite}]\n{d.page_content}")
     return "\n\n---\n\n".join(pieces)
 
+# Serialize responses (large chunk lists, batch summaries) with orjson when available
+JSON_RESPONSE_CLASS = ORJSONResponse if orjson else JSONResponse
+
 # Initialize FastAPI app
 app = FastAPI(
     title="ACEP Document Preprocessing & Q&A API",
     description="Complete ACEP document processing pipeline with intelligent Q&A capabilities. Preprocess documents into structured chunks and ask questions with accurate, citation-backed answers.",
     version="1.2.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=JSON_RESPONSE_CLASS
 )
 
+
+@app.on_event("startup")
+async def init_shared_clients():
+    """Build the shared Supabase client and document embedder before the first request."""
+    try:
+        get_supabase_client()
+        get_ingest_embedder()
+        print("✅ Shared Supabase client and embedder initialized")
+    except Exception as e:
+        # Not fatal: they are created lazily on first use (and report errors there)
+        print(f"⚠️ Could not initialize shared clients at startup: {e}")
+
+
+@app.on_event("startup")
+async def check_local_embedder_dimension():
+    """
+    Refuse to start when USE_LOCAL_EMBEDDER is on but the local model's vector
+    size differs from the embedding columns (see migrations/003_local_embedder_384.sql).
+    """
+    if not USE_LOCAL_EMBEDDER:
+        return
+    
+    model_dim = len(await asyncio.to_thread(get_ingest_embedder().embed_query, "dimension check"))
+    client = get_supabase_client()
+    tables = [UNIFIED_CHUNKS_TABLE] if USE_UNIFIED_CHUNKS_TABLE else sorted(set(SUPABASE_TABLE_BY_CATEGORY.values()))
+    for table_name in tables:
+        column_dim = client.rpc("embedding_dimension", {"tbl": table_name}).execute().data
+        if column_dim != model_dim:
+            raise RuntimeError(
+                f"{LOCAL_EMBED_MODEL} produces {model_dim}-dim vectors but {table_name}.embedding "
+                f"is {column_dim}-dim. Run migrations/003_local_embedder_384.sql and re-upload "
+                f"the documents, or unset USE_LOCAL_EMBEDDER."
+            )
+    print(f"✅ Local embedder dimension ({model_dim}) matches the embedding columns")
+
 # =====================================================
 # AUTOMATIC CORS CONFIGURATION FROM config.json
 # =====================================================
@@ -1200,6 +1800,40 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     )
 
 
+# Worker processes for PDF extraction/OCR, shared by all uploads (created on first use)
+_EXTRACTION_POOL = None
+_EXTRACTION_POOL_LOCK = threading.Lock()
+
+
+def get_extraction_pool():
+    """Return the shared extraction process pool (one worker per CPU)."""
+    global _EXTRACTION_POOL
+    with _EXTRACTION_POOL_LOCK:
+        if _EXTRACTION_POOL is None:
+            _EXTRACTION_POOL = create_extraction_pool()
+        return _EXTRACTION_POOL
+
+
+def discard_extraction_pool(pool) -> None:
+    """
+    Drop a broken extraction pool (a worker died, e.g. OOM or a tesseract
+    crash) so the next upload gets a fresh one. Concurrent uploads that hit
+    the same broken pool only replace it once.
+    """
+    global _EXTRACTION_POOL
+    with _EXTRACTION_POOL_LOCK:
+        if _EXTRACTION_POOL is pool:
+            _EXTRACTION_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@app.on_event("shutdown")
+def shutdown_extraction_pool():
+    """Stop the extraction worker processes with the server."""
+    if _EXTRACTION_POOL is not None:
+        _EXTRACTION_POOL.shutdown(cancel_futures=True)
+
+
 @app.post("/v1/preprocess", response_model=PreprocessResponse)
 async def preprocess_document(
     file: UploadFile = File(..., description="Document file (PDF, DOCX, TXT, MD) - Max size: 50MB"),
@@ -1213,7 +1847,8 @@ async def preprocess_document(
     ocr_language: str = Form("eng", description="OCR language code (default: eng) - See /ocr-languages for options"),
     ocr_dpi: int = Form(300, description="OCR DPI (default: 300) - Range: 150-600"),
     max_tokens_per_chunk: int = Form(1000, description="Maximum tokens per chunk (default: 1000) - Range: 100-1000"),
-    overlap_tokens: int = Form(200, description="Overlap tokens between chunks (default: 200) - Range: 0-200")
+    overlap_tokens: int = Form(200, description="Overlap tokens between chunks (default: 200) - Range: 0-200"),
+    parallel_extract: bool = Form(True, description="Extract PDF pages in parallel worker processes (default: true)")
 ) -> PreprocessResponse:
     """
     Preprocess a document through the ACEP ingestion pipeline.
@@ -1241,36 +1876,19 @@ async def preprocess_document(
             detail="No file provided. Please upload a document file."
         )
     
-    # Read file content to check size
-    file_content = await file.read()
-    file_size = len(file_content)
-    
-    # Validate file size
-    if file_size == 0:
-        raise HTTPException(
-            status_code=400,
-            detail="Empty file uploaded. Please provide a file with content."
-        )
-    
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large ({file_size / 1024 / 1024:.1f}MB). Maximum allowed size is {MAX_FILE_SIZE / 1024 / 1024}MB."
-        )
-    
     # Validate file extension
     file_ext = Path(file.filename).suffix.lower()
     if file_ext not in SUPPORTED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file type '{file_ext}'. Supported types: {', '.join(sorted(SUPPORTED_EXTENSIONS))}"
+            detail=f"Unsupported file type '{file_ext}'. Supported types: {', '.join(SUPPORTED_EXTENSIONS_SORTED)}"
         )
     
     # Validate category
     if category not in CATEGORIES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid category '{category}'. Must be exactly one of: {', '.join(sorted(CATEGORIES))}"
+            detail=f"Invalid category '{category}'. Must be exactly one of: {', '.join(CATEGORIES_SORTED)}"
         )
     
     # Validate optional string parameters
@@ -1300,7 +1918,7 @@ async def preprocess_document(
     if ocr_language not in OCR_LANGUAGES:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported OCR language '{ocr_language}'. Supported languages: {', '.join(sorted(OCR_LANGUAGES))}"
+            detail=f"Unsupported OCR language '{ocr_language}'. Supported languages: {', '.join(OCR_LANGUAGES_SORTED)}"
         )
     
     # Validate OCR DPI
@@ -1351,25 +1969,53 @@ async def preprocess_document(
     temp_file = None
     try:
         print(f"📝 Creating temporary file with extension: {file_ext}")
-        # Create temporary file with original extension
+        # Stream the upload into a temporary file with the original extension,
+        # checking the size as we go instead of holding the whole file in memory
+        file_size = 0
         with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-            temp_file.write(file_content)
             temp_file_path = temp_file.name
+            while chunk := await file.read(UPLOAD_READ_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large (over {MAX_FILE_SIZE / 1024 / 1024}MB). Maximum allowed size is {MAX_FILE_SIZE / 1024 / 1024}MB."
+                    )
+                temp_file.write(chunk)
+        
+        # Validate file size
+        if file_size == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Empty file uploaded. Please provide a file with content."
+            )
         print(f"✅ Temporary file created: {temp_file_path}")
         
         # Extract text based on file type with enhanced parameters
         try:
             print(f"🔍 Starting text extraction for {file_ext} file...")
-            if file_ext == '.pdf':
-                full_text, page_texts = extract_pdf(
-                    Path(temp_file_path), 
-                    ocr_language=ocr_language,
-                    dpi=ocr_dpi
-                )
+            if file_ext == '.pdf' and parallel_extract:
+                # Run off the event loop; page ranges go to the shared worker
+                # processes, so concurrent uploads (batches) share the cores
+                pool = get_extraction_pool()
+                try:
+                    full_text, page_texts = await asyncio.to_thread(
+                        extract_pdf_parallel,
+                        Path(temp_file_path),
+                        ocr_language,
+                        ocr_dpi,
+                        executor=pool
+                    )
+                except BrokenProcessPool:
+                    print("⚠️ Extraction worker died; rebuilding the pool and extracting this file serially")
+                    discard_extraction_pool(pool)
+                    full_text, page_texts = await asyncio.to_thread(extract_pdf, Path(temp_file_path), ocr_language, ocr_dpi)
+            elif file_ext == '.pdf':
+                full_text, page_texts = await asyncio.to_thread(extract_pdf, Path(temp_file_path), ocr_language, ocr_dpi)
             elif file_ext == '.docx':
-                full_text, page_texts = extract_docx(Path(temp_file_path))
+                full_text, page_texts = await asyncio.to_thread(extract_docx, Path(temp_file_path))
             else:  # .txt or .md
-                full_text, page_texts = extract_txt_md(Path(temp_file_path))
+                full_text, page_texts = await asyncio.to_thread(extract_txt_md, Path(temp_file_path))
             print(f"✅ Text extraction completed. Pages: {len(page_texts)}, Total text length: {len(full_text)}")
         except Exception as extraction_error:
             print(f"ERROR: Text extraction failed: {extraction_error}")
@@ -1378,9 +2024,6 @@ async def preprocess_document(
                 detail=f"Failed to extract text from document: {str(extraction_error)}"
             )
         
-        # Convert page_texts to page dictionaries format
-        pages = [{'text': page_text, 'page_number': i+1} for i, page_text in enumerate(page_texts)]
-        
         # Validate extraction results
         if not page_texts or all(not page.strip() for page in page_texts):
             raise HTTPException(
@@ -1390,33 +2033,28 @@ async def preprocess_document(
         
         # Clean each page individually with error handling
         try:
-            cleaned_pages = [clean_page_text(page['text']) for page in pages]
+            cleaned_pages = [clean_page_text(page_text) for page_text in page_texts]
         except Exception as cleaning_error:
             print(f"WARNING: Page cleaning failed, using original text: {cleaning_error}")
-            cleaned_pages = [page['text'] for page in pages]
+            cleaned_pages = list(page_texts)
         
         # Add repeated header/footer removal
         from ingestion.clean import remove_repeated_headers_footers
         cleaned_pages = remove_repeated_headers_footers(cleaned_pages)
         
-        # Add TOC filtering
-        def is_toc_line(line: str) -> bool:
-            """Detect table of contents lines with dot leaders."""
-            import re
-            return bool(re.search(r"\.{3,}\s*\d+\s*$", line))
-        
-        def strip_toc(pages: list[str]) -> list[str]:
-            """Remove TOC lines from pages."""
-            out = []
-            for p in pages:
-                lines = [l for l in p.splitlines() if not is_toc_line(l)]
-                out.append("\n".join(lines))
-            return out
-        
-        cleaned_pages = strip_toc(cleaned_pages)
-        
-        # Create combined cleaned text for metadata inference
-        cleaned_text = "\n\n".join(cleaned_pages)
+        # Add TOC filtering (one regex pass over all pages)
+        cleaned_pages = strip_toc_lines(cleaned_pages)
+        
+        # Metadata inference only reads the first METADATA_HEAD_LINES lines, so
+        # join just enough leading pages to cover them instead of the whole document
+        head_pages = []
+        head_line_count = 0
+        for page in cleaned_pages:
+            head_pages.append(page)
+            head_line_count += page.count("\n") + 1
+            if head_line_count >= METADATA_HEAD_LINES:
+                break
+        cleaned_text_head = "\n\n".join(head_pages)
         
         # Detect structure to create blocks with error handling
         try:
@@ -1460,6 +2098,8 @@ async def preprocess_document(
         # Embedding safety validation with error handling
         try:
             safety_results = validate_embedding_safety(chunk_dicts, target_range=(400, 800))
+            keep = safety_results.pop("keep_indices")
+            chunk_dicts = [c for i, c in enumerate(chunk_dicts) if i in keep]
             print(f"Embedding Safety: {safety_results['status']} - {safety_results['message']}")
             
             if safety_results["warnings"]:
@@ -1476,16 +2116,23 @@ async def preprocess_document(
                 detail="No valid chunks produced after quality validation. Check the document quality."
             )
         
-        # Infer missing metadata with improved date validation
+        # Infer missing metadata with improved date validation (one memoized
+        # pass over the document head, only when something is missing)
+        try:
+            inferred = infer_metadata(cleaned_text_head) if not (title and document_number and issued_date) else {}
+        except Exception as inference_error:
+            print(f"❌ Metadata inference error: {inference_error}")
+            raise HTTPException(status_code=500, detail=f"Metadata inference failed: {str(inference_error)}")
+        
         try:
-            inferred_title = title or infer_title(cleaned_text) or Path(file.filename).stem
+            inferred_title = title or inferred.get("title") or Path(file.filename).stem
             print(f"✅ Title inference completed: {inferred_title}")
         except Exception as title_error:
             print(f"❌ Title inference error: {title_error}")
             raise HTTPException(status_code=500, detail=f"Title inference failed: {str(title_error)}")
         
         try:
-            inferred_doc_number = document_number or infer_document_number(cleaned_text)
+            inferred_doc_number = document_number or inferred.get("document_number")
             print(f"✅ Document number inference completed: {inferred_doc_number}")
         except Exception as doc_num_error:
             print(f"❌ Document number inference error: {doc_num_error}")
@@ -1493,7 +2140,7 @@ async def preprocess_document(
         
         # Better issued_date validation - reject future dates
         try:
-            inferred_issued_date = issued_date or infer_issued_date(cleaned_text)
+            inferred_issued_date = issued_date or inferred.get("issued_date")
             if inferred_issued_date:
                 try:
                     date_obj = datetime.strptime(inferred_issued_date, "%Y-%m-%d")
@@ -1537,8 +2184,8 @@ async def preprocess_document(
                 version=version,
                 is_current=is_current,
                 file_name=file.filename,
-                file_size=len(file_content),
-                total_pages=len(pages)
+                file_size=file_size,
+                total_pages=len(page_texts)
             )
             print(f"✅ DocumentMeta created successfully")
         except Exception as meta_error:
@@ -1603,23 +2250,47 @@ async def preprocess_document(
                 pass  # Best effort cleanup
 
 
-@app.post("/v1/upload-and-preprocess")
-async def upload_and_preprocess(
-    file: UploadFile = File(..., description="Document file (PDF, DOCX, TXT, MD) - Max size: 50MB"),
-    category: str = Form(..., description="Document category (required - must match ACEP categories exactly)"),
-    title: Optional[str] = Form(None, description="Document title (optional)"),
-    document_number: Optional[str] = Form(None, description="Document number/identifier (optional)"),
-    issued_date: Optional[str] = Form(None, description="Issue date in ISO format YYYY-MM-DD (optional)"),
-    year: Optional[int] = Form(None, description="Document year (optional)"),
-    version: Optional[str] = Form("1", description="Document version (optional) - accepts any string or number")
-):
+# In-memory registry of background upload jobs (job_id -> status dict).
+# It lives in this process only, so a job id is unknown to any other uvicorn
+# worker: run the server single-worker (as the Dockerfile does) or upload with
+# ?wait=true behind a multi-worker deployment.
+UPLOAD_JOBS: Dict[str, Dict] = {}
+UPLOAD_JOB_TTL_SECONDS = 3600  # Finished jobs are forgotten after an hour
+
+
+def _prune_upload_jobs() -> None:
+    """Drop finished upload jobs older than UPLOAD_JOB_TTL_SECONDS."""
+    cutoff = time.time() - UPLOAD_JOB_TTL_SECONDS
+    expired = [job_id for job_id, job in UPLOAD_JOBS.items()
+               if job["status"] in ("done", "error") and job["updated_at"] < cutoff]
+    for job_id in expired:
+        del UPLOAD_JOBS[job_id]
+
+
+def _set_job_status(job: Optional[Dict], status: str, **fields) -> None:
+    """Update a background job's status (no-op for synchronous requests)."""
+    if job is None:
+        return
+    job.update(fields)
+    job["status"] = status
+    job["updated_at"] = time.time()
+
+
+async def _run_upload_pipeline(
+    file: UploadFile,
+    category: str,
+    title: Optional[str],
+    document_number: Optional[str],
+    issued_date: Optional[str],
+    year: Optional[int],
+    version: Optional[str],
+    job: Optional[Dict] = None
+) -> dict:
     """
-    Simple user-facing endpoint:
-    1) Accept upload + minimal fields
-    2) Delete old versions if uploading a new version of existing document
-    3) Call preprocess_document with internal defaults
-    4) Save the resulting JSON for analysis
-    5) Return the same JSON plus saved_path
+    Full upload pipeline shared by the synchronous and background paths:
+    preprocess, save JSON, delete old versions, then embed and store.
+    Old versions are deleted only after the new file has preprocessed, so a
+    failed re-upload leaves the previous version searchable.
     """
     INTERNAL_DEFAULTS = {
         'is_current': True,
@@ -1629,25 +2300,12 @@ async def upload_and_preprocess(
         'overlap_tokens': 200
     }
 
-    # Delete old versions if title is provided and version is being updated
-    if title and version:
-        try:
-            print(f"🔄 Checking for existing versions of document: '{title}'")
-            # Delete all existing chunks/embeddings for this document before uploading new version
-            deletion_result = await delete_document_embeddings(title, category)
-            if deletion_result["status"] == "success" and deletion_result["chunks_deleted"] > 0:
-                print(f"✅ Deleted {deletion_result['chunks_deleted']} chunks from previous version(s)")
-            elif deletion_result["status"] == "warning":
-                print(f"⚠️ No previous version found - this is a new document")
-        except Exception as delete_error:
-            print(f"⚠️ Warning: Could not delete old versions: {delete_error}")
-            # Don't fail the upload if deletion fails - just log it
-
     # Call the engine endpoint (reuses all validations & processing)
+    _set_job_status(job, "preprocessing")
     try:
         print(f"🔄 Starting document preprocessing for: {title or file.filename}")
-        print(f"📄 File size: {len(await file.read()) / 1024 / 1024:.2f} MB")
-        await file.seek(0)  # Reset file pointer after reading size
+        if file.size is not None:
+            print(f"📄 File size: {file.size / 1024 / 1024:.2f} MB")
         
         result: PreprocessResponse = await preprocess_document(
             file=file,
@@ -1658,6 +2316,7 @@ async def upload_and_preprocess(
             year=year,
             version=version or "1",
             is_current=INTERNAL_DEFAULTS['is_current'],
+            parallel_extract=True,
             ocr_language=INTERNAL_DEFAULTS['ocr_language'],
             ocr_dpi=INTERNAL_DEFAULTS['ocr_dpi'],
             max_tokens_per_chunk=INTERNAL_DEFAULTS['max_tokens_per_chunk'],
@@ -1706,11 +2365,30 @@ async def upload_and_preprocess(
         print(f"❌ Error saving document: {save_error}")
         raise HTTPException(status_code=500, detail=f"Failed to save document: {str(save_error)}")
 
+    # Look up stored embeddings for the new chunks first: a re-upload repeats
+    # most of the old version's text, whose rows are deleted next
+    _set_job_status(job, "embedding", saved_path=saved_path)
+    known_embeddings = await fetch_reusable_embeddings(payload, category)
+    
+    # Delete old versions if title is provided and version is being updated
+    if title and version:
+        try:
+            print(f"🔄 Checking for existing versions of document: '{title}'")
+            # Delete all existing chunks/embeddings for this document before uploading new version
+            deletion_result = await delete_document_embeddings(title, category)
+            if deletion_result["status"] == "success" and deletion_result["chunks_deleted"] > 0:
+                print(f"✅ Deleted {deletion_result['chunks_deleted']} chunks from previous version(s)")
+            elif deletion_result["status"] == "warning":
+                print(f"⚠️ No previous version found - this is a new document")
+        except Exception as delete_error:
+            print(f"⚠️ Warning: Could not delete old versions: {delete_error}")
+            # Don't fail the upload if deletion fails - just log it
+
     # Generate embeddings and store in Supabase
     embedding_result = None
     try:
         print(f"🔄 Starting embedding generation for category: {category}")
-        embedding_result = await generate_and_store_embeddings(payload, category)
+        embedding_result = await generate_and_store_embeddings(payload, category, known_embeddings)
         
         if embedding_result["status"] == "success":
             print(f"✅ Embeddings generated successfully: {embedding_result['chunks_stored']} chunks stored")
@@ -1732,6 +2410,159 @@ async def upload_and_preprocess(
     return payload
 
 
+async def _process_upload_job(job_id: str, temp_path: str, filename: str, form: Dict) -> None:
+    """Background worker: run the upload pipeline on a persisted upload and record the outcome."""
+    job = UPLOAD_JOBS[job_id]
+    try:
+        with open(temp_path, "rb") as f:
+            upload = UploadFile(file=f, filename=filename, size=os.path.getsize(temp_path))
+            payload = await _run_upload_pipeline(upload, job=job, **form)
+        _set_job_status(
+            job, "done",
+            saved_path=payload.get("saved_path"),
+            embedding_result=payload.get("embedding_result"),
+            chunks=len(payload.get("chunks", []))
+        )
+        print(f"✅ Upload job {job_id} completed")
+    except HTTPException as e:
+        print(f"❌ Upload job {job_id} failed: {e.detail}")
+        _set_job_status(job, "error", error=str(e.detail))
+    except Exception as e:
+        print(f"❌ Upload job {job_id} failed: {e}")
+        _set_job_status(job, "error", error=str(e))
+    finally:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass  # Best effort cleanup
+
+
+async def _spool_upload(file: UploadFile, suffix: str) -> str:
+    """
+    Stream an upload into a temporary file for a background job, enforcing
+    MAX_FILE_SIZE while reading and rejecting empty files.
+    
+    Returns:
+        Path of the temporary file; the caller owns and must delete it
+    """
+    file_size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        temp_path = temp_file.name
+        try:
+            while chunk := await file.read(UPLOAD_READ_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File '{file.filename}' too large (over {MAX_FILE_SIZE / 1024 / 1024}MB). Maximum allowed size is {MAX_FILE_SIZE / 1024 / 1024}MB."
+                    )
+                temp_file.write(chunk)
+        except BaseException:
+            temp_file.close()
+            os.unlink(temp_path)
+            raise
+    
+    if file_size == 0:
+        os.unlink(temp_path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Empty file uploaded: '{file.filename}'. Please provide a file with content."
+        )
+    return temp_path
+
+
+@app.post("/v1/upload-and-preprocess")
+async def upload_and_preprocess(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Document file (PDF, DOCX, TXT, MD) - Max size: 50MB"),
+    category: str = Form(..., description="Document category (required - must match ACEP categories exactly)"),
+    title: Optional[str] = Form(None, description="Document title (optional)"),
+    document_number: Optional[str] = Form(None, description="Document number/identifier (optional)"),
+    issued_date: Optional[str] = Form(None, description="Issue date in ISO format YYYY-MM-DD (optional)"),
+    year: Optional[int] = Form(None, description="Document year (optional)"),
+    version: Optional[str] = Form("1", description="Document version (optional) - accepts any string or number"),
+    wait: bool = Query(False, description="Process inline and return the full result instead of a background job")
+):
+    """
+    Simple user-facing endpoint:
+    1) Accept upload + minimal fields
+    2) Delete old versions if uploading a new version of existing document
+    3) Call preprocess_document with internal defaults
+    4) Save the resulting JSON for analysis
+    5) Generate embeddings and store them in Supabase
+    
+    By default the upload is persisted and processed in the background: the
+    response is 202 with a job_id to poll at /v1/jobs/{job_id}. With
+    ?wait=true the pipeline runs inline and the full JSON plus saved_path is
+    returned (previous behaviour). Job ids are tracked in process memory,
+    so polling only works against a single-worker server.
+    """
+    form = {
+        "category": category,
+        "title": title,
+        "document_number": document_number,
+        "issued_date": issued_date,
+        "year": year,
+        "version": version
+    }
+    
+    if wait:
+        return await _run_upload_pipeline(file, **form)
+    
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided. Please upload a document file.")
+    
+    # Reject bad uploads up front instead of queueing a job that can only fail
+    suffix = Path(file.filename).suffix.lower()
+    if suffix not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type '{suffix}'. Supported types: {', '.join(SUPPORTED_EXTENSIONS_SORTED)}"
+        )
+    if category not in CATEGORIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid category '{category}'. Must be exactly one of: {', '.join(CATEGORIES_SORTED)}"
+        )
+    
+    # Persist the upload so the background job outlives this request
+    temp_path = await _spool_upload(file, suffix)
+    
+    _prune_upload_jobs()
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    UPLOAD_JOBS[job_id] = {
+        "job_id": job_id,
+        "status": "queued",
+        "filename": file.filename,
+        "title": title,
+        "category": category,
+        "created_at": now,
+        "updated_at": now
+    }
+    background_tasks.add_task(_process_upload_job, job_id, temp_path, file.filename, form)
+    print(f"📥 Queued upload job {job_id} for: {title or file.filename}")
+    
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/v1/jobs/{job_id}"
+        }
+    )
+
+
+@app.get("/v1/jobs/{job_id}")
+@app.get("/v1/batch-status/{job_id}")
+async def get_upload_job(job_id: str):
+    """Get the status of a background upload or batch job."""
+    job = UPLOAD_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Upload job '{job_id}' not found")
+    return job
+
+
 @app.delete("/v1/delete-document")
 async def delete_document(
     document_title: str = Form(..., description="Title of the document to delete"),
@@ -1794,19 +2625,153 @@ async def delete_document(
         )
 
 
+async def _run_batch(
+    files: List[UploadFile],
+    titles: List[str],
+    document_numbers: List[str],
+    categories: List[str],
+    issued_dates: List[str],
+    years: List[int]
+) -> dict:
+    """Preprocess a validated batch of uploads and build the batch summary."""
+    # Process documents concurrently, at most BATCH_CONCURRENCY at a time
+    total_files = len(files)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    batch_id = uuid.uuid4().hex  # shared by every file's batch_info and the summary
+    
+    print(f"Starting batch processing of {total_files} documents with ZERO DATA LOSS guarantee")
+    
+    async def process_one(i, file, title, doc_num, category, issued_date, year):
+        async with semaphore:
+            print(f"Processing file {i+1}/{total_files}: {title}")
+            
+            # Call the main preprocessing function directly on the upload;
+            # it streams the file to disk in UPLOAD_READ_CHUNK_SIZE pieces
+            single_result = await preprocess_document(
+                file=file,
+                title=title,
+                document_number=doc_num,
+                category=category,
+                issued_date=issued_date,
+                year=year,
+                version="1",
+                is_current=True,
+                ocr_language='eng',
+                ocr_dpi=300,
+                max_tokens_per_chunk=1000,
+                overlap_tokens=200,
+                parallel_extract=True
+            )
+            
+            # Add batch info
+            single_result["batch_info"] = {
+                "batch_index": i,
+                "batch_total": total_files,
+                "batch_id": batch_id
+            }
+            
+            # Save to category-based location
+            saved_path = save_preprocess_json(single_result, file.filename)
+            single_result["saved_path"] = saved_path
+            
+            return {
+                "status": "success",
+                "document": title,
+                "file_index": i,
+                "result": single_result
+            }
+    
+    outcomes = await asyncio.gather(
+        *(
+            process_one(i, file, title, doc_num, category, issued_date, year)
+            for i, (file, title, doc_num, category, issued_date, year) in enumerate(
+                zip(files, titles, document_numbers, categories, issued_dates, years)
+            )
+        ),
+        return_exceptions=True
+    )
+    
+    results = []
+    for i, (title, outcome) in enumerate(zip(titles, outcomes)):
+        if isinstance(outcome, BaseException):
+            print(f"Error processing file {i+1} ({title}): {str(outcome)}")
+            results.append({
+                "status": "error",
+                "document": title,
+                "file_index": i,
+                "error": str(outcome)
+            })
+        else:
+            results.append(outcome)
+    
+    # Summary statistics
+    successful = sum(1 for r in results if r["status"] == "success")
+    failed = total_files - successful
+    
+    batch_summary = {
+        "batch_id": batch_id,
+        "total_files": total_files,
+        "successful": successful,
+        "failed": failed,
+        "success_rate": (successful / total_files) * 100 if total_files > 0 else 0,
+        "data_loss_guarantee": "ZERO DATA LOSS - All content preserved",
+        "results": results
+    }
+    
+    print(f"Batch processing complete: {successful}/{total_files} files processed successfully")
+    
+    return batch_summary
+
+
+async def _process_batch_job(job_id: str, spooled: List[tuple], metas: Dict[str, list]) -> None:
+    """Background worker: run a batch on persisted uploads and record the summary."""
+    job = UPLOAD_JOBS[job_id]
+    _set_job_status(job, "processing")
+    handles = []
+    try:
+        for temp_path, filename in spooled:
+            handle = open(temp_path, "rb")
+            handles.append(handle)
+        files = [
+            UploadFile(file=handle, filename=filename, size=os.path.getsize(temp_path))
+            for handle, (temp_path, filename) in zip(handles, spooled)
+        ]
+        batch_summary = await _run_batch(files, **metas)
+        _set_job_status(job, "done", result=batch_summary)
+        print(f"✅ Batch job {job_id} completed")
+    except Exception as e:
+        print(f"❌ Batch job {job_id} failed: {e}")
+        _set_job_status(job, "error", error=str(e))
+    finally:
+        for handle in handles:
+            handle.close()
+        for temp_path, _ in spooled:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass  # Best effort cleanup
+
+
 @app.post("/v1/batch-upload-and-preprocess")
 async def batch_upload_and_preprocess(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(..., description="Multiple PDF files to preprocess"),
     titles: List[str] = Form(..., description="Document titles for each file"),
     document_numbers: List[str] = Form(..., description="Document numbers for each file"),
     categories: List[str] = Form(..., description="Categories for each file"),
     issued_dates: List[str] = Form(..., description="Issued dates for each file (YYYY-MM-DD)"),
-    years: List[int] = Form(..., description="Years for each file")
+    years: List[int] = Form(..., description="Years for each file"),
+    wait: bool = Query(False, description="Process inline and return the batch summary instead of a background job")
 ):
     """
     Batch process multiple documents with zero data loss guarantee.
     
     All parameters must be lists with the same length as the number of files.
+    
+    By default the files are persisted and processed in the background: the
+    response is 202 with a job_id to poll at /v1/batch-status/{job_id}, whose
+    "result" holds the batch summary once done. With ?wait=true the batch
+    runs inline and the summary is returned directly.
     """
     try:
         # Validate input lengths
@@ -1819,102 +2784,65 @@ async def batch_upload_and_preprocess(
         if len(files) == 0:
             raise HTTPException(status_code=400, detail="At least one file is required")
         
-        if len(files) > 10:  # Reasonable batch size limit
-            raise HTTPException(status_code=400, detail="Maximum 10 files per batch")
+        if len(files) > MAX_BATCH_FILES:  # Reasonable batch size limit
+            raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_FILES} files per batch")
         
         # Validate all categories
         for category in categories:
             if category not in CATEGORIES:
                 raise HTTPException(
                     status_code=400, 
-                    detail=f"Invalid category '{category}'. Must be one of: {', '.join(sorted(CATEGORIES))}"
+                    detail=f"Invalid category '{category}'. Must be one of: {', '.join(CATEGORIES_SORTED)}"
                 )
         
-        # Process all documents
-        results = []
-        total_files = len(files)
+        metas = {
+            "titles": titles,
+            "document_numbers": document_numbers,
+            "categories": categories,
+            "issued_dates": issued_dates,
+            "years": years
+        }
         
-        print(f"Starting batch processing of {total_files} documents with ZERO DATA LOSS guarantee")
+        if wait:
+            return await _run_batch(files, **metas)
         
-        for i, (file, title, doc_num, category, issued_date, year) in enumerate(
-            zip(files, titles, document_numbers, categories, issued_dates, years)
-        ):
-            try:
-                print(f"Processing file {i+1}/{total_files}: {title}")
-                
-                # Read file content
-                content = await file.read()
-                
-                # Use simplified approach - call the main endpoint internally
-                from fastapi import UploadFile
-                from io import BytesIO
-                
-                # Create UploadFile object from content
-                file_obj = UploadFile(
-                    filename=file.filename,
-                    file=BytesIO(content)
-                )
-                
-                # Call the main preprocessing function
-                single_result = await preprocess_document(
-                    file=file_obj,
-                    title=title,
-                    document_number=doc_num,
-                    category=category,
-                    issued_date=issued_date,
-                    year=year,
-                    version="1",
-                    is_current=True,
-                    ocr_language='eng',
-                    ocr_dpi=300,
-                    max_tokens_per_chunk=1000,
-                    overlap_tokens=200
-                )
-                
-                # Add batch info
-                single_result["batch_info"] = {
-                    "batch_index": i,
-                    "batch_total": total_files,
-                    "batch_id": f"batch_{int(time.time())}"
-                }
-                
-                # Save to category-based location
-                saved_path = save_preprocess_json(single_result, file.filename)
-                single_result["saved_path"] = saved_path
-                
-                results.append({
-                    "status": "success",
-                    "document": title,
-                    "file_index": i,
-                    "result": single_result
-                })
-                
-            except Exception as e:
-                print(f"Error processing file {i+1} ({title}): {str(e)}")
-                results.append({
-                    "status": "error",
-                    "document": title,
-                    "file_index": i,
-                    "error": str(e)
-                })
+        # Persist the uploads so the background job outlives this request;
+        # an oversized or empty file rejects the batch before it is queued
+        spooled = []
+        try:
+            for file in files:
+                suffix = Path(file.filename or "").suffix.lower()
+                spooled.append((await _spool_upload(file, suffix), file.filename))
+        except BaseException:
+            for temp_path, _ in spooled:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass  # Best effort cleanup
+            raise
         
-        # Summary statistics
-        successful = sum(1 for r in results if r["status"] == "success")
-        failed = total_files - successful
-        
-        batch_summary = {
-            "batch_id": f"batch_{int(time.time())}",
-            "total_files": total_files,
-            "successful": successful,
-            "failed": failed,
-            "success_rate": (successful / total_files) * 100 if total_files > 0 else 0,
-            "data_loss_guarantee": "ZERO DATA LOSS - All content preserved",
-            "results": results
+        _prune_upload_jobs()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        UPLOAD_JOBS[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "filenames": [file.filename for file in files],
+            "total_files": len(files),
+            "created_at": now,
+            "updated_at": now
         }
-        
-        print(f"Batch processing complete: {successful}/{total_files} files processed successfully")
-        
-        return batch_summary
+        background_tasks.add_task(_process_batch_job, job_id, spooled, metas)
+        print(f"📥 Queued batch job {job_id} with {len(files)} files")
+        
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": f"/v1/batch-status/{job_id}"
+            }
+        )
         
     except HTTPException:
         raise
@@ -1923,6 +2851,33 @@ async def batch_upload_and_preprocess(
         raise HTTPException(status_code=500, detail=f"Batch processing failed: {str(e)}")
 
 
+# Errors meaning the uploaded file is not valid JSON (orjson.JSONDecodeError
+# subclasses json.JSONDecodeError)
+JSON_PARSE_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+
+def _load_processed_json(fileobj) -> tuple:
+    """
+    Read the "document" object and "chunks" list from a processed JSON file.
+    
+    With ijson the chunks are streamed item by item instead of decoding the
+    whole file into one object graph first; otherwise orjson (or json) parses
+    the whole file.
+    
+    Returns:
+        (document dict, list of chunk dicts)
+    """
+    if ijson is None:
+        # orjson parses straight from bytes, without an intermediate str
+        data = orjson.loads(fileobj.read()) if orjson else json.load(fileobj)
+        return data.get("document", {}), data.get("chunks", [])
+    
+    chunks = list(ijson.items(fileobj, "chunks.item", use_float=True))
+    fileobj.seek(0)
+    document = next(ijson.items(fileobj, "document", use_float=True), {})
+    return document, chunks
+
+
 @app.post("/validate-json")
 async def validate_json_file(
     file: UploadFile = File(..., description="JSON file from previous preprocessing")
@@ -1946,13 +2901,8 @@ async def validate_json_file(
         )
     
     try:
-        # Read and parse JSON
-        content = await file.read()
-        data = json.loads(content.decode('utf-8'))
-        
-        # Extract chunks from the JSON structure
-        chunks = data.get("chunks", [])
-        document = data.get("document", {})
+        # Parse the document header and chunks off the event loop
+        document, chunks = await asyncio.to_thread(_load_processed_json, file.file)
         
         if not chunks:
             raise HTTPException(
@@ -1960,26 +2910,14 @@ async def validate_json_file(
                 detail="No chunks found in JSON file"
             )
         
-        # Convert chunks to expected format if needed
-        chunk_dicts = []
-        for chunk in chunks:
-            if isinstance(chunk, dict):
-                chunk_dicts.append(chunk)
-            else:
-                # Handle Pydantic model format
-                chunk_dict = {
-                    "text": getattr(chunk, 'text', ''),
-                    "token_count": getattr(chunk, 'token_count', 0),
-                    "page_start": getattr(chunk, 'page_start', 1),
-                    "page_end": getattr(chunk, 'page_end', 1),
-                    "heading_path": getattr(chunk, 'heading_path', []),
-                    "chunk_index": getattr(chunk, 'chunk_index', 0)
-                }
-                chunk_dicts.append(chunk_dict)
+        # Parsed JSON yields dicts; dump Pydantic models if any were passed in
+        chunk_dicts = [chunk if isinstance(chunk, dict) else chunk.model_dump() for chunk in chunks]
         
         # Run validation checks
         quality_results = []
         safety_results = validate_embedding_safety(chunk_dicts, target_range=(400, 800))
+        # Returned to the client as token_distribution; the index set is not JSON data
+        safety_results.pop("keep_indices", None)
         
         # Basic chunk validation without strict errors
         try:
@@ -2003,14 +2941,18 @@ async def validate_json_file(
                 "message": str(e)
             })
         
-        # Token distribution analysis
-        token_counts = [c.get("token_count", 0) for c in chunk_dicts]
-        token_stats = {
-            "min": min(token_counts) if token_counts else 0,
-            "max": max(token_counts) if token_counts else 0,
-            "mean": sum(token_counts) / len(token_counts) if token_counts else 0,
-            "total": sum(token_counts)
-        }
+        # Token distribution analysis (one vectorized pass over the counts)
+        token_counts = np.fromiter((c.get("token_count", 0) for c in chunk_dicts),
+                                   dtype=np.int64, count=len(chunk_dicts))
+        if token_counts.size:
+            token_stats = {
+                "min": int(token_counts.min()),
+                "max": int(token_counts.max()),
+                "mean": float(token_counts.mean()),
+                "total": int(token_counts.sum())
+            }
+        else:
+            token_stats = {"min": 0, "max": 0, "mean": 0, "total": 0}
         
         # Content analysis
         content_analysis = {
@@ -2052,7 +2994,7 @@ async def validate_json_file(
         
         return validation_report
         
-    except json.JSONDecodeError:
+    except JSON_PARSE_ERRORS:
         raise HTTPException(
             status_code=400,
             detail="Invalid JSON format"
@@ -2093,32 +3035,24 @@ def extract_citations_for_all_categories(source_metadata_list: list, max_per_cat
     
     # Process each category separately to ensure all categories are represented
     for category_name, category_docs in by_category.items():
-        seen_in_category = set()  # Track duplicates within THIS category only
         category_citations = []
-        duplicates_in_cat = 0
         
         print(f"\n🔍 Processing {category_name}:")
         
+        # Dedupe within THIS category only, keeping the first (title, section)
+        unique_docs = {}
         for meta in category_docs:
-            # Stop if we have enough citations from this category
-            if len(category_citations) >= max_per_category:
-                print(f"   ✂️ Reached max citations for {category_name} ({max_per_category})")
-                break
-            
+            doc_key = (meta.get('title', 'Unknown Document').strip(), meta.get('heading_path', '').strip())
+            unique_docs.setdefault(doc_key, meta)
+        duplicates_in_cat = len(category_docs) - len(unique_docs)
+        
+        if len(unique_docs) > max_per_category:
+            print(f"   ✂️ Reached max citations for {category_name} ({max_per_category})")
+        
+        for meta in list(unique_docs.values())[:max_per_category]:
             title = meta.get('title', 'Unknown Document')
             section = meta.get('heading_path', '')  # Use heading as section identifier
             
-            # Create unique key within this category
-            doc_key = (title.strip(), section.strip())
-            
-            # Skip duplicates within this category
-            if doc_key in seen_in_category:
-                duplicates_in_cat += 1
-                print(f"   ⏭️  Skipping duplicate: {title}")
-                continue
-                
-            seen_in_category.add(doc_key)
-            
             citation = {
                 "id": f"citation-{len(all_citations)+1}",
                 "doc_title": title,
@@ -2156,16 +3090,64 @@ def extract_citations_for_all_categories(source_metadata_list: list, max_per_cat
     
     return all_citations
 
-def extract_citations_with_openai(llm_response: str, source_metadata_list: list) -> list:
+# Numbered citation lines in the format the answer prompt asks for:
+# "1. Title: ... | Category: ... | Section: ... | Date: ... | Start Page: ... | End Page: ..."
+CITATIONS_BLOCK_RE = re.compile(r'\n\s*Citations:\s*\n(?P<body>.*)$', re.DOTALL)
+CITATION_LINE_RE = re.compile(
+    r'^[ \t]*\d+\.[ \t]*Title:[ \t]*(?P<title>[^|\n]+?)[ \t]*'
+    r'\|[ \t]*Category:[ \t]*(?P<category>[^|\n]+?)[ \t]*'
+    r'\|[ \t]*Section:[ \t]*(?P<section>[^|\n]*?)[ \t]*'
+    r'(?:\|[ \t]*Date:[ \t]*(?P<date>[^|\n]*?)[ \t]*)?'
+    r'(?:\|[ \t]*Start Page:[ \t]*(?P<start_page>[^|\n]*?)[ \t]*)?'
+    r'(?:\|[ \t]*End Page:[ \t]*(?P<end_page>[^|\n]*?)[ \t]*)?$',
+    re.MULTILINE | re.IGNORECASE
+)
+
+
+def _page_number(value: Optional[str]) -> Optional[int]:
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def split_citations_section(llm_response: str) -> tuple:
     """
-    Extract citations from LLM response using OpenAI for intelligent parsing.
-    Returns a list of properly formatted citation objects.
+    Split an answer at its "Citations:" section with a single regex match.
+    
+    Returns:
+        (answer text before the section, citations section text or "")
     """
-    cites = []
+    block = CITATIONS_BLOCK_RE.search(llm_response)
+    if not block:
+        return llm_response, ""
+    return llm_response[:block.start()], block["body"]
+
+
+def parse_citation_lines(citations_text: str) -> list:
+    """
+    Parse the numbered lines of a "Citations:" section.
     
-    try:
-        # Create a more specific prompt to extract citations
-        citation_extraction_prompt = f"""
+    Returns:
+        List of dicts with title, category, section, date, start_page and
+        end_page (the same shape the LLM extraction returns); empty when the
+        lines are not in the expected format
+    """
+    return [
+        {
+            "title": match["title"],
+            "category": match["category"],
+            "section": match["section"],
+            "date": match["date"] or "",
+            "start_page": _page_number(match["start_page"]),
+            "end_page": _page_number(match["end_page"])
+        }
+        for match in CITATION_LINE_RE.finditer(citations_text)
+    ]
+
+
+def _extract_citations_via_llm(llm_response: str) -> list:
+    """Fallback: ask the LLM to turn a free-form Citations section into a JSON list."""
+    # Create a more specific prompt to extract citations
+    citation_extraction_prompt = f"""
 You are a citation extraction assistant. Extract citations from the following text and return them as a valid JSON array.
 
 Text to extract citations from:
@@ -2192,64 +3174,78 @@ Example output format:
 Return ONLY the JSON array, no other text.
 """
 
-        # Use OpenAI to extract citations
-        citation_response = LLM.invoke(citation_extraction_prompt)
-        citations_json = citation_response.content if hasattr(citation_response, "content") else str(citation_response)
-        
-        
-        
-        # Clean the response - remove any markdown formatting
-        citations_json = citations_json.strip()
-        if citations_json.startswith("```json"):
-            citations_json = citations_json[7:]
-        if citations_json.endswith("```"):
-            citations_json = citations_json[:-3]
-        citations_json = citations_json.strip()
-        
-        # Parse the JSON response
-        import json
-        extracted_citations = json.loads(citations_json)
-        
+    # Use OpenAI to extract citations
+    citation_response = LLM.invoke(citation_extraction_prompt)
+    citations_json = citation_response.content if hasattr(citation_response, "content") else str(citation_response)
+    
+    # Clean the response - remove any markdown formatting
+    citations_json = citations_json.strip()
+    if citations_json.startswith("```json"):
+        citations_json = citations_json[7:]
+    if citations_json.endswith("```"):
+        citations_json = citations_json[:-3]
+    citations_json = citations_json.strip()
+    
+    # Parse the JSON response
+    return json.loads(citations_json)
+
+
+def extract_citations_with_openai(llm_response: str, source_metadata_list: list,
+                                  citations_text: Optional[str] = None) -> list:
+    """
+    Extract citations from the LLM response and enrich them with source metadata.
+    
+    The Citations block is parsed with CITATION_LINE_RE; only when it does
+    not follow the prompted format is OpenAI asked to parse it. Pass
+    citations_text when the caller has already split the response.
+    Returns a list of properly formatted citation objects.
+    """
+    cites = []
+    
+    try:
+        if citations_text is None:
+            _, citations_text = split_citations_section(llm_response)
+        extracted_citations = parse_citation_lines(citations_text)
+        if not extracted_citations:
+            extracted_citations = _extract_citations_via_llm(llm_response)
+        
+        # Keep the first citation per document section (section included for uniqueness)
+        unique_citations = {}
+        for citation_data in extracted_citations:
+            doc_key = (
+                citation_data.get("title", "Unknown Document").strip(),
+                citation_data.get("category", "Unknown Category").strip(),
+                citation_data.get("section", "").strip()
+            )
+            unique_citations.setdefault(doc_key, citation_data)
         
+        # Index source metadata once (first occurrence wins, as with a linear scan)
+        meta_by_title_category = {}
+        meta_by_title = {}
+        for meta in source_metadata_list:
+            meta_by_title_category.setdefault((meta['title'], meta['category']), meta)
+            meta_by_title.setdefault(meta['title'], meta)
         
         # Convert to proper citation format
-        seen_documents = set()
-        
-        for citation_data in extracted_citations:
+        for citation_data in unique_citations.values():
             title = citation_data.get("title", "Unknown Document")
             category = citation_data.get("category", "Unknown Category")
-            section = citation_data.get("section", "")
-            
-            # Create unique identifier for this document section (include section for uniqueness)
-            doc_key = (title.strip(), category.strip(), section.strip())
             
-            # Skip if we've already seen this document section
-            if doc_key in seen_documents:
-                continue
-                
-            seen_documents.add(doc_key)
+            # Find matching source metadata for rich fields; if no exact match
+            # found, fall back to any document with the same title
+            matching_meta = meta_by_title_category.get((title, category)) or meta_by_title.get(title)
             
-            # Find matching source metadata for rich fields
-            matching_meta = None
-            for meta in source_metadata_list:
-                if (meta['title'] == title and meta['category'] == category):
-                    matching_meta = meta
-                    break
-            
-            # If no exact match found, try to find any document with the same title
-            if not matching_meta:
-                for meta in source_metadata_list:
-                    if meta['title'] == title:
-                        matching_meta = meta
-                        break
+            # Page span, computed once for the fields below
+            start_page = citation_data.get('start_page')
+            end_page = citation_data.get('end_page')
+            has_pages = bool(start_page and end_page)
+            pages = f"{start_page}-{end_page}" if has_pages else ""
             
             # Build citation with rich metadata
             quote_content = matching_meta['content'] if matching_meta else ""
-            print(f"🔍 DEBUG: Citation for '{title}' - Quote length: {len(quote_content)}")
-            if quote_content:
-                print(f"📝 DEBUG: Quote preview: {quote_content[:100]}...")
-            else:
-                print(f"❌ DEBUG: No quote content found for '{title}'")
+            logger.debug("Citation for '%s' - Quote length: %d", title, len(quote_content))
+            if not quote_content:
+                logger.debug("No quote content found for '%s'", title)
             
             citation_entry = {
                 "id": f"citation-{len(cites) + 1}",
@@ -2259,7 +3255,7 @@ Return ONLY the JSON array, no other text.
                 "section": citation_data.get("section", ""),
                 "date": citation_data.get("date", ""),
                 "quote": quote_content,
-                "pages": f"{citation_data.get('start_page', '')}-{citation_data.get('end_page', '')}" if citation_data.get('start_page') and citation_data.get('end_page') else "",
+                "pages": pages,
                 "heading_path": matching_meta['heading_path'] if matching_meta else "",
                 "hierarchy_path": matching_meta['heading_path'] if matching_meta else "",
                 "year": matching_meta['year'] if matching_meta else "",
@@ -2270,31 +3266,73 @@ Return ONLY the JSON array, no other text.
                     "section": citation_data.get("section", ""),
                     "date": citation_data.get("date", ""),
                     "year": matching_meta['year'] if matching_meta else "",
-                    "pages": f"{citation_data.get('start_page', '')}-{citation_data.get('end_page', '')}" if citation_data.get('start_page') and citation_data.get('end_page') else "",
+                    "pages": pages,
                     "heading_path": matching_meta['heading_path'] if matching_meta else ""
                 },
                 "meta": {
                     "document_number": matching_meta['document_number'] if matching_meta else "",
                     "chunk_index": matching_meta['chunk_index'] if matching_meta else "",
                     "page_span": {
-                        "start": citation_data.get('start_page'),
-                        "end": citation_data.get('end_page')
-                    } if citation_data.get('start_page') and citation_data.get('end_page') else None
+                        "start": start_page,
+                        "end": end_page
+                    } if has_pages else None
                 }
             }
             cites.append(citation_entry)
 
     except Exception as e:
-        print(f"Error extracting citations with OpenAI: {e}")
-        print(f"Raw response was: {citations_json if 'citations_json' in locals() else 'No response'}")
+        print(f"Error extracting citations: {e}")
         # Fallback: return empty citations
         cites = []
     
     return cites
 
 # === Q&A ENDPOINTS ===
-@app.post("/v1/ask", response_model=AskResponse)
-async def ask_question(req: AskRequest):
+# Much more specific greeting detection - only catch standalone greetings
+STANDALONE_GREETINGS = (
+    'hi', 'hello', 'hey', 'hi there', 'hello there',
+    'good morning', 'good afternoon', 'good evening', 'good day',
+    'how are you', 'how do you do', 'how are things',
+    'greetings', 'what\'s up', 'whats up', 'sup',
+    'hi!', 'hello!', 'hey!', 'hi.', 'hello.', 'hey.'
+)
+# Phrases that only make sense with conversation history
+CONTEXT_DEPENDENT_PHRASES = (
+    'last message', 'previous question', 'what did i', 'before this', 'earlier',
+    'my last', 'i asked', 'i said', 'you said', 'we discussed', 'you mentioned',
+    'what was the last', 'previous', 'before'
+)
+# Phrases that specifically ask about the previous conversation
+CONVERSATION_REFERENCE_PHRASES = (
+    'last message', 'previous question', 'what did i', 'i asked', 'you said',
+    'we discussed', 'what was the last'
+)
+
+# Words that refer back to something not yet mentioned
+PRONOUN_WORDS = frozenset(('them', 'those', 'it', 'this', 'that', 'these'))
+# Follow-up requests that can be answered from conversation history alone
+FOLLOW_UP_PHRASES = ('summarize', 'explain', 'tell me more', 'elaborate', 'them', 'those', 'it', 'that')
+
+
+def _phrase_alternation(phrases) -> re.Pattern:
+    """Compile literal phrases into one alternation (longest first) for a single scan."""
+    return re.compile('|'.join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True)))
+
+
+STANDALONE_GREETING_SET = frozenset(STANDALONE_GREETINGS)
+CONTEXT_DEPENDENT_RE = _phrase_alternation(CONTEXT_DEPENDENT_PHRASES)
+CONVERSATION_REFERENCE_RE = _phrase_alternation(CONVERSATION_REFERENCE_PHRASES)
+FOLLOW_UP_RE = _phrase_alternation(FOLLOW_UP_PHRASES)
+
+
+async def _prepare_question(req: AskRequest) -> Union[AskResponse, Dict[str, Any]]:
+    """
+    Shared front half of /v1/ask and /v1/ask/stream: handle greetings and
+    context-free follow-ups, retrieve documents and build the prompt inputs.
+    
+    Returns an AskResponse when the question is answered without the LLM,
+    otherwise a dict with the prompt inputs, category and source metadata.
+    """
     if not QA_AVAILABLE:
         raise HTTPException(500, "Q&A functionality not available - missing dependencies")
     if not os.environ.get("OPENAI_API_KEY"):
@@ -2303,22 +3341,11 @@ async def ask_question(req: AskRequest):
     # Handle greetings and casual interactions - ONLY pure greetings
     question_lower = req.question.lower().strip()
     
-    # Much more specific greeting detection - only catch standalone greetings
-    standalone_greetings = [
-        'hi', 'hello', 'hey', 'hi there', 'hello there',
-        'good morning', 'good afternoon', 'good evening', 'good day',
-        'how are you', 'how do you do', 'how are things',
-        'greetings', 'what\'s up', 'whats up', 'sup',
-        'hi!', 'hello!', 'hey!', 'hi.', 'hello.', 'hey.'
-    ]
-    
-    # Only respond with greeting if:
-    # 1. The query exactly matches a greeting (with optional punctuation)
-    # 2. OR it's a very short query (< 25 chars) that's mostly a greeting
+    # Only respond with greeting if the query exactly matches a standalone
+    # greeting (with optional trailing punctuation)
     is_pure_greeting = (
-        question_lower in standalone_greetings or
-        question_lower.rstrip('!.?') in standalone_greetings or
-        (len(req.question.strip()) < 25 and any(req.question.strip().lower() == pattern for pattern in standalone_greetings))
+        question_lower in STANDALONE_GREETING_SET or
+        question_lower.rstrip('!.?') in STANDALONE_GREETING_SET
     )
     
     if is_pure_greeting:
@@ -2334,27 +3361,18 @@ async def ask_question(req: AskRequest):
             citations=[]
         )
 
-    # Check for context-dependent questions when no conversation history exists
-    context_dependent_phrases = [
-        'last message', 'previous question', 'what did i', 'before this', 'earlier',
-        'my last', 'i asked', 'i said', 'you said', 'we discussed', 'you mentioned',
-        'what was the last', 'previous', 'before'
-    ]
-    
     # If this looks like a context-dependent question but we have no conversation history
     if not req.conversation_history or len(req.conversation_history) == 0:
-        if any(phrase in question_lower for phrase in context_dependent_phrases):
+        if CONTEXT_DEPENDENT_RE.search(question_lower):
             # Check if it's specifically asking about previous conversation
-            conversation_phrases = ['last message', 'previous question', 'what did i', 'i asked', 'you said', 'we discussed', 'what was the last']
-            if any(phrase in question_lower for phrase in conversation_phrases):
+            if CONVERSATION_REFERENCE_RE.search(question_lower):
                 return AskResponse(
                     answer="This appears to be the start of our conversation, so there's no previous message history to reference. Feel free to ask me any questions about your organizational documents, policies, resolutions, or procedures! I'm here to help you find the information you need.",
                     citations=[]
                 )
             
             # For other context-dependent words like "them", "those", "it", ask for clarification
-            pronoun_phrases = ['them', 'those', 'it', 'this', 'that', 'these']
-            if any(word in question_lower.split() for word in pronoun_phrases):
+            if not PRONOUN_WORDS.isdisjoint(question_lower.split()):
                 return AskResponse(
                     answer="I'd be happy to help! Could you please be more specific about what you're referring to? Since this is the beginning of our conversation, I don't have previous context to reference. Feel free to ask about any specific documents, policies, or topics you're interested in.",
                     citations=[]
@@ -2406,7 +3424,7 @@ async def ask_question(req: AskRequest):
     # Build conversation context from history
     conversation_context = ""
     if req.conversation_history and len(req.conversation_history) > 0:
-        conversation_context = "Previous conversation:\n"
+        context_parts = ["Previous conversation:\n"]
         # Include last few messages for context (max 10 messages or 2000 chars)
         recent_messages = req.conversation_history[-10:]  # Last 10 messages
         context_chars = 0
@@ -2415,28 +3433,34 @@ async def ask_question(req: AskRequest):
             msg_text = f"{msg.role.capitalize()}: {msg.content}\n"
             if context_chars + len(msg_text) > 2000:  # Limit context size
                 break
-            conversation_context += msg_text
+            context_parts.append(msg_text)
             context_chars += len(msg_text)
-        conversation_context += "\n"
-    else:
-        conversation_context = ""
+        context_parts.append("\n")
+        conversation_context = "".join(context_parts)
 
     # OVER-FETCH then slice: let retriever return many candidates, then take top k
-    all_docs = retriever.get_relevant_documents(req.question)
+    # Embed through the micro-batcher first so the retriever hits the embedding cache
+    await QUERY_EMBEDDING_BATCHER.embed(req.question)
+    if hasattr(retriever, "aget_relevant_documents"):
+        all_docs = await retriever.aget_relevant_documents(req.question)
+    else:
+        all_docs = await asyncio.to_thread(retriever.get_relevant_documents, req.question)
     if not all_docs:
         # Check if this is a contextual query that might not need new documents
-        if req.conversation_history and any(word in req.question.lower() for word in ['summarize', 'explain', 'tell me more', 'elaborate', 'them', 'those', 'it', 'that']):
+        if req.conversation_history and FOLLOW_UP_RE.search(req.question.lower()):
             # This looks like a follow-up question - use conversation context even without new docs
             ctx = "No additional document context found, but using conversation history for response."
         else:
             return AskResponse(answer="I don't have that information in the provided documents.", citations=[])
-    else:
-        ctx = format_context(all_docs)
-
     # debug: (optional) log how many were returned
     # print("retriever returned total:", len(all_docs))
 
-    docs = all_docs  # send top k to LLM
+    # Cap at the retrievers' k (TOP_K), not req.top_k: the chat UI always sends
+    # top_k=1, and the All Categories retriever returns its docs grouped by
+    # category, so a smaller slice would drop whole categories
+    docs = all_docs[:TOP_K]
+    if docs:
+        ctx = format_context(docs)
 
     # Prepare source metadata for LLM
     source_metadata_list = []
@@ -2461,65 +3485,144 @@ async def ask_question(req: AskRequest):
         })
     
     # Format source metadata for LLM
-    source_metadata = ""
-    for i, meta in enumerate(source_metadata_list, 1):
-        source_metadata += f"{i}. Title: {meta['title']}\n"
-        source_metadata += f"   Category: {meta['category']}\n"
-        source_metadata += f"   Section: {meta['section']}\n"
-        source_metadata += f"   Date: {meta['date']}\n"
-        source_metadata += f"   Document Number: {meta['document_number']}\n"
-        source_metadata += f"   Year: {meta['year']}\n"
-        source_metadata += f"   Pages: {meta['page_start']}-{meta['page_end']}\n"
-        source_metadata += f"   Heading Path: {meta['heading_path']}\n"
-        source_metadata += f"   Content Preview: {meta['content'][:200]}...\n\n"
+    source_metadata = "".join(
+        f"{i}. Title: {meta['title']}\n"
+        f"   Category: {meta['category']}\n"
+        f"   Section: {meta['section']}\n"
+        f"   Date: {meta['date']}\n"
+        f"   Document Number: {meta['document_number']}\n"
+        f"   Year: {meta['year']}\n"
+        f"   Pages: {meta['page_start']}-{meta['page_end']}\n"
+        f"   Heading Path: {meta['heading_path']}\n"
+        f"   Content Preview: {meta['content'][:200]}...\n\n"
+        for i, meta in enumerate(source_metadata_list, 1)
+    )
 
-    # Call LLM and get raw content
-    chain = PROMPT | LLM
-    raw_resp = chain.invoke({
+    return {
         "category": category,
-        "question": req.question,
-        "conversation_context": conversation_context,
-        "context": ctx,
-        "source_metadata": source_metadata
-    })
-    ans = raw_resp.content if hasattr(raw_resp, "content") else str(raw_resp)
+        "source_metadata_list": source_metadata_list,
+        "inputs": {
+            "category": category,
+            "question": req.question,
+            "conversation_context": conversation_context,
+            "context": ctx,
+            "source_metadata": source_metadata
+        }
+    }
+
+
+# Answer cleanup patterns (compiled once, used on every /v1/ask response)
+# Inline citations: any parenthetical containing a semicolon, e.g. "(Title; Category; p.3–4)".
+# This one pattern matches everything the former per-format passes did.
+INLINE_CITATION_RE = re.compile(r'\s*\([^)]*;[^)]*\)')
+ANSWER_INLINE_SPACES_RE = re.compile(r'[ \t]+')
+SPACE_BEFORE_PERIOD_RE = re.compile(r'\s+\.')
+SPACE_BEFORE_COMMA_RE = re.compile(r'\s+,')
+
+
+def _finalize_answer(ans: str, category: str, source_metadata_list: list) -> AskResponse:
+    """Strip the citations section and inline citations from the LLM answer and extract citations."""
     # --- CLEAN answer: remove the Citations section and inline citations ---
-    # Remove the entire Citations: section from the answer
-    ans_clean = re.sub(r'\n\s*Citations:\s*\n.*$', '', ans, flags=re.DOTALL | re.MULTILINE)
-    
-    # Remove inline citations in various formats:
-    # Format: (Title; Category; pages)
-    ans_clean = re.sub(r'\s*\([^)]*;\s*[^)]*;\s*p\.\d+[–\-]\d+\)', '', ans_clean, flags=re.IGNORECASE)
-    
-    # Format: (Title; Category; p.X–Y; Section)
-    ans_clean = re.sub(r'\s*\([^)]*;\s*[^)]*;\s*p\.\d+[–\-]\d+;\s*[^)]*\)', '', ans_clean, flags=re.IGNORECASE)
-    
-    # Format: (Title; Category; p.X)
-    ans_clean = re.sub(r'\s*\([^)]*;\s*[^)]*;\s*p\.\d+\)', '', ans_clean, flags=re.IGNORECASE)
+    # Split off the entire Citations: section once; its text feeds citation parsing
+    ans_clean, citations_text = split_citations_section(ans)
     
-    # Generic format: (anything; anything; p.number)
-    ans_clean = re.sub(r'\s*\([^)]*;\s*[^)]*;\s*p\.\d+[–\-]?\d*\)', '', ans_clean, flags=re.IGNORECASE)
-    
-    # Remove any remaining parenthetical citations with semicolons
-    ans_clean = re.sub(r'\s*\([^)]*;[^)]*\)', '', ans_clean, flags=re.IGNORECASE)
+    # Remove inline citations in all formats in one pass
+    ans_clean = INLINE_CITATION_RE.sub('', ans_clean)
     
     # Clean up extra spaces and punctuation issues (but preserve markdown formatting)
     # Only clean up multiple spaces within lines, not newlines
-    ans_clean = re.sub(r'[ \t]+', ' ', ans_clean.strip())  # Replace multiple spaces/tabs with single space
-    ans_clean = re.sub(r'\s+\.', '.', ans_clean)  # Fix spacing before periods
-    ans_clean = re.sub(r'\s+,', ',', ans_clean)   # Fix spacing before commas
+    ans_clean = ANSWER_INLINE_SPACES_RE.sub(' ', ans_clean.strip())  # Replace multiple spaces/tabs with single space
+    ans_clean = SPACE_BEFORE_PERIOD_RE.sub('.', ans_clean)  # Fix spacing before periods
+    ans_clean = SPACE_BEFORE_COMMA_RE.sub(',', ans_clean)   # Fix spacing before commas
 
     # --- Extract citations using OpenAI ---
     # For "All Categories", force citations for ALL documents to guarantee quotes from each category
     if category == "All Categories":
         cites = extract_citations_for_all_categories(source_metadata_list)
     else:
-        cites = extract_citations_with_openai(ans, source_metadata_list)
+        cites = extract_citations_with_openai(ans, source_metadata_list, citations_text)
     
     # Return cleaned answer and separate citations
     return AskResponse(answer=ans_clean, citations=cites)
 
 
+@app.post("/v1/ask", response_model=AskResponse)
+async def ask_question(req: AskRequest):
+    prepared = await _prepare_question(req)
+    if isinstance(prepared, AskResponse):
+        return prepared
+    
+    # Call LLM and get raw content
+    raw_resp = await LLM.ainvoke(build_answer_messages(prepared["inputs"]))
+    ans = raw_resp.content if hasattr(raw_resp, "content") else str(raw_resp)
+    
+    # Citation extraction may call the LLM again (blocking client)
+    return await asyncio.to_thread(_finalize_answer, ans, prepared["category"], prepared["source_metadata_list"])
+
+
+# Start of the citations block the model appends to its answer
+CITATIONS_MARKER = "Citations:"
+
+
+def _sse(payload: dict) -> str:
+    """Format one server-sent event."""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/ask/stream")
+async def ask_question_stream(req: AskRequest):
+    """
+    Streaming variant of /v1/ask using server-sent events.
+    
+    Emits {"token": ...} events as the answer is generated (the trailing
+    Citations section is not streamed), then one final event with the
+    cleaned "answer", "citations" and "done": true.
+    """
+    prepared = await _prepare_question(req)
+    
+    async def events():
+        if isinstance(prepared, AskResponse):
+            yield _sse({"answer": prepared.answer, "citations": prepared.citations, "done": True})
+            return
+        
+        ans = ""
+        streamed = 0
+        holdback = len(CITATIONS_MARKER)  # A marker may be split across tokens
+        citations_started = False
+        
+        async for chunk in LLM.astream(build_answer_messages(prepared["inputs"])):
+            ans += chunk.content if hasattr(chunk, "content") else str(chunk)
+            if citations_started:
+                continue
+            
+            marker_at = ans.find(CITATIONS_MARKER, max(0, streamed - holdback))
+            if marker_at >= 0:
+                citations_started = True
+                safe_end = marker_at
+            else:
+                safe_end = len(ans) - holdback
+            
+            if safe_end > streamed:
+                yield _sse({"token": ans[streamed:safe_end]})
+                streamed = safe_end
+        
+        if not citations_started and len(ans) > streamed:
+            yield _sse({"token": ans[streamed:]})
+        
+        result = await asyncio.to_thread(_finalize_answer, ans, prepared["category"], prepared["source_metadata_list"])
+        yield _sse({"answer": result.answer, "citations": result.citations, "done": True})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+
+QA_SETTINGS = {
+    "top_k": TOP_K,
+    "fetch_k": FETCH_K,
+    "mmr_lambda": MMR_LAMBDA,
+    "answer_model": ANSWER_MODEL
+}
+
 
 @app.get("/v1/qa-status")
 async def qa_status():
@@ -2529,131 +3632,188 @@ async def qa_status():
         "openai_configured": bool(os.getenv("OPENAI_API_KEY")),
         "retrieval_backend": RETRIEVAL_BACKEND if QA_AVAILABLE else None,
         "supported_categories": QA_CATEGORIES,
-        "settings": {
-            "top_k": TOP_K,
-            "fetch_k": FETCH_K,
-            "mmr_lambda": MMR_LAMBDA,
-            "answer_model": ANSWER_MODEL
-        } if QA_AVAILABLE else None
+        "settings": QA_SETTINGS if QA_AVAILABLE else None
     }
 
 
+# Static informational endpoints: payloads are fixed at import time, so the
+# responses are built (and serialized) once and returned as-is
+HEALTH_RESPONSE = JSON_RESPONSE_CLASS({
+    "status": "healthy", 
+    "phase": "5", 
+    "service": "acep-preprocessing",
+    "version": "1.1.0",
+    "python_version": sys.version.split()[0],
+    "platform": platform.system(),
+    "max_file_size_mb": MAX_FILE_SIZE // (1024 * 1024),
+    "supported_extensions": SUPPORTED_EXTENSIONS_SORTED
+})
+
+# Keyed by the canonical category names so clients can look up each entry of
+# "categories" (note the two spaces in "External Advocacy &  Communications")
+CATEGORY_DESCRIPTIONS = {
+    "Resolutions": "Official ACEP resolutions and position statements",
+    "Policy & Position Statements": "Clinical policies and official position papers", 
+    "Board and Committee Proceedings": "Board meeting minutes and committee proceedings",
+    "Bylaws & Governance Policies": "Organizational bylaws and governance documents",
+    "External Advocacy &  Communications": "External communications and advocacy materials"
+}
+
+CATEGORIES_RESPONSE = JSON_RESPONSE_CLASS({
+    "categories": list(CATEGORIES),
+    "count": len(CATEGORIES),
+    "descriptions": CATEGORY_DESCRIPTIONS
+})
+
+OCR_LANGUAGE_NAMES = {
+    "eng": "English",
+    "fra": "French", 
+    "deu": "German",
+    "spa": "Spanish",
+    "ita": "Italian",
+    "por": "Portuguese",
+    "rus": "Russian",
+    "chi_sim": "Chinese Simplified",
+    "chi_tra": "Chinese Traditional",
+    "jpn": "Japanese",
+    "kor": "Korean"
+}
+
+OCR_LANGUAGES_RESPONSE = JSON_RESPONSE_CLASS({
+    "languages": OCR_LANGUAGES_SORTED,
+    "count": len(OCR_LANGUAGES),
+    "language_names": OCR_LANGUAGE_NAMES,
+    "default": "eng"
+})
+
+LIMITS_RESPONSE = JSON_RESPONSE_CLASS({
+    "file_size": {
+        "max_bytes": MAX_FILE_SIZE,
+        "max_mb": MAX_FILE_SIZE // (1024 * 1024)
+    },
+    "chunking": {
+        "max_tokens_per_chunk": MAX_TOKENS_PER_CHUNK,
+        "max_overlap_tokens": MAX_OVERLAP_TOKENS,
+        "min_tokens_per_chunk": 100,
+        "min_overlap_tokens": 0
+    },
+    "text_fields": {
+        "max_title_length": 200,
+        "max_document_number_length": 50
+    },
+    "year_range": {
+        "min_year": 1970,
+        "max_year": 2030
+    },
+    "version_range": {
+        "min_version": 1,
+        "max_version": 100
+    },
+    "ocr": {
+        "min_dpi": 150,
+        "max_dpi": 600,
+        "default_dpi": 300
+    }
+})
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint with system information."""
-    import sys
-    import platform
-    return {
-        "status": "healthy", 
-        "phase": "5", 
-        "service": "acep-preprocessing",
-        "version": "1.1.0",
-        "python_version": sys.version.split()[0],
-        "platform": platform.system(),
-        "max_file_size_mb": MAX_FILE_SIZE // (1024 * 1024),
-        "supported_extensions": sorted(SUPPORTED_EXTENSIONS)
-    }
+    return HEALTH_RESPONSE
 
 
 @app.get("/categories")
 async def get_categories():
     """Get valid document categories with descriptions."""
-    category_descriptions = {
-        "Resolutions": "Official ACEP resolutions and position statements",
-        "Policy & Position Statements": "Clinical policies and official position papers", 
-        "Board & Committee Proceedings": "Board meeting minutes and committee proceedings",
-        "Bylaws & Governance Policies": "Organizational bylaws and governance documents",
-        "External Advocacy & Communications": "External communications and advocacy materials"
-    }
-    
-    return {
-        "categories": list(CATEGORIES),
-        "count": len(CATEGORIES),
-        "descriptions": category_descriptions
-    }
+    return CATEGORIES_RESPONSE
 
 
 @app.get("/ocr-languages")
 async def get_ocr_languages():
     """Get supported OCR languages."""
-    language_names = {
-        "eng": "English",
-        "fra": "French", 
-        "deu": "German",
-        "spa": "Spanish",
-        "ita": "Italian",
-        "por": "Portuguese",
-        "rus": "Russian",
-        "chi_sim": "Chinese Simplified",
-        "chi_tra": "Chinese Traditional",
-        "jpn": "Japanese",
-        "kor": "Korean"
-    }
-    
-    return {
-        "languages": sorted(OCR_LANGUAGES),
-        "count": len(OCR_LANGUAGES),
-        "language_names": language_names,
-        "default": "eng"
-    }
+    return OCR_LANGUAGES_RESPONSE
 
 
 @app.get("/limits")
 async def get_system_limits():
     """Get system limits and constraints."""
-    return {
-        "file_size": {
-            "max_bytes": MAX_FILE_SIZE,
-            "max_mb": MAX_FILE_SIZE // (1024 * 1024)
-        },
-        "chunking": {
-            "max_tokens_per_chunk": MAX_TOKENS_PER_CHUNK,
-            "max_overlap_tokens": MAX_OVERLAP_TOKENS,
-            "min_tokens_per_chunk": 100,
-            "min_overlap_tokens": 0
-        },
-        "text_fields": {
-            "max_title_length": 200,
-            "max_document_number_length": 50
-        },
-        "year_range": {
-            "min_year": 1970,
-            "max_year": 2030
-        },
-        "version_range": {
-            "min_version": 1,
-            "max_version": 100
-        },
-        "ocr": {
-            "min_dpi": 150,
-            "max_dpi": 600,
-            "default_dpi": 300
-        }
-    }
+    return LIMITS_RESPONSE
 
 
-@app.get("/documents_by_category/{category}")
-async def get_documents_by_category(category: str):
-    """Get all unique document filenames for a given category from Supabase."""
-    try:
-        from supabase import create_client
-        import re
-    except ImportError:
-        raise HTTPException(500, "Supabase dependencies not available")
-    
-    # Validate category
-    if category not in SUPABASE_TABLE_BY_CATEGORY:
-        raise HTTPException(400, f"Invalid category. Valid categories are: {list(SUPABASE_TABLE_BY_CATEGORY.keys())}")
+# Processed filenames look like "<name>__<timestamp>.json"
+MEETING_FILENAME_KEYWORDS = ('meeting', 'minutes', 'board')
+
+# Metadata fields the document listing reads; only these are fetched per chunk
+DOCUMENT_LISTING_FIELDS = (
+    'title', 'document_number', 'issued_date', 'year', 'version', 'doc_version', 'is_current'
+)
+DOCUMENT_LISTING_SELECT = ",".join(
+    ["source_file:metadata->>source_file"]
+    + [f"{field}:metadata->{field}" for field in DOCUMENT_LISTING_FIELDS]
+)
+
+
+def _strip_timestamp_suffix(name: str, ext: str = "") -> str:
+    """
+    Remove a trailing "__<digits>" (followed by ext, if given) from a name.
     
-    # Get Supabase credentials
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
-    if not url or not key:
-        raise HTTPException(500, "Supabase credentials not configured")
+    Plain string equivalent of re.sub(r'__\d+<ext>$', '', name); names
+    without that suffix are returned unchanged.
+    """
+    if ext:
+        if not name.endswith(ext):
+            return name
+        stem = name[:-len(ext)]
+    else:
+        stem = name
+    idx = stem.rfind('__')
+    if idx == -1:
+        return name
+    tail = stem[idx + 2:]
+    return stem[:idx] if tail.isdecimal() else name
+
+
+def _documents_summary_rows(client, table_name: str, category: str) -> list:
+    """
+    One row per source file in a category: source_file, a sample chunk's
+    DOCUMENT_LISTING_FIELDS and the file's chunk count.
     
-    # Create Supabase client
-    client = create_client(url, key)
-    table_name = SUPABASE_TABLE_BY_CATEGORY[category]
+    Uses the documents_summary_by_category RPC (see supabase_functions.sql) so
+    Postgres does the grouping; falls back to selecting just those metadata
+    fields for every chunk and aggregating in one pass when the function has
+    not been created yet.
+    """
+    try:
+        params = {"tbl": table_name}
+        if USE_UNIFIED_CHUNKS_TABLE:
+            params["p_category"] = category
+        return rpc_rows(client, "documents_summary_by_category", params)
+    except Exception as e:
+        print(f"⚠️ documents_summary_by_category RPC unavailable, aggregating locally: {e}")
+    
+    result = scope_to_category(
+        client.table(table_name).select(DOCUMENT_LISTING_SELECT), category
+    ).execute()
+    summary = {}
+    for row in result.data or []:
+        source_file = row.get('source_file')
+        if not source_file:
+            continue
+        entry = summary.get(source_file)
+        if entry is None:
+            metadata = {field: row[field] for field in DOCUMENT_LISTING_FIELDS if row.get(field) is not None}
+            summary[source_file] = {"source_file": source_file, "metadata": metadata, "chunks": 1}
+        else:
+            entry["chunks"] += 1
+    return list(summary.values())
+
+
+async def _fetch_documents_by_category(category: str) -> dict:
+    """Query Supabase for the unique documents of a validated category."""
+    # Reuse the shared Supabase client (persistent connection pool)
+    client = get_retrieval_client()
+    table_name = vector_table_name(category)
     
     def extract_original_filename(source_file: str) -> str:
         """Extract original filename from processed source_file name"""
@@ -2664,24 +3824,44 @@ async def get_documents_by_category(category: str):
         base_name = source_file.replace('.json', '')
         
         # Remove timestamp suffix (pattern: __numbers)
-        original_name = re.sub(r'__\d+$', '', base_name)
+        original_name = _strip_timestamp_suffix(base_name)
         
         # Convert underscores back to spaces and hyphens for readability
         readable_name = original_name.replace('_', ' ')
         
         # Add appropriate extensions based on content
-        if any(keyword in readable_name.lower() for keyword in ['meeting', 'minutes', 'board']):
+        if any(keyword in readable_name.lower() for keyword in MEETING_FILENAME_KEYWORDS):
             return f"{readable_name}.pdf"
         elif 'resolution' in readable_name.lower():
             return f"{readable_name}.pdf" if not readable_name.endswith('.docx') else f"{readable_name}.docx"
         else:
             return f"{readable_name}.pdf"  # Default to PDF
     
+    def build_doc_info(source_file: str, title, metadata: dict, version, is_current: bool, chunks: int) -> dict:
+        """Document listing entry; fields whose value is None are left out."""
+        original_filename = extract_original_filename(source_file)
+        doc_info = {}
+        for field, value in (
+            ("filename", original_filename),
+            ("source_file", source_file),
+            ("title", title or original_filename),
+            ("document_number", metadata.get('document_number', title)),
+            ("issued_date", metadata.get('issued_date')),
+            ("year", metadata.get('year')),
+            ("version", version),
+            ("is_current", is_current),
+            ("chunks", chunks)
+        ):
+            if value is not None:
+                doc_info[field] = value
+        return doc_info
+    
     try:
-        # Query to get unique document information from the category table
-        result = client.table(table_name).select("metadata").execute()
+        # One row per source file with its chunk count, aggregated in Postgres
+        # (blocking Supabase I/O runs in a worker thread, off the event loop)
+        summary_rows = await asyncio.to_thread(_documents_summary_rows, client, table_name, category)
         
-        if not result.data:
+        if not summary_rows:
             return {
                 "category": category,
                 "table": table_name,
@@ -2690,104 +3870,114 @@ async def get_documents_by_category(category: str):
                 "message": "No documents found for this category"
             }
         
+        # Chunks per base name, across every timestamped upload of a file
+        chunks_by_base = Counter()
+        for row in summary_rows:
+            if row.get('source_file'):
+                chunks_by_base[_strip_timestamp_suffix(row['source_file'], '.json')] += row['chunks']
+        
         # Extract unique documents from metadata using source_file field
         unique_documents = {}  # Use dict to avoid duplicates by source file
         
-        for row in result.data:
-            metadata = row.get('metadata', {})
-            if isinstance(metadata, dict):
-                source_file = metadata.get('source_file')
-                title = metadata.get('title')
+        for row in summary_rows:
+            source_file = row.get('source_file')
+            if not source_file:
+                continue
+            # Summary rows carry a plain dict of listing fields (see _documents_summary_rows)
+            metadata = row.get('metadata') or {}
+            title = metadata.get('title')
+            
+            # Remove timestamp duplicates - keep only unique base names
+            base_source = _strip_timestamp_suffix(source_file, '.json')
+            
+            # Group by title instead of source_file to properly handle versions
+            doc_key = title or base_source
+            
+            if doc_key not in unique_documents:
+                unique_documents[doc_key] = build_doc_info(
+                    source_file, title, metadata,
+                    metadata.get('version') or metadata.get('doc_version', "1"),
+                    bool(metadata.get('is_current', True)),
+                    chunks_by_base[base_source]
+                )
+            else:
+                # If multiple entries for same title, keep the current one or highest version
+                prev = unique_documents[doc_key]
+                current_version = metadata.get('version') or metadata.get('doc_version', "1")
+                current_is_current = bool(metadata.get('is_current', True))
                 
-                if source_file:
-                    # Remove timestamp duplicates - keep only unique base names
-                    base_source = re.sub(r'__\d+\.json$', '', source_file)
-                    
-                    # Group by title instead of source_file to properly handle versions
-                    doc_key = title or base_source
-                    
-                    if doc_key not in unique_documents:
-                        original_filename = extract_original_filename(source_file)
-                        
-                        # Count chunks for this document
-                        doc_chunks = sum(1 for r in result.data 
-                                       if r.get('metadata', {}).get('source_file', '').startswith(base_source))
-                        
-                        doc_info = {
-                            "filename": original_filename,
-                            "source_file": source_file,
-                            "title": title or original_filename,
-                            "document_number": metadata.get('document_number', title),
-                            "issued_date": metadata.get('issued_date'),
-                            "year": metadata.get('year'),
-                            "version": metadata.get('version') or metadata.get('doc_version', "1"),
-                            "is_current": bool(metadata.get('is_current', True)),
-                            "chunks": doc_chunks
-                        }
-                        
-                        # Clean up None values
-                        doc_info = {k: v for k, v in doc_info.items() if v is not None}
-                        unique_documents[doc_key] = doc_info
-                    else:
-                        # If multiple entries for same title, keep the current one or highest version
-                        prev = unique_documents[doc_key]
-                        current_version = metadata.get('version') or metadata.get('doc_version', "1")
-                        current_is_current = bool(metadata.get('is_current', True))
-                        
-                        # Prefer current version; if both current or both not, pick higher version
-                        prev_is_current = prev.get("is_current", True)
-                        prev_version = prev.get("version", "1")
-                        
-                        # String comparison for versions (works for both numeric and alphanumeric)
-                        should_replace = (current_is_current and not prev_is_current) or \
-                                       (current_is_current == prev_is_current and str(current_version) > str(prev_version))
-                        
-                        if should_replace:
-                            original_filename = extract_original_filename(source_file)
-                            doc_chunks = sum(1 for r in result.data 
-                                           if r.get('metadata', {}).get('source_file', '').startswith(base_source))
-                            
-                            doc_info = {
-                                "filename": original_filename,
-                                "source_file": source_file,
-                                "title": title or original_filename,
-                                "document_number": metadata.get('document_number', title),
-                                "issued_date": metadata.get('issued_date'),
-                                "year": metadata.get('year'),
-                                "version": current_version,
-                                "is_current": current_is_current,
-                                "chunks": doc_chunks
-                            }
-                            doc_info = {k: v for k, v in doc_info.items() if v is not None}
-                            unique_documents[doc_key] = doc_info
+                # Prefer current version; if both current or both not, pick higher version
+                prev_is_current = prev.get("is_current", True)
+                prev_version = prev.get("version", "1")
+                
+                # String comparison for versions (works for both numeric and alphanumeric)
+                should_replace = (current_is_current and not prev_is_current) or \
+                               (current_is_current == prev_is_current and str(current_version) > str(prev_version))
+                
+                if should_replace:
+                    unique_documents[doc_key] = build_doc_info(
+                        source_file, title, metadata,
+                        current_version, current_is_current,
+                        chunks_by_base[base_source]
+                    )
         
         # Convert to list and sort
         documents_list = list(unique_documents.values())
-        documents_list.sort(key=lambda x: x['filename'])
+        documents_list.sort(key=itemgetter('filename'))
         
         return {
             "category": category,
             "table": table_name,
             "documents": documents_list,
             "count": len(documents_list),
-            "unique_filenames": sorted([doc['filename'] for doc in documents_list])
+            # Already in filename order from the sort above
+            "unique_filenames": [doc['filename'] for doc in documents_list]
         }
         
     except Exception as e:
         raise HTTPException(500, f"Error querying Supabase: {str(e)}")
 
 
-@app.get("/documents_by_category/{category}/filenames")
-async def get_filenames_by_category(category: str):
-    """Get just the unique filenames for a given category from Supabase (simplified version)."""
-    # Reuse the main endpoint and extract just filenames
-    full_result = await get_documents_by_category(category)
+async def _documents_listing(category: str) -> tuple:
+    """
+    Cached (documents listing, filenames-only listing) pair for a category.
     
-    return {
+    Both endpoints are served from one entry, cached per category for
+    DOCUMENTS_CACHE_TTL_SECONDS; uploads and deletions bump the table
+    version, which invalidates it.
+    """
+    # Validate category
+    if category not in SUPABASE_TABLE_BY_CATEGORY:
+        raise HTTPException(400, f"Invalid category. Valid categories are: {list(SUPABASE_TABLE_BY_CATEGORY.keys())}")
+    
+    table_version = _TABLE_VERSIONS.get(vector_table_name(category), 0)
+    now = time.time()
+    cached = _DOCUMENTS_CACHE.get(category)
+    if cached and cached[0] > now and cached[1] == table_version:
+        return cached[2]
+    
+    result = await _fetch_documents_by_category(category)
+    filenames = {
         "category": category,
-        "filenames": full_result.get("unique_filenames", []),
-        "count": full_result.get("count", 0)
+        "filenames": result.get("unique_filenames", []),
+        "count": result.get("count", 0)
     }
+    _DOCUMENTS_CACHE[category] = (now + DOCUMENTS_CACHE_TTL_SECONDS, table_version, (result, filenames))
+    return result, filenames
+
+
+@app.get("/documents_by_category/{category}")
+async def get_documents_by_category(category: str):
+    """Get all unique document filenames for a given category from Supabase."""
+    result, _ = await _documents_listing(category)
+    return result
+
+
+@app.get("/documents_by_category/{category}/filenames")
+async def get_filenames_by_category(category: str):
+    """Get just the unique filenames for a given category from Supabase (simplified version)."""
+    _, filenames = await _documents_listing(category)
+    return filenames
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+-- migrations/001_unified_chunks_table.sql
+-- Optional: unified chunks table for ACEP Document Processing
+-- Run this in your Supabase SQL Editor only when switching the API to
+-- USE_UNIFIED_CHUNKS_TABLE=true (see qa_config.py); it is NOT part of
+-- supabase_functions.sql, which must be run first.
+--
+-- One table + one HNSW index for all categories instead of five.
+-- search_chunks uses hnsw.iterative_scan, which requires pgvector 0.8+.
+-- The data copy at the end is a snapshot: while the flag is off, uploads keep
+-- writing the per-category tables only, so run it right before enabling the flag.
+
+CREATE TABLE IF NOT EXISTS vs_chunks (
+  id text NOT NULL,               -- chunk_id = hash(text)
+  category text NOT NULL,         -- canonical category name
+  content text NOT NULL,
+  metadata jsonb NOT NULL,
+  embedding vector(1536),         -- OpenAI text-embedding-3-small
+  PRIMARY KEY (category, id)
+);
+
+CREATE INDEX IF NOT EXISTS vs_chunks_embedding_idx 
+ON vs_chunks USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS vs_chunks_category_idx ON vs_chunks (category);
+CREATE INDEX IF NOT EXISTS vs_chunks_title_idx ON vs_chunks (category, (metadata->>'title'));
+
+-- Search one category of the unified table. The query is cast to the column's
+-- type, so this one definition serves both vector(1536) and the halfvec(1536)
+-- column from 002_unified_chunks_halfvec.sql, and the HNSW index is used either way.
+CREATE OR REPLACE FUNCTION search_chunks(
+  query_embedding vector(1536),
+  p_category text,
+  match_threshold float DEFAULT 0.7,
+  match_count int DEFAULT 10
+)
+RETURNS TABLE (
+  id text,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  embedding_type text;
+BEGIN
+  SELECT format_type(a.atttypid, a.atttypmod) INTO embedding_type
+  FROM pg_attribute a
+  WHERE a.attrelid = 'vs_chunks'::regclass AND a.attname = 'embedding';
+
+  -- Keep scanning the HNSW graph until match_count rows pass the category filter
+  PERFORM set_config('hnsw.ef_search', greatest(40, match_count)::text, true);
+  PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+
+  RETURN QUERY EXECUTE format(
+    'SELECT nearest.id, nearest.content, nearest.metadata, nearest.similarity
+     FROM (
+       SELECT
+         vs.id,
+         vs.content,
+         vs.metadata,
+         1 - (vs.embedding <=> $1::%1$s) as similarity
+       FROM vs_chunks vs
+       WHERE vs.category = $2
+       ORDER BY vs.embedding <=> $1::%1$s
+       LIMIT $3
+     ) nearest
+     WHERE nearest.similarity > $4
+     ORDER BY nearest.similarity DESC',
+    embedding_type
+  )
+  USING query_embedding, p_category, match_count, match_threshold;
+END;
+$$;
+
+-- One-time data copy from the per-category tables
+INSERT INTO vs_chunks (id, category, content, metadata, embedding)
+SELECT id, 'Board and Committee Proceedings', content, metadata, embedding FROM vs_board_committees
+UNION ALL
+SELECT id, 'Bylaws & Governance Policies', content, metadata, embedding FROM vs_bylaws
+UNION ALL
+SELECT id, 'External Advocacy &  Communications', content, metadata, embedding FROM vs_external_advocacy
+UNION ALL
+SELECT id, 'Policy & Position Statements', content, metadata, embedding FROM vs_policy_positions
+UNION ALL
+SELECT id, 'Resolutions', content, metadata, embedding FROM vs_resolutions
+ON CONFLICT (category, id) DO NOTHING;
@@ -0,0 +1,16 @@
+-- migrations/002_unified_chunks_halfvec.sql
+-- Optional: half-precision embeddings for the unified chunks table (pgvector 0.7+)
+-- Run this in your Supabase SQL Editor after 001_unified_chunks_table.sql.
+--
+-- Store vs_chunks embeddings as halfvec (FP16): half the table and index size,
+-- so HNSW traversal touches half the memory. Recall impact is negligible.
+-- The API needs no changes: the vector literals it sends are cast on insert,
+-- and search_chunks (defined in 001) casts the query to the column type.
+
+DROP INDEX IF EXISTS vs_chunks_embedding_idx;
+
+ALTER TABLE vs_chunks
+  ALTER COLUMN embedding TYPE halfvec(1536) USING embedding::halfvec(1536);
+
+CREATE INDEX IF NOT EXISTS vs_chunks_embedding_half_idx 
+ON vs_chunks USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
@@ -0,0 +1,66 @@
+-- migrations/003_local_embedder_384.sql
+-- Optional: 384-dim embedding columns for the local embedder (USE_LOCAL_EMBEDDER=true)
+-- Run this in your Supabase SQL Editor after supabase_functions.sql (and after
+-- 001/002 if the unified chunks table is in use).
+--
+-- LOCAL_EMBED_MODEL (BAAI/bge-small-en-v1.5) produces 384-dim vectors, which
+-- cannot be compared with the stored 1536-dim OpenAI embeddings. This clears
+-- every stored embedding and resizes the columns; re-upload the documents with
+-- USE_LOCAL_EMBEDDER=true afterwards to embed them with the local model.
+-- The API refuses to start when the embedder and column dimensions differ.
+-- The search functions take an unsized vector argument, so they need no changes.
+
+DROP INDEX IF EXISTS vs_board_committees_embedding_idx;
+DROP INDEX IF EXISTS vs_bylaws_embedding_idx;
+DROP INDEX IF EXISTS vs_external_advocacy_embedding_idx;
+DROP INDEX IF EXISTS vs_policy_positions_embedding_idx;
+DROP INDEX IF EXISTS vs_resolutions_embedding_idx;
+
+ALTER TABLE vs_board_committees ALTER COLUMN embedding TYPE vector(384) USING NULL;
+ALTER TABLE vs_bylaws ALTER COLUMN embedding TYPE vector(384) USING NULL;
+ALTER TABLE vs_external_advocacy ALTER COLUMN embedding TYPE vector(384) USING NULL;
+ALTER TABLE vs_policy_positions ALTER COLUMN embedding TYPE vector(384) USING NULL;
+ALTER TABLE vs_resolutions ALTER COLUMN embedding TYPE vector(384) USING NULL;
+
+CREATE INDEX IF NOT EXISTS vs_board_committees_embedding_idx 
+ON vs_board_committees USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS vs_bylaws_embedding_idx 
+ON vs_bylaws USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS vs_external_advocacy_embedding_idx 
+ON vs_external_advocacy USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS vs_policy_positions_embedding_idx 
+ON vs_policy_positions USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS vs_resolutions_embedding_idx 
+ON vs_resolutions USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+-- Unified chunks table, if 001 was run (keeps halfvec storage if 002 was run)
+DO $$
+DECLARE
+  embedding_type text;
+BEGIN
+  IF to_regclass('vs_chunks') IS NULL THEN
+    RETURN;
+  END IF;
+
+  SELECT t.typname INTO embedding_type
+  FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid
+  WHERE a.attrelid = 'vs_chunks'::regclass AND a.attname = 'embedding';
+
+  DROP INDEX IF EXISTS vs_chunks_embedding_idx;
+  DROP INDEX IF EXISTS vs_chunks_embedding_half_idx;
+
+  IF embedding_type = 'halfvec' THEN
+    ALTER TABLE vs_chunks ALTER COLUMN embedding TYPE halfvec(384) USING NULL;
+    CREATE INDEX vs_chunks_embedding_half_idx
+    ON vs_chunks USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+  ELSE
+    ALTER TABLE vs_chunks ALTER COLUMN embedding TYPE vector(384) USING NULL;
+    CREATE INDEX vs_chunks_embedding_idx
+    ON vs_chunks USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+  END IF;
+END;
+$$;
@@ -1,4 +1,5 @@
 # qa_config.py
+import os
 from pathlib import Path
 
 # Retrieval backend: only "supabase" is supported
@@ -13,6 +14,11 @@ CATEGORIES = [
     "Resolutions",
 ]
 
+# Category lookups for request validation: exact names, and names with all
+# spaces removed (tolerates "&" spacing variants)
+CATEGORIES_SET = frozenset(CATEGORIES)
+CATEGORY_BY_COMPACT_NAME = {category.replace(" ", ""): category for category in CATEGORIES}
+
 # Supabase table mapping by category
 SUPABASE_TABLE_BY_CATEGORY = {
     "Board and Committee Proceedings": "vs_board_committees",
@@ -22,10 +28,22 @@ SUPABASE_TABLE_BY_CATEGORY = {
     "Resolutions": "vs_resolutions",
 }
 
+# Set USE_UNIFIED_CHUNKS_TABLE=true to store and search all categories in the single
+# vs_chunks table; run migrations/001_unified_chunks_table.sql first to create and fill it
+USE_UNIFIED_CHUNKS_TABLE = os.getenv("USE_UNIFIED_CHUNKS_TABLE", "false").lower() == "true"
+UNIFIED_CHUNKS_TABLE = "vs_chunks"
+
 # Retrieval settings
 TOP_K = 50
 FETCH_K = 40      # for MMR diversity
 MMR_LAMBDA = 0.2
 
+# Embeddings: set USE_LOCAL_EMBEDDER=true to embed in-process with FastEmbed (ONNX)
+# instead of calling OpenAI (pip install fastembed). bge-small produces 384-dim
+# vectors, so run migrations/003_local_embedder_384.sql and re-upload the documents
+# before enabling this; the API refuses to start if the dimensions differ.
+USE_LOCAL_EMBEDDER = os.getenv("USE_LOCAL_EMBEDDER", "false").lower() == "true"
+LOCAL_EMBED_MODEL = "BAAI/bge-small-en-v1.5"
+
 # LLM
 ANSWER_MODEL = "gpt-4o-mini"  # fast/accurate; set temperature=0 for determinism
\ No newline at end of file
@@ -16,19 +16,45 @@ Requirements:
 import os
 import json
 import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# Optional streaming multipart encoder (falls back to requests' in-memory encoding)
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
 from pathlib import Path
 from datetime import datetime
 from batch_preprocess import (
     API_BASE_URL, 
     DOCUMENTS_DIR, 
-    log_message,
+    log_message as _log_message,
     setup_logging,
     check_api_health,
     infer_metadata_from_filename,
     get_mime_type
 )
 
+# One keep-alive session for all uploads, so each retry reuses a pooled
+# connection to the API instead of opening a new one
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Documents uploaded concurrently; the API server does the heavy lifting
+RETRY_WORKERS = 4
+
+_LOG_LOCK = threading.Lock()
+
+
+def log_message(log_file: Path, message: str, print_also: bool = True):
+    """Thread-safe log_message: keeps lines from concurrent uploads whole"""
+    with _LOG_LOCK:
+        _log_message(log_file, message, print_also)
+
 # List of documents that failed in the previous run
 FAILED_DOCUMENTS = [
     # Document number too long (12 files)
@@ -73,7 +99,7 @@ def process_single_document(filepath: Path, category: str, log_file: Path) -> bo
         mime_type = get_mime_type(filepath)
         
         # Prepare API request
-        url = f"{API_BASE_URL}/v1/upload-and-preprocess"
+        url = f"{API_BASE_URL}/v1/upload-and-preprocess?wait=true"
         
         with open(filepath, 'rb') as file:
             files = {'file': (filepath.name, file, mime_type)}
@@ -91,8 +117,13 @@ def process_single_document(filepath: Path, category: str, log_file: Path) -> bo
             log_message(log_file, f"  → Year: {year}")
             log_message(log_file, f"  → Issued Date: {issued_date}")
             
-            # Make API call
-            response = requests.post(url, files=files, data=data, timeout=300)
+            # Make API call; the encoder streams the file from disk instead of
+            # building the whole multipart body in memory
+            if MultipartEncoder:
+                body = MultipartEncoder(fields={**data, **files})
+                response = SESSION.post(url, data=body, headers={'Content-Type': body.content_type}, timeout=300)
+            else:
+                response = SESSION.post(url, files=files, data=data, timeout=300)
             
             if response.status_code == 200:
                 result = response.json()
@@ -164,23 +195,25 @@ def main():
     total_success = 0
     total_failed = 0
     
-    for category, filepath in existing_files:
-        log_message(log_file, f"\n[{total_processed + 1}/{len(existing_files)}] Processing {category}/{filepath.name}")
+    # Upload a few documents at a time; the pool width bounds the load on the API
+    with ThreadPoolExecutor(max_workers=RETRY_WORKERS) as executor:
+        results = executor.map(
+            lambda item: process_single_document(item[1], item[0], log_file),
+            existing_files
+        )
         
-        success = process_single_document(filepath, category, log_file)
-        total_processed += 1
-        
-        if success:
-            total_success += 1
-        else:
-            total_failed += 1
-        
-        # Progress update
-        progress = (total_processed / len(existing_files)) * 100
-        print(f"Progress: {progress:.1f}% ({total_processed}/{len(existing_files)})")
-        
-        # Small delay to avoid overwhelming the API
-        time.sleep(0.5)
+        for (category, filepath), success in zip(existing_files, results):
+            total_processed += 1
+            
+            if success:
+                total_success += 1
+            else:
+                total_failed += 1
+            
+            # Progress update
+            progress = (total_processed / len(existing_files)) * 100
+            log_message(log_file, f"[{total_processed}/{len(existing_files)}] Finished {category}/{filepath.name}", print_also=False)
+            print(f"Progress: {progress:.1f}% ({total_processed}/{len(existing_files)})")
     
     # Final summary
     end_time = time.time()
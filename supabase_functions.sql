@@ -55,26 +55,37 @@ CREATE TABLE IF NOT EXISTS vs_resolutions (
 
 -- Create HNSW indexes for efficient vector similarity search
 -- Note: Only create indexes after inserting data for better performance
+-- To rebuild an existing index with these parameters on a live database:
+--   DROP INDEX CONCURRENTLY IF EXISTS vs_bylaws_embedding_idx;
+--   CREATE INDEX CONCURRENTLY vs_bylaws_embedding_idx ON vs_bylaws
+--     USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 
 -- Board and Committee Proceedings
 CREATE INDEX IF NOT EXISTS vs_board_committees_embedding_idx 
-ON vs_board_committees USING hnsw (embedding vector_cosine_ops);
+ON vs_board_committees USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 
 -- Bylaws & Governance Policies
 CREATE INDEX IF NOT EXISTS vs_bylaws_embedding_idx 
-ON vs_bylaws USING hnsw (embedding vector_cosine_ops);
+ON vs_bylaws USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 
 -- External Advocacy & Communications  
 CREATE INDEX IF NOT EXISTS vs_external_advocacy_embedding_idx 
-ON vs_external_advocacy USING hnsw (embedding vector_cosine_ops);
+ON vs_external_advocacy USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 
 -- Policy & Position Statements
 CREATE INDEX IF NOT EXISTS vs_policy_positions_embedding_idx 
-ON vs_policy_positions USING hnsw (embedding vector_cosine_ops);
+ON vs_policy_positions USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 
 -- Resolutions
 CREATE INDEX IF NOT EXISTS vs_resolutions_embedding_idx 
-ON vs_resolutions USING hnsw (embedding vector_cosine_ops);
+ON vs_resolutions USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+-- Title lookups (document deletion / re-upload of a new version)
+CREATE INDEX IF NOT EXISTS vs_board_committees_title_idx ON vs_board_committees ((metadata->>'title'));
+CREATE INDEX IF NOT EXISTS vs_bylaws_title_idx ON vs_bylaws ((metadata->>'title'));
+CREATE INDEX IF NOT EXISTS vs_external_advocacy_title_idx ON vs_external_advocacy ((metadata->>'title'));
+CREATE INDEX IF NOT EXISTS vs_policy_positions_title_idx ON vs_policy_positions ((metadata->>'title'));
+CREATE INDEX IF NOT EXISTS vs_resolutions_title_idx ON vs_resolutions ((metadata->>'title'));
 
 -- ==========================================
 -- PHASE 2: CATEGORY-SPECIFIC SEARCH FUNCTIONS
@@ -95,16 +106,24 @@ RETURNS TABLE (
 LANGUAGE plpgsql
 AS $$
 BEGIN
+  -- HNSW returns at most ef_search rows, so widen it for large match counts
+  PERFORM set_config('hnsw.ef_search', greatest(40, match_count)::text, true);
+
+  -- Order by distance first so the HNSW index is used, then apply the threshold
   RETURN QUERY
-  SELECT
-    vs.id,
-    vs.content,
-    vs.metadata,
-    1 - (vs.embedding <=> query_embedding) as similarity
-  FROM vs_board_committees vs
-  WHERE 1 - (vs.embedding <=> query_embedding) > match_threshold
-  ORDER BY vs.embedding <=> query_embedding
-  LIMIT match_count;
+  SELECT nearest.id, nearest.content, nearest.metadata, nearest.similarity
+  FROM (
+    SELECT
+      vs.id,
+      vs.content,
+      vs.metadata,
+      1 - (vs.embedding <=> query_embedding) as similarity
+    FROM vs_board_committees vs
+    ORDER BY vs.embedding <=> query_embedding
+    LIMIT match_count
+  ) nearest
+  WHERE nearest.similarity > match_threshold
+  ORDER BY nearest.similarity DESC;
 END;
 $$;
 
@@ -123,16 +142,24 @@ RETURNS TABLE (
 LANGUAGE plpgsql
 AS $$
 BEGIN
+  -- HNSW returns at most ef_search rows, so widen it for large match counts
+  PERFORM set_config('hnsw.ef_search', greatest(40, match_count)::text, true);
+
+  -- Order by distance first so the HNSW index is used, then apply the threshold
   RETURN QUERY
-  SELECT
-    vs.id,
-    vs.content,
-    vs.metadata,
-    1 - (vs.embedding <=> query_embedding) as similarity
-  FROM vs_bylaws vs
-  WHERE 1 - (vs.embedding <=> query_embedding) > match_threshold
-  ORDER BY vs.embedding <=> query_embedding
-  LIMIT match_count;
+  SELECT nearest.id, nearest.content, nearest.metadata, nearest.similarity
+  FROM (
+    SELECT
+      vs.id,
+      vs.content,
+      vs.metadata,
+      1 - (vs.embedding <=> query_embedding) as similarity
+    FROM vs_bylaws vs
+    ORDER BY vs.embedding <=> query_embedding
+    LIMIT match_count
+  ) nearest
+  WHERE nearest.similarity > match_threshold
+  ORDER BY nearest.similarity DESC;
 END;
 $$;
 
@@ -151,16 +178,24 @@ RETURNS TABLE (
 LANGUAGE plpgsql
 AS $$
 BEGIN
+  -- HNSW returns at most ef_search rows, so widen it for large match counts
+  PERFORM set_config('hnsw.ef_search', greatest(40, match_count)::text, true);
+
+  -- Order by distance first so the HNSW index is used, then apply the threshold
   RETURN QUERY
-  SELECT
-    vs.id,
-    vs.content,
-    vs.metadata,
-    1 - (vs.embedding <=> query_embedding) as similarity
-  FROM vs_external_advocacy vs
-  WHERE 1 - (vs.embedding <=> query_embedding) > match_threshold
-  ORDER BY vs.embedding <=> query_embedding
-  LIMIT match_count;
+  SELECT nearest.id, nearest.content, nearest.metadata, nearest.similarity
+  FROM (
+    SELECT
+      vs.id,
+      vs.content,
+      vs.metadata,
+      1 - (vs.embedding <=> query_embedding) as similarity
+    FROM vs_external_advocacy vs
+    ORDER BY vs.embedding <=> query_embedding
+    LIMIT match_count
+  ) nearest
+  WHERE nearest.similarity > match_threshold
+  ORDER BY nearest.similarity DESC;
 END;
 $$;
 
@@ -179,16 +214,24 @@ RETURNS TABLE (
 LANGUAGE plpgsql
 AS $$
 BEGIN
+  -- HNSW returns at most ef_search rows, so widen it for large match counts
+  PERFORM set_config('hnsw.ef_search', greatest(40, match_count)::text, true);
+
+  -- Order by distance first so the HNSW index is used, then apply the threshold
   RETURN QUERY
-  SELECT
-    vs.id,
-    vs.content,
-    vs.metadata,
-    1 - (vs.embedding <=> query_embedding) as similarity
-  FROM vs_policy_positions vs
-  WHERE 1 - (vs.embedding <=> query_embedding) > match_threshold
-  ORDER BY vs.embedding <=> query_embedding
-  LIMIT match_count;
+  SELECT nearest.id, nearest.content, nearest.metadata, nearest.similarity
+  FROM (
+    SELECT
+      vs.id,
+      vs.content,
+      vs.metadata,
+      1 - (vs.embedding <=> query_embedding) as similarity
+    FROM vs_policy_positions vs
+    ORDER BY vs.embedding <=> query_embedding
+    LIMIT match_count
+  ) nearest
+  WHERE nearest.similarity > match_threshold
+  ORDER BY nearest.similarity DESC;
 END;
 $$;
 
@@ -207,19 +250,121 @@ RETURNS TABLE (
 LANGUAGE plpgsql
 AS $$
 BEGIN
+  -- HNSW returns at most ef_search rows, so widen it for large match counts
+  PERFORM set_config('hnsw.ef_search', greatest(40, match_count)::text, true);
+
+  -- Order by distance first so the HNSW index is used, then apply the threshold
   RETURN QUERY
-  SELECT
-    vs.id,
-    vs.content,
-    vs.metadata,
-    1 - (vs.embedding <=> query_embedding) as similarity
-  FROM vs_resolutions vs
-  WHERE 1 - (vs.embedding <=> query_embedding) > match_threshold
-  ORDER BY vs.embedding <=> query_embedding
-  LIMIT match_count;
+  SELECT nearest.id, nearest.content, nearest.metadata, nearest.similarity
+  FROM (
+    SELECT
+      vs.id,
+      vs.content,
+      vs.metadata,
+      1 - (vs.embedding <=> query_embedding) as similarity
+    FROM vs_resolutions vs
+    ORDER BY vs.embedding <=> query_embedding
+    LIMIT match_count
+  ) nearest
+  WHERE nearest.similarity > match_threshold
+  ORDER BY nearest.similarity DESC;
+END;
+$$;
+
+-- ==========================================
+-- DOCUMENT LISTING
+-- ==========================================
+-- One row per source file with the listing fields of a sample chunk's metadata
+-- and the file's chunk count, so /documents_by_category does not download
+-- every chunk's metadata.
+-- p_category scopes the unified vs_chunks table; leave it NULL for the
+-- per-category tables. tbl is interpolated into the query, so it is limited
+-- to the known document tables (the function is callable through PostgREST).
+CREATE OR REPLACE FUNCTION documents_summary_by_category(
+  tbl text,
+  p_category text DEFAULT NULL
+)
+RETURNS TABLE (
+  source_file text,
+  metadata jsonb,
+  chunks bigint
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+  IF tbl NOT IN (
+    'vs_board_committees',
+    'vs_bylaws',
+    'vs_external_advocacy',
+    'vs_policy_positions',
+    'vs_resolutions',
+    'vs_chunks'
+  ) THEN
+    RAISE EXCEPTION 'documents_summary_by_category: unknown table %', tbl;
+  END IF;
+
+  RETURN QUERY EXECUTE format(
+    'SELECT DISTINCT ON (t.metadata->>''source_file'')
+       t.metadata->>''source_file'',
+       jsonb_strip_nulls(jsonb_build_object(
+         ''title'', t.metadata->''title'',
+         ''document_number'', t.metadata->''document_number'',
+         ''issued_date'', t.metadata->''issued_date'',
+         ''year'', t.metadata->''year'',
+         ''version'', t.metadata->''version'',
+         ''doc_version'', t.metadata->''doc_version'',
+         ''is_current'', t.metadata->''is_current''
+       )),
+       count(*) OVER (PARTITION BY t.metadata->>''source_file'')
+     FROM %I t
+     WHERE t.metadata->>''source_file'' IS NOT NULL %s
+     ORDER BY t.metadata->>''source_file''',
+    tbl,
+    CASE WHEN p_category IS NULL THEN '' ELSE format('AND t.category = %L', p_category) END
+  );
+END;
+$$;
+
+-- Declared dimension of a document table's embedding column (vector or
+-- halfvec), so the API can refuse to start with an embedder that does not
+-- match it. Limited to the known document tables like the listing above.
+CREATE OR REPLACE FUNCTION embedding_dimension(tbl text)
+RETURNS int
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  dims int;
+BEGIN
+  IF tbl NOT IN (
+    'vs_board_committees',
+    'vs_bylaws',
+    'vs_external_advocacy',
+    'vs_policy_positions',
+    'vs_resolutions',
+    'vs_chunks'
+  ) THEN
+    RAISE EXCEPTION 'embedding_dimension: unknown table %', tbl;
+  END IF;
+
+  SELECT a.atttypmod INTO dims
+  FROM pg_attribute a
+  WHERE a.attrelid = to_regclass(tbl) AND a.attname = 'embedding' AND NOT a.attisdropped;
+
+  RETURN dims;
 END;
 $$;
 
+-- ==========================================
+-- PHASE 4: UNIFIED CHUNKS TABLE (optional)
+-- ==========================================
+-- Not run as part of this file: the opt-in vs_chunks table, its search function
+-- and the data copy live in migrations/001_unified_chunks_table.sql, and its
+-- optional half-precision storage in migrations/002_unified_chunks_halfvec.sql.
+-- Switching to the local embedder (USE_LOCAL_EMBEDDER) needs 384-dim columns:
+-- see migrations/003_local_embedder_384.sql.
+
 -- ==========================================
 -- LEGACY FUNCTIONS (Phase 1 - for reference)
 -- ==========================================
@@ -372,7 +517,9 @@ $$;
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_documents_folder ON documents(folder);
-CREATE INDEX IF NOT EXISTS idx_documents_embedding ON documents USING ivfflat (embedding vector_cosine_ops);
+-- HNSW with inner-product ops to match the <#> ordering above (replaces the old IVFFlat index)
+DROP INDEX IF EXISTS idx_documents_embedding;
+CREATE INDEX IF NOT EXISTS idx_documents_embedding_hnsw ON documents USING hnsw (embedding vector_ip_ops) WITH (m = 16, ef_construction = 64);
 CREATE INDEX IF NOT EXISTS idx_documents_text_search ON documents USING gin(to_tsvector('english', text));
 
 -- Grant permissions